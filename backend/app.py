@@ -1,7 +1,16 @@
 from flask import Flask, session
 from flask_cors import CORS
-from models import db, User, Admin
+from models import db
 from routes import api
+from assets import assets
+from scheduler import scheduler
+from events import feed, hub
+from passwords import hasher
+from eta import kitchen_eta
+from profiling import profiler
+from images import image_store
+from compression import compressor
+from json_provider import FastJSONProvider
 from config import Config
 import os
 from datetime import timedelta
@@ -9,6 +18,7 @@ from datetime import timedelta
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = FastJSONProvider(app)
     
     app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=15)
     is_production = (
@@ -21,36 +31,22 @@ def create_app():
     app.config['SESSION_COOKIE_SAMESITE'] = 'None' if is_production else 'Lax'
     app.config['SESSION_COOKIE_DOMAIN'] = None
     db.init_app(app)
+    # after_request hooks run last-registered first; compress after the profiler has seen the body
+    compressor.init_app(app)
+    profiler.init_app(app)
+    hasher.init_app(app)
+    scheduler.init_app(app)
+    hub.init_app(app)
+    feed.init_app(app)
+    kitchen_eta.init_app(app)
+    image_store.init_app(app)
     allowed_origins = [
         'http://localhost:3000',
         'https://pranavgautam.com',
     ]
     CORS(app, supports_credentials=True, origins=allowed_origins)
     app.register_blueprint(api, url_prefix='/api')
-    with app.app_context():
-        db.create_all()
-        test_user = User.query.filter_by(email='testuser@gmail.com').first()
-        if not test_user:
-            test_user = User(
-                first_name='Test',
-                last_name='User',
-                email='testuser@gmail.com',
-                mobile='7894561230',
-                points=13
-            )
-            test_user.set_password('Password123!')
-            db.session.add(test_user)
-            db.session.commit()
-        test_admin = Admin.query.filter_by(username='admin').first()
-        if not test_admin:
-            test_admin = Admin(
-                username='admin',
-                full_name='System Administrator',
-                role='super_admin'
-            )
-            test_admin.set_password('Admin123!')
-            db.session.add(test_admin)
-            db.session.commit()
+    app.register_blueprint(assets)
     
     @app.route('/')
     def index():
@@ -59,7 +55,9 @@ def create_app():
     return app
 
 if __name__ == '__main__':
+    from bootstrap import bootstrap
     app = create_app()
+    bootstrap(app)
     port = int(os.environ.get('PORT', 5000))
     debug_mode = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     app.run(debug=debug_mode, host='0.0.0.0', port=port)
@@ -0,0 +1,68 @@
+"""Moves completed orders older than ORDER_ARCHIVE_AFTER_DAYS into the archive tables.
+
+Keeps `orders` and `order_items` bounded by recent activity; reads of past
+orders and customer history look in both places. Safe to run repeatedly,
+e.g. daily from cron:
+
+    python archive.py [--days 90]
+"""
+import argparse
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, select
+from models import db, Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+
+ARCHIVE_BATCH = 500
+
+def _copy(source, target, criteria):
+    names = [column.name for column in source.__table__.columns]
+    db.session.execute(
+        insert(target).from_select(names, select(*(source.__table__.c[name] for name in names)).where(*criteria))
+    )
+
+def _holds_newest_ids():
+    # SQLite, and MySQL 5.7 after a restart, number new rows from the highest id
+    # still in the table; keeping the newest order and item rows hot stops an
+    # archived id from being handed out again
+    newest_item_order = select(OrderItem.order_id).where(OrderItem.id == select(func.max(OrderItem.id)).scalar_subquery())
+    return (
+        Order.id < select(func.max(Order.id)).scalar_subquery(),
+        Order.id.notin_(newest_item_order),
+    )
+
+def archive_completed_orders(cutoff, batch_size=ARCHIVE_BATCH):
+    archived = 0
+    while True:
+        order_ids = db.session.execute(
+            select(Order.id)
+            .where(Order.status == 'completed', Order.completed_time < cutoff, *_holds_newest_ids())
+            .order_by(Order.completed_time, Order.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not order_ids:
+            return archived
+        # Each batch is one transaction, so an order is always in exactly one place
+        still_completed = (Order.id.in_(order_ids), Order.status == 'completed')
+        _copy(Order, ArchivedOrder, still_completed)
+        moved_ids = db.session.execute(
+            select(ArchivedOrder.id).where(ArchivedOrder.id.in_(order_ids))
+        ).scalars().all()
+        _copy(OrderItem, ArchivedOrderItem, (OrderItem.order_id.in_(moved_ids),))
+        db.session.execute(delete(OrderItem).where(OrderItem.order_id.in_(moved_ids)))
+        db.session.execute(delete(Order).where(Order.id.in_(moved_ids)))
+        db.session.commit()
+        archived += len(moved_ids)
+
+def main():
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, help='archive orders completed this many days ago (default ORDER_ARCHIVE_AFTER_DAYS)')
+    args = parser.parse_args()
+    app = create_app()
+    with app.app_context():
+        days = args.days if args.days is not None else app.config.get('ORDER_ARCHIVE_AFTER_DAYS', 90)
+        archived = archive_completed_orders(datetime.utcnow() - timedelta(days=days))
+    print(f'Archived {archived} orders completed more than {days} days ago')
+
+if __name__ == '__main__':
+    main()
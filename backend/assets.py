@@ -0,0 +1,26 @@
+from flask import Blueprint, abort, send_from_directory
+from images import FINGERPRINTED_NAME, image_store
+
+assets = Blueprint('assets', __name__)
+
+# A fingerprinted name changes whenever the content does, so it never goes stale
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+@assets.route('/assets/<name>', methods=['GET'])
+def serve_asset(name):
+    match = FINGERPRINTED_NAME.match(name)
+    if not match:
+        abort(404)
+    # send_file answers If-None-Match/If-Modified-Since with 304 and Range with
+    # 206, and hands the open file to the server's wsgi.file_wrapper, which
+    # gunicorn sends with sendfile(2) (or X-Sendfile when USE_X_SENDFILE is set)
+    response = send_from_directory(
+        image_store.storage_dir,
+        name,
+        etag=match.group('fingerprint'),
+        max_age=IMMUTABLE_MAX_AGE,
+        conditional=True
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,332 @@
+"""Latency, throughput and SQL counts per endpoint under the app's traffic mix.
+
+Boots create_app() against a scratch database (SQLite by default, or any
+--database-url such as a local MySQL), seeds users, historical orders and
+the setup.sql menu, then replays a weighted mix of menu loads, checkouts,
+update-status and admin polls, logins, past-order browsing and reports
+from several client threads. Prints p50/p95/p99 per endpoint and writes the
+results as JSON; pass an earlier results file to --compare to see the
+change. Run from the backend directory:
+
+    python benchmarks/api_load.py --users 2000 --orders 200000 --output results.json
+    python benchmarks/api_load.py --compare results.json --output results-new.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PASSWORD = 'Password123!'
+SEED_BATCH = 5000
+ACTIVE_ORDERS = 50
+HISTORY_DAYS = 180
+TAX_PERCENT = 15
+
+# (scenario, weight); the mix of a lunch rush with the 30 s pollers open
+TRAFFIC_MIX = [
+    ('menu', 30),
+    ('update_status', 20),
+    ('admin_poll', 15),
+    ('checkout', 10),
+    ('user_orders', 10),
+    ('past_orders', 8),
+    ('login', 3),
+    ('sales_report', 2),
+    ('items_report', 2),
+]
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def seed(app, args, rng):
+    from sqlalchemy import insert, select
+    from bootstrap import load_setup_menu
+    from models import db, User, Order, OrderItem, FoodItem
+    from passwords import hasher
+    from rollups import rebuild_rollups
+
+    menu = load_setup_menu()
+    regular = [item for item in menu if not item['is_reward']]
+    with app.app_context():
+        db.session.execute(insert(FoodItem), menu)
+        password_hash = hasher.hash(PASSWORD)
+        users = [{
+            'first_name': f'User{index}',
+            'last_name': 'Bench',
+            'email': f'user{index}@bench.test',
+            'password_hash': password_hash,
+            'mobile': f'9{index:09d}',
+            'points': rng.randint(0, 2000)
+        } for index in range(args.users)]
+        for start in range(0, len(users), SEED_BATCH):
+            db.session.execute(insert(User), users[start:start + SEED_BATCH])
+        db.session.commit()
+        user_ids = db.session.execute(select(User.id).where(User.email.like('%@bench.test'))).scalars().all()
+
+        now = datetime.utcnow()
+        next_id = 1
+        for start in range(0, args.orders, SEED_BATCH):
+            orders, items = [], []
+            for number in range(start, min(start + SEED_BATCH, args.orders)):
+                active = number >= args.orders - ACTIVE_ORDERS
+                order_time = now - (timedelta(minutes=rng.randint(0, 20)) if active else
+                                    timedelta(days=rng.uniform(0, HISTORY_DAYS)))
+                subtotal = Decimal('0.00')
+                for food in rng.sample(regular, rng.randint(1, 3)):
+                    quantity = rng.randint(1, 3)
+                    subtotal += food['price'] * quantity
+                    items.append({'order_id': next_id, 'food_id': food['id'], 'food_name': food['name'],
+                                  'food_price': food['price'], 'quantity': quantity, 'item_total': food['price'] * quantity})
+                status = rng.choice(['current', 'ready']) if active else 'completed'
+                ready_time = order_time + timedelta(minutes=15) if status != 'current' else None
+                guest = rng.random() < 0.1
+                orders.append({
+                    'id': next_id,
+                    'order_number': f'BENCH-{next_id:09d}',
+                    'user_id': None if guest else rng.choice(user_ids),
+                    'guest_id': f'guest_{next_id}' if guest else None,
+                    'total_amount': subtotal,
+                    'tax_amount': (subtotal * TAX_PERCENT / 100).quantize(Decimal('0.01')),
+                    'grand_total': (subtotal * (100 + TAX_PERCENT) / 100).quantize(Decimal('1')),
+                    'points_earned': int(subtotal // 10),
+                    'estimated_time': 15,
+                    'status': status,
+                    'payment_method': rng.choice(['cash', 'paytm', 'gpay', 'card']),
+                    'order_time': order_time,
+                    'ready_time': ready_time,
+                    'completed_time': ready_time + timedelta(minutes=30) if status == 'completed' else None,
+                    'created_at': order_time,
+                    'updated_at': order_time
+                })
+                next_id += 1
+            db.session.execute(insert(Order), orders)
+            db.session.execute(insert(OrderItem), items)
+            db.session.commit()
+        rebuild_rollups()
+        return [item['id'] for item in regular]
+
+class Client:
+    """One simulated person: a user session and an admin session on test clients."""
+
+    def __init__(self, app, email, food_ids, rng):
+        self.user = app.test_client()
+        self.admin = app.test_client()
+        self.email = email
+        self.food_ids = food_ids
+        self.rng = rng
+        self.admin_cursor = None
+        self.past_cursor = None
+        self.user.post('/api/login', json={'email': email, 'password': PASSWORD})
+        self.admin.post('/api/admin/login', json={'username': 'admin', 'password': 'Admin123!'})
+
+    def menu(self):
+        return self.user.get('/api/food-items')
+
+    def update_status(self):
+        return self.user.post('/api/orders/update-status')
+
+    def admin_poll(self):
+        url = '/api/admin/orders' + (f'?since={self.admin_cursor}' if self.admin_cursor else '')
+        response = self.admin.get(url)
+        if response.status_code == 200:
+            self.admin_cursor = response.get_json().get('cursor')
+        return response
+
+    def checkout(self):
+        items = [{'foodId': food_id, 'quantity': self.rng.randint(1, 3)}
+                 for food_id in self.rng.sample(self.food_ids, self.rng.randint(1, 3))]
+        return self.user.post(
+            '/api/orders',
+            json={'items': items, 'payment_method': 'cash'},
+            headers={'Idempotency-Key': f'{self.email}-{self.rng.getrandbits(64):x}'}
+        )
+
+    def user_orders(self):
+        return self.user.get('/api/orders')
+
+    def past_orders(self):
+        url = '/api/admin/orders/past?limit=50' + (f'&after={self.past_cursor}' if self.past_cursor else '')
+        response = self.admin.get(url)
+        if response.status_code == 200:
+            self.past_cursor = response.get_json().get('next_cursor')
+        return response
+
+    def login(self):
+        return self.user.post('/api/login', json={'email': self.email, 'password': PASSWORD})
+
+    def sales_report(self):
+        return self.admin.get('/api/admin/reports/sales')
+
+    def items_report(self):
+        return self.admin.get('/api/admin/reports/items')
+
+def run_mix(app, args, food_ids, emails):
+    from profiling import profiler
+
+    scenarios = [name for name, _ in TRAFFIC_MIX]
+    weights = [weight for _, weight in TRAFFIC_MIX]
+    results = {name: {'latencies': [], 'errors': 0} for name in scenarios}
+    lock = threading.Lock()
+    statements_before = profiler.snapshot()
+
+    def worker(index):
+        rng = random.Random(args.seed + index)
+        client = Client(app, rng.choice(emails), food_ids, rng)
+        local = {name: ([], 0) for name in scenarios}
+        for _ in range(args.requests // args.concurrency):
+            scenario = rng.choices(scenarios, weights)[0]
+            started = time.perf_counter()
+            response = getattr(client, scenario)()
+            elapsed = time.perf_counter() - started
+            latencies, errors = local[scenario]
+            latencies.append(elapsed)
+            local[scenario] = (latencies, errors + (response.status_code >= 400))
+        with lock:
+            for name, (latencies, errors) in local.items():
+                results[name]['latencies'].extend(latencies)
+                results[name]['errors'] += errors
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # Per-endpoint SQL totals come from the app's own profiler
+    statements_after = profiler.snapshot()
+    queries = {}
+    for key, totals in statements_after.items():
+        before = statements_before.get(key, (0, 0, 0, 0))
+        count = totals[0] - before[0]
+        if count:
+            queries[key] = (totals[3] - before[3]) / count
+
+    endpoints = {}
+    for name in scenarios:
+        latencies = sorted(results[name]['latencies'])
+        endpoints[name] = {
+            'requests': len(latencies),
+            'errors': results[name]['errors'],
+            'throughput': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 0.50) * 1000 if latencies else None,
+            'p95_ms': percentile(latencies, 0.95) * 1000 if latencies else None,
+            'p99_ms': percentile(latencies, 0.99) * 1000 if latencies else None,
+        }
+    return elapsed, endpoints, queries
+
+SCENARIO_ENDPOINTS = {
+    'menu': ('api.get_food_items', 'GET'),
+    'update_status': ('api.update_order_statuses', 'POST'),
+    'admin_poll': ('api.get_all_orders', 'GET'),
+    'checkout': ('api.create_order', 'POST'),
+    'user_orders': ('api.get_orders', 'GET'),
+    'past_orders': ('api.get_past_orders', 'GET'),
+    'login': ('api.login', 'POST'),
+    'sales_report': ('api.get_sales_report', 'GET'),
+    'items_report': ('api.get_item_report', 'GET'),
+}
+
+def compare(results, baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)['endpoints']
+    print(f'\nchange vs {baseline_path}:')
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('p95_ms') or not current.get('p95_ms'):
+            continue
+        change = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+        queries = ''
+        if previous.get('queries_per_request') is not None and current.get('queries_per_request') is not None:
+            queries = f", queries {previous['queries_per_request']:.1f} -> {current['queries_per_request']:.1f}"
+        print(f'  {name:14} p95 {previous["p95_ms"]:8.2f} -> {current["p95_ms"]:8.2f} ms ({change:+.1f}%){queries}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='defaults to a temporary SQLite file')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--orders', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='earlier results JSON to compare against')
+    args = parser.parse_args()
+
+    scratch = None
+    if args.database_url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix='.sqlite', delete=False)
+        scratch.close()
+        args.database_url = f'sqlite:///{scratch.name}'
+    os.environ['DATABASE_URL'] = args.database_url
+    # Keep runs repeatable: the scheduler would move seeded orders on its own clock
+    os.environ.setdefault('ORDER_SCHEDULER_ENABLED', 'False')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    from app import create_app
+    from bootstrap import bootstrap
+    from passwords import hasher
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    try:
+        bootstrap(app)
+        seed_started = time.perf_counter()
+        food_ids = seed(app, args, rng)
+        print(f'seeded {args.users} users and {args.orders} orders in {time.perf_counter() - seed_started:.1f} s')
+        emails = [f'user{index}@bench.test' for index in range(min(args.users, 200))]
+        elapsed, endpoints, queries = run_mix(app, args, food_ids, emails)
+    finally:
+        hasher.shutdown()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+    total = sum(endpoint['requests'] for endpoint in endpoints.values())
+    print(f'{total} requests in {elapsed:.1f} s ({total / elapsed:.1f} req/s, {args.concurrency} threads)\n')
+    print(f'{"scenario":14} {"requests":>8} {"errors":>6} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"queries":>8}')
+    for name, endpoint in endpoints.items():
+        endpoint['queries_per_request'] = queries.get(SCENARIO_ENDPOINTS[name])
+        if not endpoint['requests']:
+            continue
+        query_count = endpoint['queries_per_request']
+        query_count = '-' if query_count is None else f'{query_count:.1f}'
+        print(f'{name:14} {endpoint["requests"]:8} {endpoint["errors"]:6} {endpoint["p50_ms"]:8.2f} '
+              f'{endpoint["p95_ms"]:8.2f} {endpoint["p99_ms"]:8.2f} {query_count:>8}')
+
+    if args.compare:
+        compare(endpoints, args.compare)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'run': {
+                    'started': datetime.utcnow().isoformat(),
+                    'python': platform.python_version(),
+                    'database': args.database_url.split(':', 1)[0],
+                    'users': args.users,
+                    'orders': args.orders,
+                    'requests': args.requests,
+                    'concurrency': args.concurrency,
+                    'seed': args.seed,
+                    'elapsed_s': elapsed,
+                    'throughput': total / elapsed
+                },
+                'endpoints': endpoints
+            }, output, indent=2)
+        print(f'\nresults written to {args.output}')
+
+if __name__ == '__main__':
+    main()
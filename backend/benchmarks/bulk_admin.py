@@ -0,0 +1,87 @@
+"""Marking a rush of orders ready: one PUT per order vs one bulk request.
+
+Seeds a scratch SQLite database, then moves the same number of current
+orders to ready through PUT /api/admin/orders/<id>/status and through
+POST /api/admin/orders/bulk-status, and reports wall time, HTTP requests,
+SQL statements and commits for each. Run from the backend directory:
+
+    python benchmarks/bulk_admin.py --orders 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=50, help='orders marked ready per run')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    scratch = tempfile.NamedTemporaryFile(suffix='.sqlite', delete=False)
+    scratch.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{scratch.name}'
+    os.environ.setdefault('ORDER_SCHEDULER_ENABLED', 'False')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    import api_load
+    from sqlalchemy import event, select, update
+    from sqlalchemy.orm import Session
+    from app import create_app
+    from bootstrap import bootstrap
+    from models import db, Order
+    from passwords import hasher
+    from profiling import profiler
+
+    commits = [0]
+
+    def count_commit(session):
+        commits[0] += 1
+
+    event.listen(Session, 'after_commit', count_commit)
+    # Two runs' worth of active orders, all left current
+    api_load.ACTIVE_ORDERS = args.orders * 2
+    seed_args = argparse.Namespace(users=10, orders=args.orders * 2)
+    app = create_app()
+    try:
+        bootstrap(app)
+        api_load.seed(app, seed_args, random.Random(args.seed))
+        with app.app_context():
+            db.session.execute(update(Order).values(status='current', ready_time=None))
+            db.session.commit()
+            order_ids = db.session.execute(select(Order.id).order_by(Order.id)).scalars().all()
+        admin = app.test_client()
+        admin.post('/api/admin/login', json={'username': 'admin', 'password': 'Admin123!'})
+
+        def single(ids):
+            for order_id in ids:
+                admin.put(f'/api/admin/orders/{order_id}/status', json={'status': 'ready'})
+            return len(ids)
+
+        def bulk(ids):
+            admin.post('/api/admin/orders/bulk-status', json={'order_ids': ids, 'status': 'ready'})
+            return 1
+
+        print(f'{"method":8} {"orders":>6} {"requests":>8} {"ms":>8} {"statements":>10} {"commits":>7}')
+        for name, run, ids in (('single', single, order_ids[:args.orders]), ('bulk', bulk, order_ids[args.orders:])):
+            statements_before = sum(stats[3] for stats in profiler.snapshot().values())
+            commits_before = commits[0]
+            started = time.perf_counter()
+            requests = run(ids)
+            elapsed = time.perf_counter() - started
+            statements = sum(stats[3] for stats in profiler.snapshot().values()) - statements_before
+            with app.app_context():
+                ready = db.session.execute(
+                    select(db.func.count()).select_from(Order).where(Order.id.in_(ids), Order.status == 'ready')
+                ).scalar()
+            print(f'{name:8} {ready:6} {requests:8} {elapsed * 1000:8.1f} {statements:10} {commits[0] - commits_before:7}')
+    finally:
+        hasher.shutdown()
+        os.unlink(scratch.name)
+
+if __name__ == '__main__':
+    main()
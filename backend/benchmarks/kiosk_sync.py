@@ -0,0 +1,92 @@
+"""Syncing an offline kiosk backlog: one POST /api/orders per order vs one batch.
+
+Boots the app on a scratch SQLite database with the setup.sql menu and, as
+a guest session, places the same number of random orders through
+POST /api/orders and through POST /api/orders/batch. Reports wall time,
+HTTP requests, SQL statements and commits for each, then replays the batch
+to show that a resend creates nothing. Run from the backend directory:
+
+    python benchmarks/kiosk_sync.py --orders 300
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=300, help='orders in the backlog')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    scratch = tempfile.NamedTemporaryFile(suffix='.sqlite', delete=False)
+    scratch.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{scratch.name}'
+    os.environ.setdefault('ORDER_SCHEDULER_ENABLED', 'False')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    from sqlalchemy import event, insert
+    from sqlalchemy.orm import Session
+    from app import create_app
+    from bootstrap import bootstrap, load_setup_menu
+    from models import db, FoodItem
+    from passwords import hasher
+    from profiling import profiler
+
+    commits = [0]
+
+    def count_commit(session):
+        commits[0] += 1
+
+    event.listen(Session, 'after_commit', count_commit)
+    rng = random.Random(args.seed)
+    app = create_app()
+    try:
+        bootstrap(app)
+        menu = load_setup_menu()
+        with app.app_context():
+            db.session.execute(insert(FoodItem), menu)
+            db.session.commit()
+        food_ids = [item['id'] for item in menu if not item['is_reward']]
+        kiosk = app.test_client()
+        kiosk.post('/api/guest/access')
+
+        def backlog(prefix):
+            return [{
+                'client_id': f'{prefix}-{number}',
+                'items': [{'foodId': food_id, 'quantity': rng.randint(1, 3)} for food_id in rng.sample(food_ids, rng.randint(1, 3))],
+                'payment_method': 'cash'
+            } for number in range(args.orders)]
+
+        def single(orders):
+            created = 0
+            for order in orders:
+                response = kiosk.post('/api/orders', json=order, headers={'Idempotency-Key': order['client_id']})
+                created += response.status_code == 201 and response.headers.get('Idempotent-Replayed') is None
+            return len(orders), created
+
+        def batch(orders):
+            response = kiosk.post('/api/orders/batch', json={'orders': orders})
+            return 1, response.get_json()['created']
+
+        batch_orders = backlog('batch')
+        runs = (('single', single, backlog('single')), ('batch', batch, batch_orders), ('replay', batch, batch_orders))
+        print(f'{"method":8} {"created":>7} {"requests":>8} {"ms":>8} {"statements":>10} {"commits":>7}')
+        for name, run, orders in runs:
+            statements_before = sum(stats[3] for stats in profiler.snapshot().values())
+            commits_before = commits[0]
+            started = time.perf_counter()
+            requests, created = run(orders)
+            elapsed = time.perf_counter() - started
+            statements = sum(stats[3] for stats in profiler.snapshot().values()) - statements_before
+            print(f'{name:8} {created:7} {requests:8} {elapsed * 1000:8.1f} {statements:10} {commits[0] - commits_before:7}')
+    finally:
+        hasher.shutdown()
+        os.unlink(scratch.name)
+
+if __name__ == '__main__':
+    main()
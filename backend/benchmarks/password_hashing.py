@@ -0,0 +1,63 @@
+"""Password verification throughput under different hashing settings.
+
+Run from the backend directory:
+
+    python benchmarks/password_hashing.py --seconds 5 --threads 8
+
+For each method and pool size it reports logins/sec overall and per core
+used (pool size, or one core when verifying inline).
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+from passwords import PasswordHasher
+
+DEFAULT_METHODS = ['scrypt:32768:8:1', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000']
+
+def measure(method, workers, threads, seconds):
+    hasher = PasswordHasher(method=method, workers=workers, concurrency=max(threads, 1), timeout=60)
+    password_hash = generate_password_hash('Password123!', method)
+    hasher.verify(password_hash, 'Password123!')
+    count = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        while time.perf_counter() < deadline:
+            hasher.verify(password_hash, 'Password123!')
+            with lock:
+                count[0] += 1
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+    rate = count[0] / elapsed
+    return rate, rate / max(workers, 1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, os.cpu_count() or 1])
+    parser.add_argument('--methods', nargs='+', default=DEFAULT_METHODS)
+    args = parser.parse_args()
+
+    print(f"{'method':<24} {'pool':>4} {'logins/s':>10} {'per core':>10}")
+    for method in args.methods:
+        for workers in sorted(set(args.workers)):
+            rate, per_core = measure(method, workers, args.threads, args.seconds)
+            print(f"{method:<24} {workers:>4} {rate:>10.1f} {per_core:>10.1f}")
+
+if __name__ == '__main__':
+    main()
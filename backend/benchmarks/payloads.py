@@ -0,0 +1,104 @@
+"""Bytes on the wire and encode time for the admin order lists.
+
+Seeds a scratch SQLite database the same way as api_load.py, loads the
+active-orders list and a page of past orders in the full and compact views,
+and for each reports the JSON size raw, gzipped and (with Brotli installed)
+brotli-compressed, plus the time to encode it with Flask's default JSON
+provider, with FastJSONProvider and to compress it. Run from the backend
+directory:
+
+    python benchmarks/payloads.py --orders 20000 --active 200 --page 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compression import brotli
+
+def best_time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def gzip_bytes(data):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--active', type=int, default=200, help='orders left current/ready')
+    parser.add_argument('--page', type=int, default=200, help='past orders page size')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    scratch = tempfile.NamedTemporaryFile(suffix='.sqlite', delete=False)
+    scratch.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{scratch.name}'
+    os.environ.setdefault('ORDER_SCHEDULER_ENABLED', 'False')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    import api_load
+    from flask.json.provider import DefaultJSONProvider
+    from app import create_app
+    from bootstrap import bootstrap
+    from json_provider import FastJSONProvider, orjson
+    from models import Order
+    from order_queries import fetch_order_dicts, fetch_past_orders_page
+    from passwords import hasher
+
+    api_load.ACTIVE_ORDERS = args.active
+    app = create_app()
+    try:
+        bootstrap(app)
+        api_load.seed(app, args, random.Random(args.seed))
+        with app.app_context():
+            providers = [('flask default', DefaultJSONProvider(app)), ('fast', FastJSONProvider(app))]
+            lists = []
+            for compact in (False, True):
+                view = 'compact' if compact else 'full'
+                active = fetch_order_dicts(
+                    Order.status.in_(['current', 'ready']),
+                    order_by=(Order.order_time.desc(),),
+                    include_user_name=True,
+                    compact=compact
+                )
+                past, _ = fetch_past_orders_page(args.page, compact=compact)
+                lists.append((f'active {view}', {'orders': active, 'removed_ids': [], 'full': True}))
+                lists.append((f'past {view}', {'orders': past, 'next_cursor': None}))
+
+            print(f'json encoder: {"orjson" if orjson is not None else "stdlib"}, '
+                  f'brotli: {"yes" if brotli is not None else "not installed"}\n')
+            print(f'{"payload":15} {"raw KB":>8} {"gzip KB":>8} {"br KB":>7} '
+                  f'{"default ms":>10} {"fast ms":>8} {"gzip ms":>8} {"br ms":>6}')
+            for name, payload in lists:
+                encode_ms = []
+                for _, provider in providers:
+                    elapsed, body = best_time(lambda: provider.dumps(payload), args.repeat)
+                    encode_ms.append(elapsed * 1000)
+                body = body.encode('utf-8')
+                gzip_time, gzipped = best_time(lambda: gzip_bytes(body), args.repeat)
+                br_kb = br_ms = '-'
+                if brotli is not None:
+                    br_time, compressed = best_time(lambda: brotli.compress(body, quality=4), args.repeat)
+                    br_kb, br_ms = f'{len(compressed) / 1024:.1f}', f'{br_time * 1000:.2f}'
+                print(f'{name:15} {len(body) / 1024:8.1f} {len(gzipped) / 1024:8.1f} {br_kb:>7} '
+                      f'{encode_ms[0]:10.2f} {encode_ms[1]:8.2f} {gzip_time * 1000:8.2f} {br_ms:>6}')
+    finally:
+        hasher.shutdown()
+        os.unlink(scratch.name)
+
+if __name__ == '__main__':
+    main()
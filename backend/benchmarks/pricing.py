@@ -0,0 +1,99 @@
+"""Order pricing speed through the price table, cross-checked against plain Decimal math.
+
+Boots the app on a scratch SQLite database with the setup.sql menu and
+prices random carts with price_order(cart, price_table.items()), the path
+create_order takes, then with the Decimal reference in
+tests/pricing_reference.py. It runs once on the menu prices and once after
+another "worker" moves every price to an odd paisa amount and bumps the
+menu version. Reports time and SQL statements per order, and fails if any
+cart prices differently. Run from the backend directory:
+
+    python benchmarks/pricing.py --carts 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.append(os.path.join(BACKEND_DIR, 'tests'))
+
+REWARD_ID = 101
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--carts', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    scratch = tempfile.NamedTemporaryFile(suffix='.sqlite', delete=False)
+    scratch.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{scratch.name}'
+    os.environ.setdefault('ORDER_SCHEDULER_ENABLED', 'False')
+    os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+    from sqlalchemy import case, event, insert, select, update
+    from app import create_app
+    from bootstrap import bootstrap, load_setup_menu
+    from menu_cache import menu_cache
+    from models import db, FoodItem
+    from passwords import hasher
+    from pricing import price_order, price_table
+    from pricing_reference import paisa_prices, random_cart, reference_price
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    statements = [0]
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    mismatches = 0
+    try:
+        bootstrap(app)
+        with app.app_context():
+            db.session.execute(insert(FoodItem), load_setup_menu())
+            db.session.commit()
+            event.listen(db.engine, 'before_cursor_execute', count_statement)
+            for label in ('menu prices', 'paisa prices'):
+                prices = dict(db.session.execute(select(FoodItem.id, FoodItem.price)).all())
+                if label == 'paisa prices':
+                    # What another worker's menu edit looks like to this one
+                    prices = paisa_prices(prices, rng)
+                    db.session.execute(update(FoodItem).values(price=case(prices, value=FoodItem.id)))
+                    menu_cache.bump()
+                    db.session.commit()
+                    menu_cache.invalidate()
+                regular = [food_id for food_id in prices if food_id < REWARD_ID]
+                carts = [random_cart(rng, regular, reward_id=REWARD_ID) for _ in range(args.carts)]
+
+                statements_before = statements[0]
+                started = time.perf_counter()
+                quotes = [price_order(cart, price_table.items(), rewards={REWARD_ID}) for cart in carts]
+                table_time = time.perf_counter() - started
+                table_statements = statements[0] - statements_before
+
+                started = time.perf_counter()
+                expected = [reference_price(cart, prices) for cart in carts]
+                reference_time = time.perf_counter() - started
+
+                for cart, quote, reference in zip(carts, quotes, expected):
+                    if any(quote[key] != reference[key] for key in reference):
+                        mismatches += 1
+                        if mismatches <= 5:
+                            print('mismatch:', cart, {key: quote[key] for key in reference}, reference)
+
+                print(f'{label:<13} price_table {table_time / args.carts * 1e6:7.2f} us/order '
+                      f'({table_statements} statements)   Decimal reference {reference_time / args.carts * 1e6:7.2f} us/order')
+    finally:
+        hasher.shutdown()
+        os.unlink(scratch.name)
+
+    print(f'{mismatches} mismatches')
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
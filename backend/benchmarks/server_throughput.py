@@ -0,0 +1,55 @@
+"""Requests/sec and latency for one endpoint of a running server.
+
+Start the server under test, then run from the backend directory:
+
+    python benchmarks/server_throughput.py --url http://127.0.0.1:5000/api/food-items
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', required=True)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def worker():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(args.url) as response:
+                    response.read()
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    count = len(latencies)
+    print(f'requests:   {count} ({errors[0]} errors)')
+    print(f'throughput: {count / elapsed:.1f} req/s')
+    if count:
+        print(f'latency:    p50 {statistics.median(latencies) * 1000:.1f} ms, '
+              f'p95 {latencies[int(count * 0.95) - 1] * 1000:.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Cold-start time of importing the app and calling create_app().
+
+Each run is a fresh interpreter, so module imports are included. Run from
+the backend directory:
+
+    python benchmarks/startup.py --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+created = time.perf_counter()
+print(imported - started, created - imported)
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    import_times = []
+    create_times = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.split()
+        import_times.append(float(output[0]))
+        create_times.append(float(output[1]))
+
+    print(f'import:     median {statistics.median(import_times) * 1000:.1f} ms')
+    print(f'create_app: median {statistics.median(create_times) * 1000:.1f} ms')
+    total = [a + b for a, b in zip(import_times, create_times)]
+    print(f'total:      median {statistics.median(total) * 1000:.1f} ms, max {max(total) * 1000:.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+import os
+import re
+from decimal import Decimal
+from sqlalchemy import inspect, select, text
+from app import create_app
+from models import db, User, Admin, Order, SalesRollup
+from passwords import hasher
+from rollups import rebuild_rollups
+from images import fingerprint_menu_images, image_store
+
+# Columns added after the first release: (table, column, statements to add it)
+COLUMN_UPGRADES = [
+    ('orders', 'guest_id', [
+        'ALTER TABLE orders MODIFY user_id INT NULL',
+        'ALTER TABLE orders ADD COLUMN guest_id VARCHAR(20) NULL',
+    ]),
+    ('orders', 'idempotency_key', [
+        'ALTER TABLE orders ADD COLUMN idempotency_key VARCHAR(64) NULL',
+        'CREATE UNIQUE INDEX idx_orders_idempotency_key ON orders(idempotency_key)',
+    ]),
+]
+
+def upgrade_schema():
+    # create_all() only creates missing tables; bring older ones up to date
+    inspector = inspect(db.engine)
+    for table, column, statements in COLUMN_UPGRADES:
+        columns = {existing['name'] for existing in inspector.get_columns(table)}
+        if column in columns:
+            continue
+        with db.engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+
+# Foreign keys dropped since the first release: (table, column)
+FOREIGN_KEY_DROPS = [
+    ('points_ledger', 'order_id'),
+]
+
+def drop_foreign_keys():
+    # SQLite can't drop constraints but doesn't enforce them by default either
+    if db.engine.dialect.name == 'sqlite':
+        return
+    inspector = inspect(db.engine)
+    for table, column in FOREIGN_KEY_DROPS:
+        for foreign_key in inspector.get_foreign_keys(table):
+            if foreign_key['constrained_columns'] == [column] and foreign_key.get('name'):
+                with db.engine.begin() as connection:
+                    connection.execute(text(f"ALTER TABLE {table} DROP FOREIGN KEY {foreign_key['name']}"))
+
+def existing_index_columns(inspector, table):
+    indexed = [index['column_names'] for index in inspector.get_indexes(table)]
+    indexed += [constraint['column_names'] for constraint in inspector.get_unique_constraints(table)]
+    indexed.append(inspector.get_pk_constraint(table)['constrained_columns'])
+    return {tuple(columns) for columns in indexed}
+
+def create_missing_indexes():
+    # create_all() skips tables that already exist, so their newer indexes are
+    # added here. Matching is by column list, not name, so an index created
+    # under another name (setup.sql, an earlier upgrade) counts as present.
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = existing_index_columns(inspector, table.name)
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            columns = tuple(column.name for column in index.columns)
+            if columns in existing:
+                continue
+            index.create(bind=db.engine)
+            existing.add(columns)
+            created.append(index.name)
+    return created
+
+SETUP_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'setup.sql')
+
+def load_setup_menu():
+    """The food_items rows setup.sql seeds, for scratch databases that don't run it."""
+    with open(SETUP_SQL) as setup:
+        sql = setup.read()
+    rows = re.findall(r"\((\d+), '([^']+)', ([\d.]+), '([^']*)', (TRUE|FALSE)\)", sql)
+    return [
+        {'id': int(food_id), 'name': name, 'price': Decimal(price), 'image_path': image,
+         'has_extra_option': extra == 'TRUE', 'is_reward': int(food_id) >= 101}
+        for food_id, name, price, image, extra in rows
+    ]
+
+def bootstrap(app):
+    with app.app_context():
+        db.create_all()
+        upgrade_schema()
+        drop_foreign_keys()
+        create_missing_indexes()
+        # Rollups start empty on an existing database; backfill them once
+        has_rollups = db.session.execute(select(SalesRollup.day).limit(1)).first()
+        if not has_rollups and db.session.execute(select(Order.id).limit(1)).first():
+            rebuild_rollups()
+        test_user = User.query.filter_by(email='testuser@gmail.com').first()
+        if not test_user:
+            test_user = User(
+                first_name='Test',
+                last_name='User',
+                email='testuser@gmail.com',
+                mobile='7894561230',
+                points=13
+            )
+            test_user.set_password('Password123!')
+            db.session.add(test_user)
+            db.session.commit()
+        test_admin = Admin.query.filter_by(username='admin').first()
+        if not test_admin:
+            test_admin = Admin(
+                username='admin',
+                full_name='System Administrator',
+                role='super_admin'
+            )
+            test_admin.set_password('Admin123!')
+            db.session.add(test_admin)
+            db.session.commit()
+        fingerprint_menu_images()
+        image_store.sweep()
+
+if __name__ == '__main__':
+    bootstrap(create_app())
+    hasher.shutdown()
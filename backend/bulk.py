@@ -0,0 +1,152 @@
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import case, delete, select, update
+from models import db, Order, FoodItem
+from rollups import record_orders_completed, record_orders_reopened
+
+ORDER_STATUSES = ('current', 'ready', 'completed')
+MAX_BULK_ENTRIES = 500
+
+class BulkRequestError(Exception):
+    pass
+
+def parse_entries(entries):
+    """Checks the shape of a bulk body: a list of objects that each carry an integer id."""
+    if not isinstance(entries, list) or not entries:
+        raise BulkRequestError('A non-empty list of changes is required')
+    if len(entries) > MAX_BULK_ENTRIES:
+        raise BulkRequestError(f'At most {MAX_BULK_ENTRIES} changes per request')
+    for entry in entries:
+        if not isinstance(entry, dict) or not _is_int(entry.get('id')):
+            raise BulkRequestError('Every change needs an integer id')
+    return entries
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _claim(results, entry_id, error=None):
+    # An id may appear once per request; every later copy voids the first
+    if entry_id in results:
+        results[entry_id] = {'id': entry_id, 'error': 'duplicate'}
+        return False
+    results[entry_id] = {'id': entry_id, 'error': error} if error else None
+    return error is None
+
+def apply_order_statuses(entries, now):
+    """Moves orders to new statuses with one UPDATE per (old, new) status pair.
+
+    Stamps ready_time on current -> ready and completed_time on any move to
+    completed, like the single-order endpoint; moving an order out of
+    completed clears completed_time and takes it back out of the completion
+    rollup. Returns the per-id results (in request order) and the ids that
+    changed; the caller commits.
+    """
+    results = {}
+    wanted = {}
+    for entry in entries:
+        status = entry.get('status')
+        if _claim(results, entry['id'], None if status in ORDER_STATUSES else 'invalid_status'):
+            wanted[entry['id']] = status
+    wanted = {order_id: status for order_id, status in wanted.items() if results[order_id] is None}
+    current = {}
+    if wanted:
+        current = {row.id: row for row in db.session.execute(
+            select(Order.id, Order.status, Order.completed_time).where(Order.id.in_(list(wanted))).with_for_update()
+        )}
+    groups = defaultdict(list)
+    for order_id, status in wanted.items():
+        previous = current[order_id].status if order_id in current else None
+        if previous is None:
+            results[order_id] = {'id': order_id, 'error': 'not_found'}
+        elif previous == status:
+            results[order_id] = {'id': order_id, 'status': status, 'result': 'unchanged'}
+        else:
+            groups[(previous, status)].append(order_id)
+            results[order_id] = {'id': order_id, 'status': status, 'previous': previous, 'result': 'updated'}
+    changed = []
+    completed = 0
+    reopened = []
+    for (previous, status), order_ids in groups.items():
+        values = {'status': status, 'updated_at': now}
+        if previous == 'current' and status == 'ready':
+            values['ready_time'] = now
+        if status == 'completed':
+            values['completed_time'] = now
+            completed += len(order_ids)
+        elif previous == 'completed':
+            values['completed_time'] = None
+            reopened += [current[order_id].completed_time for order_id in order_ids]
+        db.session.execute(
+            update(Order).where(Order.id.in_(order_ids), Order.status == previous).values(**values)
+        )
+        changed += order_ids
+    record_orders_reopened(reopened)
+    if completed:
+        record_orders_completed(completed, now)
+    return list(results.values()), changed
+
+def _menu_change_error(entry):
+    fields = set(entry) - {'id'}
+    if entry.get('delete') is True:
+        return None if fields == {'delete'} else 'invalid_change'
+    if not fields or not fields <= {'price', 'is_available'}:
+        return 'invalid_change'
+    if 'price' in entry and (not _is_number(entry['price']) or entry['price'] <= 0):
+        return 'invalid_price'
+    if 'is_available' in entry and not isinstance(entry['is_available'], bool):
+        return 'invalid_availability'
+    return None
+
+def apply_menu_changes(entries, now):
+    """Applies price and availability edits and deletions to many menu items.
+
+    Each kind of change is one statement: prices and availability are set
+    through a CASE on the id. Returns the per-id results and the image paths
+    of deleted items, to be released once the caller has committed.
+    """
+    results = {}
+    wanted = {}
+    for entry in entries:
+        if _claim(results, entry['id'], _menu_change_error(entry)):
+            wanted[entry['id']] = entry
+    wanted = {item_id: entry for item_id, entry in wanted.items() if results[item_id] is None}
+    image_paths = {}
+    if wanted:
+        image_paths = dict(db.session.execute(
+            select(FoodItem.id, FoodItem.image_path).where(FoodItem.id.in_(list(wanted)))
+        ).all())
+    prices = {}
+    availability = {}
+    deleted = []
+    for item_id, entry in wanted.items():
+        if item_id not in image_paths:
+            results[item_id] = {'id': item_id, 'error': 'not_found'}
+            continue
+        if entry.get('delete'):
+            deleted.append(item_id)
+            results[item_id] = {'id': item_id, 'result': 'deleted'}
+            continue
+        if 'price' in entry:
+            prices[item_id] = Decimal(str(entry['price'])).quantize(Decimal('0.01'))
+        if 'is_available' in entry:
+            availability[item_id] = entry['is_available']
+        results[item_id] = {'id': item_id, 'result': 'updated'}
+    if prices:
+        db.session.execute(
+            update(FoodItem)
+            .where(FoodItem.id.in_(list(prices)))
+            .values(price=case(prices, value=FoodItem.id), updated_at=now)
+        )
+    if availability:
+        db.session.execute(
+            update(FoodItem)
+            .where(FoodItem.id.in_(list(availability)))
+            .values(is_available=case(availability, value=FoodItem.id), updated_at=now)
+        )
+    if deleted:
+        db.session.execute(delete(FoodItem).where(FoodItem.id.in_(deleted)))
+    released = {image_paths[item_id] for item_id in deleted if image_paths[item_id]}
+    return list(results.values()), released
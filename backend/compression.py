@@ -0,0 +1,117 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is offered without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/plain',
+    'text/html',
+    'text/css',
+    'text/csv',
+    'image/svg+xml',
+)
+
+class _Encoder:
+    def __init__(self, name, level):
+        self.name = name
+        if name == 'br':
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            # wbits 16 + MAX_WBITS writes the gzip header and trailer
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        if self.name == 'br':
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def finish(self):
+        if self.name == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+class ResponseCompressor:
+    """Negotiated gzip/brotli Content-Encoding for API responses.
+
+    Bodies smaller than COMPRESSION_MIN_BYTES are sent as they are: below
+    about a packet, compressing costs more CPU than it saves on the wire.
+    Streamed JSON (the past-orders export) is compressed as it is produced;
+    event streams and files sent with send_file are left alone.
+    """
+
+    def __init__(self):
+        self.configure()
+
+    def init_app(self, app):
+        self.configure(
+            enabled=app.config.get('COMPRESSION_ENABLED', True),
+            min_bytes=app.config.get('COMPRESSION_MIN_BYTES', 1024),
+            gzip_level=app.config.get('COMPRESSION_GZIP_LEVEL', 6),
+            brotli_quality=app.config.get('COMPRESSION_BROTLI_QUALITY', 4)
+        )
+        if self.enabled:
+            app.after_request(self.after_request)
+
+    def configure(self, enabled=True, min_bytes=1024, gzip_level=6, brotli_quality=4):
+        self.enabled = enabled
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoding(self, accept_encodings):
+        offered = [('br', self.brotli_quality)] if brotli is not None else []
+        offered.append(('gzip', self.gzip_level))
+        best = None
+        best_quality = 0
+        for name, level in offered:
+            # Earlier entries win ties, so br is preferred over gzip at equal q
+            quality = accept_encodings[name]
+            if quality > best_quality:
+                best, best_quality = (name, level), quality
+        return best
+
+    def after_request(self, response):
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        if not response.is_streamed and response.calculate_content_length() < self.min_bytes:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+        encoder = _Encoder(*encoding)
+        if response.is_streamed:
+            response.response = self._compress_stream(response.response, encoder)
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(encoder.compress(response.get_data()) + encoder.finish())
+        response.headers['Content-Encoding'] = encoder.name
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # The compressed bytes differ from the ones the strong tag names
+            response.set_etag(etag, weak=True)
+        return response
+
+    @staticmethod
+    def _compress_stream(chunks, encoder):
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                data = encoder.compress(chunk)
+                if data:
+                    yield data
+            yield encoder.finish()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+compressor = ResponseCompressor()
@@ -24,3 +24,30 @@ class Config:
     DB_NAME = os.environ.get('DB_NAME', os.environ.get('MYSQL_DATABASE', 'ready_to_eat'))
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     FLASK_ENV = os.environ.get('FLASK_ENV', 'development')
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+    PASSWORD_HASH_CONCURRENCY = int(os.environ.get('PASSWORD_HASH_CONCURRENCY', '4'))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', '10'))
+    MENU_CACHE_TTL = float(os.environ.get('MENU_CACHE_TTL', '5'))
+    ORDER_SCHEDULER_ENABLED = os.environ.get('ORDER_SCHEDULER_ENABLED', 'True').lower() == 'true'
+    KITCHEN_STATIONS = int(os.environ.get('KITCHEN_STATIONS', '2'))
+    ETA_MIN_MINUTES = int(os.environ.get('ETA_MIN_MINUTES', '10'))
+    ETA_DEFAULT_ITEM_MINUTES = float(os.environ.get('ETA_DEFAULT_ITEM_MINUTES', '4'))
+    ETA_RESYNC_SECONDS = float(os.environ.get('ETA_RESYNC_SECONDS', '30'))
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'True').lower() == 'true'
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    PROFILE_HEADER_ENABLED = os.environ.get('PROFILE_HEADER_ENABLED', 'False').lower() == 'true'
+    ORDER_ARCHIVE_AFTER_DAYS = int(os.environ.get('ORDER_ARCHIVE_AFTER_DAYS', '90'))
+    IMAGE_STORAGE_DIR = os.environ.get('IMAGE_STORAGE_DIR')
+    IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', str(5 * 1024 * 1024)))
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '1'))
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'True').lower() == 'true'
+    COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+    ORDER_STREAM_MAX = int(os.environ.get('ORDER_STREAM_MAX', '4'))
+    ORDER_FEED_ENABLED = os.environ.get('ORDER_FEED_ENABLED', 'True').lower() == 'true'
+    ORDER_FEED_INTERVAL = float(os.environ.get('ORDER_FEED_INTERVAL', '1'))
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', '5'))
\ No newline at end of file
@@ -0,0 +1,147 @@
+import math
+import threading
+import time
+from datetime import timezone
+from sqlalchemy import select
+from models import db, Order, OrderItem
+
+LEARNING_RATE = 0.1
+MIN_RATIO = 0.25
+MAX_RATIO = 4.0
+HISTORY_ORDERS = 500
+
+class KitchenEta:
+    """Estimates ready times from the current kitchen queue.
+
+    Each order's work is the sum of its items' learned prep minutes; the
+    kitchen works through the queued work on KITCHEN_STATIONS stations in
+    parallel. The queue is a running total kept in memory, so an estimate
+    costs O(items in the order). When an order is marked ready, the prep
+    times of its items move toward what was actually observed. Every
+    ETA_RESYNC_SECONDS the queue is reloaded from the active orders, which
+    also picks up orders placed on other workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._item_minutes = {}
+        self._queue = {}
+        self._queued_work = 0.0
+        self._synced_at = None
+        self.configure()
+
+    def init_app(self, app):
+        self.configure(
+            stations=app.config.get('KITCHEN_STATIONS', 2),
+            min_minutes=app.config.get('ETA_MIN_MINUTES', 10),
+            default_item_minutes=app.config.get('ETA_DEFAULT_ITEM_MINUTES', 4),
+            resync_seconds=app.config.get('ETA_RESYNC_SECONDS', 30)
+        )
+
+    def configure(self, stations=2, min_minutes=10, default_item_minutes=4, resync_seconds=30):
+        self.stations = stations
+        self.min_minutes = min_minutes
+        self.default_item_minutes = default_item_minutes
+        self.resync_seconds = resync_seconds
+
+    def _work(self, lines):
+        return sum(self._item_minutes.get(food_id, self.default_item_minutes) * quantity for food_id, quantity in lines)
+
+    def estimate(self, lines):
+        self._maybe_resync()
+        with self._lock:
+            work = self._work(lines)
+            minutes = math.ceil((self._queued_work + work) / self.stations)
+        return max(self.min_minutes, minutes)
+
+    def estimate_many(self, orders_lines):
+        """Estimates for orders arriving together, each queued behind the ones before it."""
+        self._maybe_resync()
+        estimates = []
+        with self._lock:
+            queued = self._queued_work
+            for lines in orders_lines:
+                queued += self._work(lines)
+                estimates.append(max(self.min_minutes, math.ceil(queued / self.stations)))
+        return estimates
+
+    def add(self, order_id, lines, estimated_minutes):
+        with self._lock:
+            if order_id in self._queue:
+                return
+            work = self._work(lines)
+            self._queue[order_id] = (work, estimated_minutes, lines)
+            self._queued_work += work
+
+    def finish(self, order_id, actual_minutes=None):
+        with self._lock:
+            entry = self._queue.pop(order_id, None)
+            if entry is None:
+                return
+            work, estimated_minutes, lines = entry
+            self._queued_work = max(0.0, self._queued_work - work)
+            if actual_minutes is not None:
+                self._learn(lines, estimated_minutes, actual_minutes)
+
+    def _learn(self, lines, estimated_minutes, actual_minutes):
+        if not estimated_minutes or actual_minutes <= 0:
+            return
+        ratio = min(MAX_RATIO, max(MIN_RATIO, actual_minutes / estimated_minutes))
+        for food_id, _ in lines:
+            current = self._item_minutes.get(food_id, self.default_item_minutes)
+            self._item_minutes[food_id] = current + LEARNING_RATE * (current * ratio - current)
+
+    def _maybe_resync(self):
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.resync_seconds:
+            return
+        if self._synced_at is None:
+            self._learn_history()
+        self._synced_at = now
+        self.resync()
+
+    def _order_lines(self, order_ids):
+        lines = {order_id: [] for order_id in order_ids}
+        if order_ids:
+            rows = db.session.execute(
+                select(OrderItem.order_id, OrderItem.food_id, OrderItem.quantity).where(OrderItem.order_id.in_(order_ids))
+            )
+            for row in rows:
+                lines[row.order_id].append((row.food_id, row.quantity))
+        return lines
+
+    def _learn_history(self):
+        history = db.session.execute(
+            select(Order.id, Order.order_time, Order.ready_time, Order.estimated_time)
+            .where(Order.ready_time.isnot(None))
+            .order_by(Order.id.desc())
+            .limit(HISTORY_ORDERS)
+        ).all()
+        lines = self._order_lines([row.id for row in history])
+        with self._lock:
+            for row in reversed(history):
+                actual_minutes = (row.ready_time - row.order_time).total_seconds() / 60
+                self._learn(lines[row.id], row.estimated_time, actual_minutes)
+
+    def resync(self):
+        active = db.session.execute(
+            select(Order.id, Order.estimated_time).where(Order.status == 'current')
+        ).all()
+        lines = self._order_lines([row.id for row in active])
+        with self._lock:
+            self._queue = {}
+            self._queued_work = 0.0
+            for row in active:
+                work = self._work(lines[row.id])
+                self._queue[row.id] = (work, row.estimated_time, lines[row.id])
+                self._queued_work += work
+
+def order_minutes(order):
+    if not order.ready_time or not order.order_time:
+        return None
+    ready_time = order.ready_time
+    if ready_time.tzinfo is not None:
+        ready_time = ready_time.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ready_time - order.order_time).total_seconds() / 60
+
+kitchen_eta = KitchenEta()
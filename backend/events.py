@@ -0,0 +1,192 @@
+import json
+import queue
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from models import db, Order
+from order_queries import fetch_order_dicts
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 100
+# Transactions can commit a little after they stamp updated_at; each poll looks back this far
+FEED_OVERLAP = timedelta(seconds=5)
+
+class TooManyStreams(Exception):
+    pass
+
+class Subscription:
+    def __init__(self, user_id=None, guest_id=None):
+        self.user_id = user_id
+        self.guest_id = guest_id
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def wants(self, order):
+        if self.guest_id is not None:
+            return order.get('guest_id') == self.guest_id
+        return self.user_id is None or order.get('user_id') == self.user_id
+
+class OrderEventHub:
+    """In-memory fan-out of order events to the streams open on this worker.
+
+    Publishers serialize an order once; every matching subscriber gets the
+    same payload on its own bounded queue. A subscriber that stops reading
+    loses events rather than holding up the publisher. OrderChangeFeed
+    brings in changes made on other workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self.configure()
+
+    def init_app(self, app):
+        self.configure(max_streams=app.config.get('ORDER_STREAM_MAX', 4))
+
+    def configure(self, max_streams=4):
+        # Every open stream holds a server thread, so a worker only takes this many
+        self.max_streams = max_streams
+
+    def subscribe(self, user_id=None, guest_id=None):
+        subscription = Subscription(user_id=user_id, guest_id=guest_id)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_streams:
+                raise TooManyStreams()
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def publish(self, event_type, order):
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if s.wants(order)]
+        if not subscriptions:
+            return
+        message = format_event(event_type, order)
+        for subscription in subscriptions:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                pass
+
+    def stream(self, subscription):
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    yield subscription.queue.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+        finally:
+            self.unsubscribe(subscription)
+
+def format_event(event_type, data):
+    return f'event: {event_type}\ndata: {json.dumps(data)}\n\n'
+
+class OrderChangeFeed:
+    """Feeds this worker's hub from orders.updated_at.
+
+    The hub only reaches streams open on its own worker, so each worker runs
+    one thread that looks for orders updated since its last poll, about once
+    a second while any stream is open, and publishes each change once. The
+    thread starts with the first stream; publish_orders wakes it so changes
+    made on this worker go out without waiting for the next poll.
+    """
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.app = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._since = None
+        self._seen = {}
+        self.configure()
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['order_feed'] = self
+        self.configure(
+            enabled=app.config.get('ORDER_FEED_ENABLED', True),
+            interval=app.config.get('ORDER_FEED_INTERVAL', 1.0)
+        )
+
+    def configure(self, enabled=True, interval=1.0):
+        self.enabled = enabled
+        self.interval = interval
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def ensure_started(self):
+        if not self.enabled or self.app is None or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._since = datetime.utcnow()
+            self._thread = threading.Thread(target=self._run, name='order-change-feed', daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self.hub.has_subscribers():
+                # Nobody to tell; don't replay the idle stretch when a stream opens again
+                self._since = datetime.utcnow()
+                continue
+            try:
+                with self.app.app_context():
+                    self.poll()
+            except Exception:
+                pass
+
+    def poll(self, now=None):
+        now = now or datetime.utcnow()
+        since = self._since - FEED_OVERLAP
+        rows = db.session.execute(
+            select(Order.id, Order.status, Order.created_at, Order.updated_at).where(Order.updated_at >= since)
+        ).all()
+        # Overlapping windows return the same change again; status is part of
+        # the key because updated_at may only have whole seconds
+        seen = {key: updated_at for key, updated_at in self._seen.items() if updated_at >= since}
+        known = {order_id for order_id, _, _ in seen}
+        changed = {}
+        for row in rows:
+            key = (row.id, row.status, row.updated_at)
+            if key not in seen:
+                seen[key] = row.updated_at
+                created = row.id not in known and row.created_at is not None and row.created_at >= since
+                changed[row.id] = 'order_created' if created else 'order_status'
+        self._seen = seen
+        self._since = now
+        if changed:
+            for order in fetch_order_dicts(Order.id.in_(list(changed)), include_user_name=True):
+                self.hub.publish(changed[order['id']], order)
+        return list(changed)
+
+hub = OrderEventHub()
+feed = OrderChangeFeed(hub)
+
+def publish_orders(event_type, order_ids):
+    if not order_ids or not hub.has_subscribers():
+        return
+    if feed.running:
+        # The feed reads the change back from the orders table, like every other worker's feed
+        feed.wake()
+        return
+    try:
+        orders = fetch_order_dicts(Order.id.in_(order_ids), include_user_name=True)
+    except Exception:
+        return
+    for order in orders:
+        hub.publish(event_type, order)
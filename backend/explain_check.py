@@ -0,0 +1,88 @@
+"""EXPLAINs the hot queries in routes.py and fails if one stops using an index.
+
+A query fails when the plan reads a table in full, or sorts rows outside an
+index (a filesort, or a temp B-tree on SQLite). Queries whose result is
+bounded by the active orders or a reporting range may sort. Run it against
+a database that has representative data, for example after the seed step
+of benchmarks/api_load.py:
+
+    python explain_check.py
+"""
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from app import create_app
+from models import db, User, Order, OrderItem, SalesRollup, ItemSalesRollup
+from order_queries import ARCHIVE, ORDER_COLUMNS, ORDER_ITEM_COLUMNS, PAST_ORDER_ORDERING, completed_before, past_order_ordering
+
+def with_user_name(stmt, order=Order):
+    return stmt.add_columns(User.first_name, User.last_name).outerjoin(User, order.user_id == User.id)
+
+def hot_queries():
+    now = datetime.utcnow()
+    today = now.date()
+    # (name, statement, may sort outside an index)
+    return [
+        ('user orders', select(*ORDER_COLUMNS).where(Order.user_id == 1).order_by(Order.order_time.desc()), False),
+        ('guest orders', select(*ORDER_COLUMNS).where(Order.guest_id == 'guest_1').order_by(Order.order_time.desc()), False),
+        ('single order', select(Order.id).where(Order.id == 1, Order.user_id == 1), False),
+        ('active orders', with_user_name(select(*ORDER_COLUMNS)).where(Order.status.in_(['current', 'ready'])).order_by(Order.order_time.desc()), True),
+        ('orders changed since', with_user_name(select(*ORDER_COLUMNS)).where(Order.updated_at >= now - timedelta(minutes=5)).order_by(Order.order_time.desc()), True),
+        ('past orders', with_user_name(select(*ORDER_COLUMNS)).where(Order.status == 'completed').order_by(*PAST_ORDER_ORDERING).limit(50), False),
+        ('past orders after cursor', with_user_name(select(*ORDER_COLUMNS)).where(Order.status == 'completed', completed_before((now, 1000))).order_by(*PAST_ORDER_ORDERING).limit(50), False),
+        ('archived user orders', select(*ARCHIVE.order_columns).where(ARCHIVE.order.user_id == 1).order_by(ARCHIVE.order.order_time.desc()), False),
+        ('archived past orders after cursor', with_user_name(select(*ARCHIVE.order_columns), ARCHIVE.order)
+            .where(ARCHIVE.order.status == 'completed', completed_before((now, 1000), ARCHIVE.order))
+            .order_by(*past_order_ordering(ARCHIVE.order)).limit(50), False),
+        ('archived order items', select(*ARCHIVE.item_columns).where(ARCHIVE.item.order_id.in_([1, 2, 3])).order_by(ARCHIVE.item.order_id, ARCHIVE.item.id), False),
+        ('order items', select(*ORDER_ITEM_COLUMNS).where(OrderItem.order_id.in_([1, 2, 3])).order_by(OrderItem.order_id, OrderItem.id), False),
+        ('pending orders', select(Order.id, Order.order_time, Order.estimated_time).where(Order.status == 'current'), False),
+        ('idempotent replay', select(Order.id).where(Order.idempotency_key == 'key'), False),
+        ('login', select(User.id).where(User.email == 'testuser@gmail.com'), False),
+        ('reset password', select(User.id).where(User.reset_token == 'token'), False),
+        ('sales report', select(SalesRollup).where(SalesRollup.day >= today - timedelta(days=29), SalesRollup.day <= today).order_by(SalesRollup.day, SalesRollup.hour), False),
+        ('items report', select(ItemSalesRollup.food_id, func.sum(ItemSalesRollup.quantity).label('quantity'))
+            .where(ItemSalesRollup.day >= today - timedelta(days=29), ItemSalesRollup.day <= today)
+            .group_by(ItemSalesRollup.food_id).order_by(func.sum(ItemSalesRollup.quantity).desc()), True),
+    ]
+
+def explain(connection, stmt):
+    compiled = stmt.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + compiled.string, params).all()
+        return [row[-1] for row in rows]
+    rows = connection.exec_driver_sql('EXPLAIN ' + compiled.string, params).mappings().all()
+    return [f"{row['table']}: type={row['type']} key={row['key']} extra={row['Extra']}" for row in rows]
+
+def plan_problems(dialect, plan, may_sort):
+    problems = []
+    for step in plan:
+        if dialect == 'sqlite':
+            if step.startswith('SCAN ') and 'INDEX' not in step and 'SUBQUERY' not in step:
+                problems.append('full scan')
+            if 'TEMP B-TREE' in step and not may_sort:
+                problems.append('sort outside an index')
+        else:
+            if ' type=ALL ' in step or ' type=index ' in step:
+                problems.append('full scan')
+            if 'Using filesort' in step and not may_sort:
+                problems.append('sort outside an index')
+    return problems
+
+def main():
+    app = create_app()
+    failed = 0
+    with app.app_context():
+        with db.engine.connect() as connection:
+            for name, stmt, may_sort in hot_queries():
+                plan = explain(connection, stmt)
+                problems = plan_problems(connection.dialect.name, plan, may_sort)
+                failed += bool(problems)
+                print(f"{'FAIL' if problems else 'ok  '} {name}{': ' + ', '.join(problems) if problems else ''}")
+                for step in plan:
+                    print(f'       {step}')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
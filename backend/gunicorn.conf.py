@@ -0,0 +1,55 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# gthread keeps a thread per open order stream without tying up a whole
+# process; sync suits CPU-bound deployments that don't use the stream.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gthread':
+    workers = int(os.environ.get('WEB_CONCURRENCY', max(2, cpu_count)))
+    threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+else:
+    workers = int(os.environ.get('WEB_CONCURRENCY', cpu_count * 2 + 1))
+    threads = 1
+
+# Each open order stream holds a thread until the page closes; keep at least
+# half of every worker's threads for ordinary requests (sync workers take none)
+os.environ.setdefault('ORDER_STREAM_MAX', str(threads // 2))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'False').lower() == 'true'
+
+# Workers add up their /metrics totals through files in a directory shared by
+# this server's workers only
+metrics_dir_created = 'METRICS_DIR' not in os.environ
+if metrics_dir_created:
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='ready-to-eat-metrics-')
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers periodically so slow leaks can't accumulate
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+def post_fork(server, worker):
+    # With preload_app the master may already hold pooled DB connections;
+    # a forked worker must open its own.
+    if preload_app:
+        from wsgi import app
+        from models import db
+        with app.app_context():
+            db.engine.dispose(close=False)
+
+def on_exit(server):
+    if metrics_dir_created:
+        shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
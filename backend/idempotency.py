@@ -0,0 +1,41 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+class IdempotencyCache:
+    """Bounded, short-lived map of idempotency key -> original response body.
+
+    Only a fast path for retries that land on the same worker; the unique
+    orders.idempotency_key column is what actually guarantees one order per key.
+    """
+
+    def __init__(self, ttl=600, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def scoped_key(owner, key):
+    # Keys are chosen by clients, so scope them to the caller before storing
+    return hashlib.sha256(f'{owner}:{key}'.encode('utf-8')).hexdigest()
+
+idempotency_cache = IdempotencyCache()
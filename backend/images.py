@@ -0,0 +1,303 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it only the original is stored
+    Image = None
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STORAGE_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'frontend', 'public', 'assets')
+PUBLIC_PREFIX = '/assets/'
+CHUNK_SIZE = 64 * 1024
+
+# Variant name -> longest side in pixels
+VARIANTS = {
+    'thumb': 160,
+    'card': 480,
+    'full': 1200,
+}
+WEBP_QUALITY = 80
+# Uploads not yet saved on a menu item have no references; don't delete those
+RELEASE_GRACE_SECONDS = 3600
+
+# Leading bytes of each accepted format -> stored extension
+SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+
+# <sha256>.<ext> for originals, <sha256>-<variant>.webp for variants
+FINGERPRINTED_NAME = re.compile(
+    r'^(?P<fingerprint>[0-9a-f]{64}(?:-(?:' + '|'.join(VARIANTS) + r'))?)\.(?:png|jpg|gif|webp)$'
+)
+LEGACY_DIRS = (
+    DEFAULT_STORAGE_DIR,
+    os.path.join(os.path.dirname(BACKEND_DIR), 'frontend', 'src', 'assets'),
+)
+
+class InvalidImage(Exception):
+    pass
+
+def sniff_extension(head):
+    for signature, extension in SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+class ImageStore:
+    """Content-addressed storage for uploaded menu images.
+
+    An upload is streamed to disk once while it is hashed and is stored as
+    <sha256>.<ext>, so uploading the same picture again reuses the file.
+    WebP variants (see VARIANTS) are rendered on a background thread when
+    Pillow is installed. Files are deleted only once no menu item refers
+    to them.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self.configure()
+
+    def init_app(self, app):
+        self.app = app
+        self.configure(
+            storage_dir=app.config.get('IMAGE_STORAGE_DIR') or DEFAULT_STORAGE_DIR,
+            max_bytes=app.config.get('IMAGE_MAX_BYTES', 5 * 1024 * 1024),
+            workers=app.config.get('IMAGE_WORKERS', 1)
+        )
+
+    def configure(self, storage_dir=DEFAULT_STORAGE_DIR, max_bytes=5 * 1024 * 1024, workers=1):
+        self.storage_dir = storage_dir
+        self.max_bytes = max_bytes
+        self.workers = workers
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='image-variants')
+            return self._executor
+
+    def path(self, name):
+        return os.path.join(self.storage_dir, name)
+
+    def save(self, stream):
+        """Stores an upload and returns its public path, e.g. /assets/<hash>.jpg."""
+        os.makedirs(self.storage_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        extension = None
+        fd, temp_path = tempfile.mkstemp(dir=self.storage_dir, suffix='.upload')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if extension is None:
+                        extension = sniff_extension(chunk[:16])
+                        if extension is None:
+                            raise InvalidImage('Invalid file type. Only images are allowed.')
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise InvalidImage(f'Image size must be less than {self.max_bytes // (1024 * 1024)}MB')
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            if extension is None:
+                raise InvalidImage('No file selected')
+            name = f'{digest.hexdigest()}.{extension}'
+            if os.path.exists(self.path(name)):
+                os.remove(temp_path)
+                os.utime(self.path(name))
+            else:
+                os.replace(temp_path, self.path(name))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        if Image is not None and not self._has_variants(name):
+            self._get_executor().submit(self._render_variants, name)
+        return PUBLIC_PREFIX + name
+
+    @staticmethod
+    def stored_name(image_path):
+        if not image_path or not image_path.startswith(PUBLIC_PREFIX):
+            return None
+        name = image_path[len(PUBLIC_PREFIX):]
+        return name if '/' not in name and '\\' not in name and name else None
+
+    @staticmethod
+    def variant_name(name, variant):
+        return f'{name.rsplit(".", 1)[0]}-{variant}.webp'
+
+    def _has_variants(self, name):
+        return all(os.path.exists(self.path(self.variant_name(name, variant))) for variant in VARIANTS)
+
+    def variants(self, image_path):
+        """Public paths of the variants already rendered for an image."""
+        name = self.stored_name(image_path)
+        if name is None:
+            return {}
+        found = {}
+        for variant in VARIANTS:
+            variant_name = self.variant_name(name, variant)
+            if os.path.exists(self.path(variant_name)):
+                found[variant] = PUBLIC_PREFIX + variant_name
+        return found
+
+    def _render_variants(self, name):
+        try:
+            with Image.open(self.path(name)) as original:
+                original = ImageOps.exif_transpose(original)
+                if original.mode not in ('RGB', 'RGBA'):
+                    original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+                for variant, size in VARIANTS.items():
+                    resized = original.copy()
+                    resized.thumbnail((size, size))
+                    target = self.path(self.variant_name(name, variant))
+                    resized.save(target + '.tmp', 'WEBP', quality=WEBP_QUALITY, method=4)
+                    os.replace(target + '.tmp', target)
+        except Exception:
+            return
+        self._menu_changed()
+
+    def _menu_changed(self):
+        # Cached menus embed image_variants; make every worker rebuild them
+        if self.app is None:
+            return
+        from models import db
+        from menu_cache import menu_cache
+        try:
+            with self.app.app_context():
+                menu_cache.bump()
+                db.session.commit()
+                menu_cache.invalidate()
+        except Exception:
+            pass
+
+    def release(self, image_path):
+        """Deletes an image and its variants once no menu item refers to it.
+
+        Call after the transaction that dropped the reference has committed.
+        """
+        name = self.stored_name(image_path)
+        if name is None:
+            return False
+        from models import db, FoodItem
+        references = db.session.execute(
+            db.select(db.func.count()).select_from(FoodItem).where(FoodItem.image_path == image_path)
+        ).scalar()
+        if references:
+            return False
+        try:
+            if time.time() - os.path.getmtime(self.path(name)) < RELEASE_GRACE_SECONDS:
+                return False
+        except FileNotFoundError:
+            pass
+        for filename in [name] + [self.variant_name(name, variant) for variant in VARIANTS]:
+            try:
+                os.remove(self.path(filename))
+            except FileNotFoundError:
+                pass
+        return True
+
+    def sweep(self, now=None):
+        """Deletes fingerprinted images, and their variants, that no menu item refers to.
+
+        release() skips files younger than RELEASE_GRACE_SECONDS and never
+        looks at them again, so this catches what it left behind, along with
+        variants whose original is gone and abandoned partial uploads. Files
+        are only deleted once they are past the grace period. Returns the
+        number of files removed.
+        """
+        from models import db, FoodItem
+        now = now or time.time()
+        try:
+            names = os.listdir(self.storage_dir)
+        except FileNotFoundError:
+            return 0
+        referenced = {
+            self.stored_name(image_path) for image_path in db.session.execute(
+                db.select(FoodItem.image_path).where(FoodItem.image_path.like(PUBLIC_PREFIX + '%'))
+            ).scalars()
+        }
+        referenced = {name.rsplit('.', 1)[0] for name in referenced if name}
+        groups = {}
+        for name in names:
+            match = FINGERPRINTED_NAME.match(name)
+            if match is not None:
+                # Originals and their variants share the first 64 characters
+                groups.setdefault(match.group('fingerprint')[:64], []).append(name)
+            elif name.endswith(('.upload', '.tmp')):
+                groups.setdefault(name, []).append(name)
+        removed = 0
+        for fingerprint, group in groups.items():
+            if fingerprint in referenced:
+                continue
+            try:
+                newest = max(os.path.getmtime(self.path(name)) for name in group)
+            except FileNotFoundError:
+                continue
+            if now - newest < RELEASE_GRACE_SECONDS:
+                continue
+            for name in group:
+                try:
+                    os.remove(self.path(name))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+image_store = ImageStore()
+
+def fingerprint_menu_images():
+    """Moves menu items still pointing at plain file names onto fingerprinted copies.
+
+    Items whose file can't be found (or that use external URLs) are left alone.
+    """
+    from models import db, FoodItem
+    from menu_cache import menu_cache
+    changed = 0
+    for item in FoodItem.query.filter(FoodItem.image_path.isnot(None), FoodItem.image_path != '').all():
+        if item.image_path.startswith('http') or FINGERPRINTED_NAME.match(os.path.basename(item.image_path)):
+            continue
+        filename = os.path.basename(item.image_path)
+        for directory in (image_store.storage_dir,) + LEGACY_DIRS:
+            source = os.path.join(directory, filename)
+            if os.path.isfile(source):
+                try:
+                    with open(source, 'rb') as image_file:
+                        item.image_path = image_store.save(image_file)
+                except InvalidImage:
+                    break
+                changed += 1
+                break
+    if changed:
+        menu_cache.bump()
+        db.session.commit()
+        menu_cache.invalidate()
+    return changed
+
+def main():
+    # Imported by name: run as a script this module is __main__, not the images create_app sets up
+    from app import create_app
+    from images import image_store
+
+    app = create_app()
+    with app.app_context():
+        removed = image_store.sweep()
+    print(f'Removed {removed} unreferenced image files')
+
+if __name__ == '__main__':
+    main()
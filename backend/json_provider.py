@@ -0,0 +1,35 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it the stdlib encoder is used
+    orjson = None
+
+if orjson is not None:
+    # Datetimes go through default() so they keep Flask's HTTP-date format
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() and app.json.dumps() without key sorting, through orjson when installed.
+
+    Output decodes to the same values as Flask's default provider; Decimal,
+    dates and anything else orjson doesn't know fall back to its default().
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS).decode('utf-8')
+
+    def dumpb(self, obj):
+        if orjson is None:
+            return super().dumps(obj).encode('utf-8')
+        return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self._app.debug:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj), mimetype=self.mimetype)
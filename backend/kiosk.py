@@ -0,0 +1,200 @@
+import uuid
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from models import db, Order, OrderItem
+from idempotency import scoped_key
+from pricing import PricingError, price_order, price_table
+from eta import kitchen_eta
+from points import credit_order_points, open_redemptions, use_redemptions
+from rollups import record_orders_created
+
+MAX_BATCH_ORDERS = 500
+MAX_CLIENT_ID_LENGTH = 64
+MAX_PAYMENT_METHOD_LENGTH = 50
+INSERT_ATTEMPTS = 3
+
+class BatchRequestError(Exception):
+    pass
+
+def parse_batch(orders):
+    """Checks the shape of a sync batch: a list of objects with a string client_id."""
+    if not isinstance(orders, list) or not orders:
+        raise BatchRequestError('A non-empty list of orders is required')
+    if len(orders) > MAX_BATCH_ORDERS:
+        raise BatchRequestError(f'At most {MAX_BATCH_ORDERS} orders per request')
+    for order in orders:
+        client_id = order.get('client_id') if isinstance(order, dict) else None
+        if not isinstance(client_id, str) or not 0 < len(client_id) <= MAX_CLIENT_ID_LENGTH:
+            raise BatchRequestError(f'Every order needs a client_id of 1-{MAX_CLIENT_ID_LENGTH} characters')
+        order_owner(order.get('kiosk_id'), '')
+    return orders
+
+def _order_error(order):
+    # Anything that would fail the shared INSERT is reported for this order alone
+    for field in ('items', 'payment_method'):
+        if not order.get(field):
+            return f'{field.replace("_", " ").title()} is required'
+    if not isinstance(order['items'], list) or not all(isinstance(line, dict) for line in order['items']):
+        return 'Invalid items'
+    payment_method = order['payment_method']
+    if not isinstance(payment_method, str) or len(payment_method) > MAX_PAYMENT_METHOD_LENGTH:
+        return 'Invalid payment method'
+    if not isinstance(order.get('payment_details') or {}, dict):
+        return 'Invalid payment details'
+    redemption_id = order.get('redemption_id')
+    if redemption_id is not None and (not isinstance(redemption_id, int) or isinstance(redemption_id, bool)):
+        return 'Invalid redemption'
+    return None
+
+def order_owner(kiosk_id, session_owner):
+    """Whose idempotency keys an order's client_id lives among.
+
+    Orders sent from a kiosk carry the kiosk's own id, so the key survives a
+    change of guest session on that kiosk; other orders use the session owner.
+    """
+    if kiosk_id is None:
+        return session_owner
+    if not isinstance(kiosk_id, str) or not 0 < len(kiosk_id) <= MAX_CLIENT_ID_LENGTH:
+        raise BatchRequestError(f'kiosk_id must be 1-{MAX_CLIENT_ID_LENGTH} characters')
+    return f'kiosk:{kiosk_id}'
+
+def _order_number(now):
+    return f"ORD-{now.strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+
+def _existing_orders(keys):
+    if not keys:
+        return {}
+    rows = db.session.execute(
+        select(Order.idempotency_key, Order.id, Order.order_number, Order.user_id).where(Order.idempotency_key.in_(keys))
+    )
+    return {row.idempotency_key: row for row in rows}
+
+def _replayed(client_id, row, user_id):
+    # A kiosk-scoped key is shared by everyone using the kiosk; only its own account may see the order
+    if row.user_id != user_id:
+        return {'client_id': client_id, 'error': 'client_id already used'}
+    return {'client_id': client_id, 'result': 'replayed', 'order_id': row.id, 'order_number': row.order_number}
+
+def ingest_orders(orders, owner, user_id, guest_id, now):
+    """Creates a batch of orders queued offline by a kiosk, in the caller's transaction.
+
+    Each client_id becomes the order's idempotency key, scoped to the order's
+    kiosk_id or else the owner, the same way as the Idempotency-Key header on
+    POST /orders, so a batch (or any order in it) can be sent again safely:
+    orders that already exist are reported as replayed. Every order is priced against the one menu
+    snapshot in price_table and written with a multi-row INSERT for orders
+    and one for their items; a reward line needs the order's redemption_id
+    to be one of the user's open redemptions. Returns the per-order results
+    in request order and the created orders as (order_id, order_time,
+    estimated_time, eta_lines).
+    """
+    results = {}
+    pending = {}
+    for order in orders:
+        client_id = order['client_id']
+        if client_id in results:
+            results[client_id] = {'client_id': client_id, 'error': 'duplicate'}
+            pending.pop(client_id, None)
+            continue
+        results[client_id] = None
+        pending[client_id] = order
+    keys = {client_id: scoped_key(order_owner(order.get('kiosk_id'), owner), client_id) for client_id, order in pending.items()}
+    existing = _existing_orders(list(keys.values()))
+
+    items = price_table.items()
+    redemption_ids = [
+        order.get('redemption_id') for order in pending.values()
+        if isinstance(order.get('redemption_id'), int) and not isinstance(order.get('redemption_id'), bool)
+    ]
+    redemptions = open_redemptions(user_id, redemption_ids) if user_id else {}
+    claimed = set()
+    quotes = {}
+    for client_id, order in pending.items():
+        if keys[client_id] in existing:
+            results[client_id] = _replayed(client_id, existing[keys[client_id]], user_id)
+            continue
+        error = _order_error(order)
+        if error:
+            results[client_id] = {'client_id': client_id, 'error': error}
+            continue
+        redemption_id = order.get('redemption_id')
+        # Each open redemption pays for the reward of one order in the batch
+        rewards = {redemptions[redemption_id]} if redemption_id in redemptions and redemption_id not in claimed else ()
+        try:
+            quotes[client_id] = price_order(order['items'], items, rewards=rewards)
+            if quotes[client_id]['reward_id'] is not None:
+                claimed.add(redemption_id)
+        except PricingError as e:
+            results[client_id] = {'client_id': client_id, 'error': str(e)}
+        except TypeError:
+            results[client_id] = {'client_id': client_id, 'error': 'Invalid items'}
+
+    eta_lines = {client_id: [(line['food_id'], line['quantity']) for line in quote['lines']] for client_id, quote in quotes.items()}
+    estimates = dict(zip(quotes, kitchen_eta.estimate_many(list(eta_lines.values()))))
+    for attempt in range(INSERT_ATTEMPTS):
+        if not quotes:
+            break
+        rows = [{
+            'order_number': _order_number(now),
+            'user_id': user_id,
+            'guest_id': guest_id,
+            'idempotency_key': keys[client_id],
+            'total_amount': quote['total_amount'],
+            'tax_amount': quote['tax_amount'],
+            'grand_total': quote['grand_total'],
+            'points_earned': quote['points_earned'],
+            'estimated_time': estimates[client_id],
+            'status': 'current',
+            'payment_method': pending[client_id]['payment_method'],
+            'payment_details': pending[client_id].get('payment_details') or {},
+            # The kitchen first sees the order now, so its ETA and due time start
+            # from the sync rather than from when the kiosk queued it
+            'order_time': now,
+            'created_at': now,
+            'updated_at': now
+        } for client_id, quote in quotes.items()]
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Order), rows)
+            break
+        except IntegrityError:
+            # Another request synced some of these meanwhile, or an order number collided
+            existing = _existing_orders([keys[client_id] for client_id in quotes])
+            for client_id in list(quotes):
+                if keys[client_id] in existing:
+                    results[client_id] = _replayed(client_id, existing[keys[client_id]], user_id)
+                    del quotes[client_id]
+            if quotes and attempt == INSERT_ATTEMPTS - 1:
+                raise
+
+    created = []
+    if quotes:
+        inserted = _existing_orders([keys[client_id] for client_id in quotes])
+        order_items = []
+        for client_id, quote in quotes.items():
+            row = inserted[keys[client_id]]
+            order_items += [dict(line, order_id=row.id) for line in quote['lines']]
+            results[client_id] = {
+                'client_id': client_id,
+                'result': 'created',
+                'order_id': row.id,
+                'order_number': row.order_number,
+                'grand_total': float(quote['grand_total']),
+                'estimated_time': estimates[client_id]
+            }
+            created.append((row.id, now, estimates[client_id], eta_lines[client_id]))
+        if order_items:
+            db.session.execute(insert(OrderItem), order_items)
+        uses = [
+            (pending[client_id]['redemption_id'], quote['reward_id'], inserted[keys[client_id]].id)
+            for client_id, quote in quotes.items() if quote['reward_id'] is not None
+        ]
+        if uses:
+            use_redemptions(user_id, uses)
+        points_issued = 0
+        if user_id:
+            points_issued = credit_order_points(user_id, [
+                (inserted[keys[client_id]].id, quote['points_earned']) for client_id, quote in quotes.items()
+            ])
+        record_orders_created(now, list(quotes.values()), points_issued)
+    return list(results.values()), created
@@ -0,0 +1,59 @@
+import hashlib
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select, update
+from models import db, FoodItem, MenuVersion
+
+class MenuCache:
+    """Pre-encoded /food-items payload keyed by the menu_version row.
+
+    Menu edits bump the row in the same transaction, and each worker re-reads
+    it at most once per MENU_CACHE_TTL seconds, so a request inside that
+    window (including a conditional one) is answered without a query.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Last version read from menu_version, and when; the body may still be older
+        self._seen_version = None
+        self._checked_at = 0
+        self._version = None
+        self._body = None
+        self._etag = None
+
+    def _ttl(self):
+        return current_app.config.get('MENU_CACHE_TTL', 5)
+
+    def current_version(self):
+        now = time.monotonic()
+        if self._seen_version is not None and now - self._checked_at < self._ttl():
+            return self._seen_version
+        version = db.session.execute(
+            select(MenuVersion.version).where(MenuVersion.id == 1)
+        ).scalar() or 0
+        self._seen_version = version
+        self._checked_at = now
+        return version
+
+    def get(self):
+        version = self.current_version()
+        with self._lock:
+            if self._body is None or version != self._version:
+                food_items = FoodItem.query.filter_by(is_available=True, is_reward=False).all()
+                self._body = current_app.json.dumps({'food_items': [item.to_dict() for item in food_items]}).encode('utf-8')
+                self._etag = hashlib.sha1(self._body).hexdigest()
+                self._version = version
+            return self._etag, self._body
+
+    def bump(self):
+        result = db.session.execute(
+            update(MenuVersion).where(MenuVersion.id == 1).values(version=MenuVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            db.session.add(MenuVersion(id=1, version=1))
+
+    def invalidate(self):
+        self._checked_at = 0
+
+menu_cache = MenuCache()
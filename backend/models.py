@@ -1,11 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import hasher
+from images import image_store
 from datetime import datetime
 
 db = SQLAlchemy()
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('idx_users_reset_token', 'reset_token'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     first_name = db.Column(db.String(50), nullable=False)
@@ -20,10 +24,14 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        if not hasher.verify(self.password_hash, password):
+            return False
+        if hasher.needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
     
     def to_dict(self):
         return {
@@ -49,10 +57,14 @@ class Admin(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        if not hasher.verify(self.password_hash, password):
+            return False
+        if hasher.needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
     
     def to_dict(self):
         return {
@@ -86,16 +98,33 @@ class FoodItem(db.Model):
             'has_extra_option': self.has_extra_option,
             'is_available': self.is_available,
             'is_reward': self.is_reward,
+            'image_variants': image_store.variants(self.image_path),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class MenuVersion(db.Model):
+    __tablename__ = 'menu_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class Order(db.Model):
     __tablename__ = 'orders'
+    # One index per hot query shape in routes.py: equality columns first, then the sort
+    __table_args__ = (
+        db.Index('idx_orders_user_order_time', 'user_id', 'order_time'),
+        db.Index('idx_orders_guest_order_time', 'guest_id', 'order_time'),
+        db.Index('idx_orders_status_order_time', 'status', 'order_time'),
+        db.Index('idx_orders_status_completed_time', 'status', 'completed_time', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_number = db.Column(db.String(20), unique=True, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    guest_id = db.Column(db.String(20), nullable=True)
+    idempotency_key = db.Column(db.String(64), unique=True, nullable=True)
     total_amount = db.Column(db.Numeric(10, 2), nullable=False)
     tax_amount = db.Column(db.Numeric(10, 2), nullable=False)
     grand_total = db.Column(db.Numeric(10, 2), nullable=False)
@@ -108,15 +137,36 @@ class Order(db.Model):
     ready_time = db.Column(db.DateTime)
     completed_time = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     user = db.relationship('User', backref=db.backref('orders', lazy=True))
     order_items = db.relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
+    def to_dict(self, compact=False):
+        if compact:
+            # Same fields as order_queries.compact_order_row_to_dict
+            return {
+                'id': self.id,
+                'order_number': self.order_number,
+                'user_id': self.user_id,
+                'guest_id': self.guest_id,
+                'total_amount': float(self.total_amount),
+                'tax_amount': float(self.tax_amount),
+                'grand_total': float(self.grand_total),
+                'points_earned': self.points_earned,
+                'estimated_time': self.estimated_time,
+                'status': self.status,
+                'payment_method': self.payment_method,
+                'order_time': self.order_time.isoformat() if self.order_time else None,
+                'ready_time': self.ready_time.isoformat() if self.ready_time else None,
+                'completed_time': self.completed_time.isoformat() if self.completed_time else None,
+                'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+                'items': [item.to_dict(compact=True) for item in self.order_items]
+            }
         return {
             'id': self.id,
             'order_number': self.order_number,
             'user_id': self.user_id,
+            'guest_id': self.guest_id,
             'total_amount': float(self.total_amount),
             'tax_amount': float(self.tax_amount),
             'grand_total': float(self.grand_total),
@@ -133,8 +183,59 @@ class Order(db.Model):
             'items': [item.to_dict() for item in self.order_items]
         }
 
+class PointsLedger(db.Model):
+    __tablename__ = 'points_ledger'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    delta = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(20), nullable=False)
+    # No foreign key: the order may have moved to orders_archive
+    order_id = db.Column(db.Integer, nullable=True)
+    reward_id = db.Column(db.Integer, nullable=True)
+    reverses_id = db.Column(db.Integer, db.ForeignKey('points_ledger.id'), unique=True, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'delta': self.delta,
+            'reason': self.reason,
+            'order_id': self.order_id,
+            'reward_id': self.reward_id,
+            'reverses_id': self.reverses_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class SalesRollup(db.Model):
+    __tablename__ = 'sales_rollups'
+    
+    day = db.Column(db.Date, primary_key=True)
+    hour = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    orders_count = db.Column(db.Integer, nullable=False, default=0)
+    items_quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    tax = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    grand_total = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    points_issued = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+
+class ItemSalesRollup(db.Model):
+    __tablename__ = 'item_sales_rollups'
+    
+    day = db.Column(db.Date, primary_key=True)
+    food_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    food_name = db.Column(db.String(100), nullable=False)
+    orders_count = db.Column(db.Integer, nullable=False, default=0)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
 class OrderItem(db.Model):
     __tablename__ = 'order_items'
+    __table_args__ = (
+        db.Index('idx_order_items_order_id', 'order_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
@@ -146,7 +247,17 @@ class OrderItem(db.Model):
     item_total = db.Column(db.Numeric(10, 2), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
+    def to_dict(self, compact=False):
+        if compact:
+            return {
+                'id': self.id,
+                'food_id': self.food_id,
+                'name': self.food_name,
+                'price': float(self.food_price),
+                'quantity': self.quantity,
+                'has_extra': self.has_extra,
+                'item_total': float(self.item_total)
+            }
         return {
             'id': self.id,
             'order_id': self.order_id,
@@ -160,3 +271,48 @@ class OrderItem(db.Model):
             'item_total': float(self.item_total),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+class ArchivedOrder(db.Model):
+    """Completed orders moved out of `orders` by archive.py; same columns and ids."""
+    __tablename__ = 'orders_archive'
+    __table_args__ = (
+        db.Index('idx_orders_archive_user_order_time', 'user_id', 'order_time'),
+        db.Index('idx_orders_archive_guest_order_time', 'guest_id', 'order_time'),
+        db.Index('idx_orders_archive_status_completed_time', 'status', 'completed_time', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_number = db.Column(db.String(20), nullable=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    guest_id = db.Column(db.String(20), nullable=True)
+    idempotency_key = db.Column(db.String(64), nullable=True)
+    total_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    tax_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    grand_total = db.Column(db.Numeric(10, 2), nullable=False)
+    points_earned = db.Column(db.Integer, nullable=False)
+    estimated_time = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.Enum('current', 'ready', 'completed'), default='completed')
+    payment_method = db.Column(db.String(50))
+    payment_details = db.Column(db.JSON)
+    order_time = db.Column(db.DateTime)
+    ready_time = db.Column(db.DateTime)
+    completed_time = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArchivedOrderItem(db.Model):
+    __tablename__ = 'order_items_archive'
+    __table_args__ = (
+        db.Index('idx_order_items_archive_order_id', 'order_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(db.Integer, nullable=False)
+    food_id = db.Column(db.Integer, nullable=False)
+    food_name = db.Column(db.String(100), nullable=False)
+    food_price = db.Column(db.Numeric(8, 2), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    has_extra = db.Column(db.Boolean, default=False)
+    item_total = db.Column(db.Numeric(10, 2), nullable=False)
+    created_at = db.Column(db.DateTime)
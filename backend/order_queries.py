@@ -0,0 +1,239 @@
+from datetime import datetime
+from sqlalchemy import and_, or_, select
+from models import db, User, Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+
+ORDER_COLUMNS = (
+    Order.id,
+    Order.order_number,
+    Order.user_id,
+    Order.guest_id,
+    Order.total_amount,
+    Order.tax_amount,
+    Order.grand_total,
+    Order.points_earned,
+    Order.estimated_time,
+    Order.status,
+    Order.payment_method,
+    Order.payment_details,
+    Order.order_time,
+    Order.ready_time,
+    Order.completed_time,
+    Order.created_at,
+    Order.updated_at,
+)
+
+ORDER_ITEM_COLUMNS = (
+    OrderItem.id,
+    OrderItem.order_id,
+    OrderItem.food_id,
+    OrderItem.food_name,
+    OrderItem.food_price,
+    OrderItem.quantity,
+    OrderItem.has_extra,
+    OrderItem.item_total,
+    OrderItem.created_at,
+)
+
+ITEM_BATCH_SIZE = 1000
+ORDER_VIEWS = ('full', 'compact')
+
+class OrderStore:
+    """An orders table and its items table: the hot pair or the archive pair."""
+
+    def __init__(self, order, item):
+        self.order = order
+        self.item = item
+        self.order_columns = tuple(getattr(order, column.key) for column in ORDER_COLUMNS)
+        self.item_columns = tuple(getattr(item, column.key) for column in ORDER_ITEM_COLUMNS)
+
+HOT = OrderStore(Order, OrderItem)
+ARCHIVE = OrderStore(ArchivedOrder, ArchivedOrderItem)
+STORES = (HOT, ARCHIVE)
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def order_item_row_to_dict(row):
+    return {
+        'id': row.id,
+        'order_id': row.order_id,
+        'food_id': row.food_id,
+        'name': row.food_name,
+        'food_name': row.food_name,
+        'price': float(row.food_price),
+        'food_price': float(row.food_price),
+        'quantity': row.quantity,
+        'has_extra': row.has_extra,
+        'item_total': float(row.item_total),
+        'created_at': _isoformat(row.created_at)
+    }
+
+def order_row_to_dict(row, items):
+    return {
+        'id': row.id,
+        'order_number': row.order_number,
+        'user_id': row.user_id,
+        'guest_id': row.guest_id,
+        'total_amount': float(row.total_amount),
+        'tax_amount': float(row.tax_amount),
+        'grand_total': float(row.grand_total),
+        'points_earned': row.points_earned,
+        'estimated_time': row.estimated_time,
+        'status': row.status,
+        'payment_method': row.payment_method,
+        'payment_details': row.payment_details,
+        'order_time': _isoformat(row.order_time),
+        'ready_time': _isoformat(row.ready_time),
+        'completed_time': _isoformat(row.completed_time),
+        'created_at': _isoformat(row.created_at),
+        'updated_at': _isoformat(row.updated_at),
+        'items': items
+    }
+
+# The compact view drops the duplicated item fields (food_name/food_price),
+# the order_id and timestamps repeated on every nested item, and the order's
+# created_at (same as order_time) and payment_details
+def compact_order_item_row_to_dict(row):
+    return {
+        'id': row.id,
+        'food_id': row.food_id,
+        'name': row.food_name,
+        'price': float(row.food_price),
+        'quantity': row.quantity,
+        'has_extra': row.has_extra,
+        'item_total': float(row.item_total)
+    }
+
+def compact_order_row_to_dict(row, items):
+    return {
+        'id': row.id,
+        'order_number': row.order_number,
+        'user_id': row.user_id,
+        'guest_id': row.guest_id,
+        'total_amount': float(row.total_amount),
+        'tax_amount': float(row.tax_amount),
+        'grand_total': float(row.grand_total),
+        'points_earned': row.points_earned,
+        'estimated_time': row.estimated_time,
+        'status': row.status,
+        'payment_method': row.payment_method,
+        'order_time': _isoformat(row.order_time),
+        'ready_time': _isoformat(row.ready_time),
+        'completed_time': _isoformat(row.completed_time),
+        'updated_at': _isoformat(row.updated_at),
+        'items': items
+    }
+
+def fetch_order_items(order_ids, store=HOT, compact=False):
+    item_to_dict = compact_order_item_row_to_dict if compact else order_item_row_to_dict
+    items_by_order = {order_id: [] for order_id in order_ids}
+    for start in range(0, len(order_ids), ITEM_BATCH_SIZE):
+        batch = order_ids[start:start + ITEM_BATCH_SIZE]
+        rows = db.session.execute(
+            select(*store.item_columns)
+            .where(store.item.order_id.in_(batch))
+            .order_by(store.item.order_id, store.item.id)
+        )
+        for row in rows:
+            items_by_order[row.order_id].append(item_to_dict(row))
+    return items_by_order
+
+def order_rows_to_dicts(rows, include_user_name=False, store=HOT, compact=False):
+    items_by_order = fetch_order_items([row.id for row in rows], store=store, compact=compact)
+    order_to_dict = compact_order_row_to_dict if compact else order_row_to_dict
+    orders_data = []
+    for row in rows:
+        order_dict = order_to_dict(row, items_by_order[row.id])
+        if include_user_name:
+            order_dict['user_name'] = f"{row.first_name} {row.last_name}" if row.first_name is not None else 'Guest User'
+        orders_data.append(order_dict)
+    return orders_data
+
+def fetch_order_dicts(*criteria, order_by=(), include_user_name=False, limit=None, store=HOT, compact=False):
+    stmt = select(*store.order_columns)
+    if include_user_name:
+        stmt = stmt.add_columns(User.first_name, User.last_name).outerjoin(User, store.order.user_id == User.id)
+    stmt = stmt.where(*criteria).order_by(*order_by)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    rows = db.session.execute(stmt).all()
+    return order_rows_to_dicts(rows, include_user_name=include_user_name, store=store, compact=compact)
+
+def fetch_history_dicts(owner, value, compact=False):
+    """A customer's orders from hot and archived storage, newest first.
+
+    owner is the column that identifies the customer: 'user_id' or 'guest_id'.
+    """
+    orders = []
+    for store in STORES:
+        orders += fetch_order_dicts(
+            getattr(store.order, owner) == value,
+            order_by=(store.order.order_time.desc(),),
+            store=store,
+            compact=compact
+        )
+    orders.sort(key=lambda order: order['order_time'] or '', reverse=True)
+    return orders
+
+def fetch_customer_order(order_id, owner, value):
+    for store in STORES:
+        orders = fetch_order_dicts(store.order.id == order_id, getattr(store.order, owner) == value, store=store)
+        if orders:
+            return orders[0]
+    return None
+
+def past_order_ordering(order):
+    return (order.completed_time.desc(), order.id.desc())
+
+PAST_ORDER_ORDERING = past_order_ordering(Order)
+
+def encode_past_cursor(order):
+    return f"{order['completed_time'] or ''}_{order['id']}"
+
+def decode_past_cursor(value):
+    completed_time, order_id = value.rsplit('_', 1)
+    return (datetime.fromisoformat(completed_time) if completed_time else None, int(order_id))
+
+def completed_before(cursor, order=Order):
+    completed_time, order_id = cursor
+    if completed_time is None:
+        return and_(order.completed_time.is_(None), order.id < order_id)
+    return or_(
+        order.completed_time < completed_time,
+        and_(order.completed_time == completed_time, order.id < order_id),
+        order.completed_time.is_(None)
+    )
+
+def past_order_key(order):
+    # Descending sort key matching past_order_ordering(): NULL completed_time last
+    completed_time = order['completed_time']
+    return (completed_time is not None, completed_time or '', order['id'])
+
+def fetch_past_orders_page(limit, after=None, compact=False):
+    # Each store returns its own first page; merging them gives the first page overall
+    orders = []
+    for store in STORES:
+        criteria = [store.order.status == 'completed']
+        if after is not None:
+            criteria.append(completed_before(after, store.order))
+        orders += fetch_order_dicts(
+            *criteria,
+            order_by=past_order_ordering(store.order),
+            include_user_name=True,
+            limit=limit,
+            store=store,
+            compact=compact
+        )
+    orders.sort(key=past_order_key, reverse=True)
+    orders = orders[:limit]
+    next_cursor = encode_past_cursor(orders[-1]) if len(orders) == limit else None
+    return orders, next_cursor
+
+def iter_past_orders(batch_size, compact=False):
+    after = None
+    while True:
+        orders, next_cursor = fetch_past_orders_page(batch_size, after=after, compact=compact)
+        yield from orders
+        if next_cursor is None:
+            return
+        after = decode_past_cursor(next_cursor)
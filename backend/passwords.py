@@ -0,0 +1,90 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class PasswordHasherBusy(Exception):
+    pass
+
+class PasswordHasher:
+    """Runs password hashing off the request thread with bounded concurrency.
+
+    Hashes are computed in a small process pool (or inline when
+    PASSWORD_HASH_WORKERS is 0), and at most PASSWORD_HASH_CONCURRENCY calls
+    per worker may be queued or running at once, counting jobs whose caller
+    has already given up; callers beyond that wait up to
+    PASSWORD_HASH_TIMEOUT seconds and then get PasswordHasherBusy.
+    """
+
+    def __init__(self, method='scrypt', workers=0, concurrency=4, timeout=10):
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        self.configure(method, workers, concurrency, timeout)
+
+    def init_app(self, app):
+        self.configure(
+            app.config.get('PASSWORD_HASH_METHOD', 'scrypt'),
+            app.config.get('PASSWORD_HASH_WORKERS', 0),
+            app.config.get('PASSWORD_HASH_CONCURRENCY', 4),
+            app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        )
+
+    def configure(self, method, workers, concurrency, timeout):
+        self.shutdown()
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._method_prefix = None
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._executor_pid = None
+
+    def _get_executor(self):
+        # A pool inherited through fork belongs to the parent; start a fresh one
+        with self._executor_lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        slots = self._slots
+        if not slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy()
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                slots.release()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # A job outlives a caller that timed out, so it keeps its slot until it
+        # finishes; otherwise the pool's backlog could grow past the limit
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        if self._method_prefix is None:
+            self._method_prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+hasher = PasswordHasher()
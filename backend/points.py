@@ -0,0 +1,140 @@
+from sqlalchemy import exists, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from models import db, User, PointsLedger
+
+# Points needed for each reward item (food_items 101-106)
+REWARD_COSTS = {
+    101: 500,
+    102: 500,
+    103: 1000,
+    104: 1000,
+    105: 5000,
+    106: 5000,
+}
+
+# Most of each reward one redemption covers (Rewards.js offers two samosas or kachoris)
+REWARD_QUANTITIES = {
+    101: 2,
+    102: 2,
+    103: 1,
+    104: 1,
+    105: 1,
+    106: 1,
+}
+
+class InsufficientPoints(Exception):
+    pass
+
+class RedemptionNotFound(Exception):
+    pass
+
+class RedemptionUsed(Exception):
+    pass
+
+def _record(user_id, delta, reason, **fields):
+    return db.session.execute(
+        insert(PointsLedger).values(user_id=user_id, delta=delta, reason=reason, **fields)
+    ).inserted_primary_key[0]
+
+def get_balance(user_id):
+    return db.session.execute(select(User.points).where(User.id == user_id)).scalar() or 0
+
+def credit_points(user_id, points, reason, order_id=None):
+    if points <= 0:
+        return None
+    db.session.execute(
+        update(User).where(User.id == user_id).values(points=db.func.coalesce(User.points, 0) + points)
+    )
+    return _record(user_id, points, reason, order_id=order_id)
+
+def credit_order_points(user_id, credits):
+    """Credits several orders at once: one balance UPDATE and one multi-row ledger INSERT.
+
+    credits is a list of (order_id, points); returns the points added.
+    """
+    credits = [(order_id, points) for order_id, points in credits if points > 0]
+    if not credits:
+        return 0
+    total = sum(points for _, points in credits)
+    db.session.execute(
+        update(User).where(User.id == user_id).values(points=db.func.coalesce(User.points, 0) + total)
+    )
+    db.session.execute(insert(PointsLedger), [
+        {'user_id': user_id, 'delta': points, 'reason': 'order', 'order_id': order_id}
+        for order_id, points in credits
+    ])
+    return total
+
+def redeem_reward(user_id, reward_id):
+    cost = REWARD_COSTS[reward_id]
+    result = db.session.execute(
+        update(User)
+        .where(User.id == user_id, User.points >= cost)
+        .values(points=User.points - cost)
+    )
+    if result.rowcount == 0:
+        raise InsufficientPoints()
+    return _record(user_id, -cost, 'redeem', reward_id=reward_id)
+
+def _redemption_closer(redemption_id):
+    return db.session.execute(
+        select(PointsLedger.reason).where(PointsLedger.reverses_id == redemption_id)
+    ).scalar()
+
+def cancel_redemption(user_id, redemption_id):
+    """Gives back the points of a redemption, unless an order has already used its reward."""
+    redemption = db.session.execute(
+        select(PointsLedger.delta, PointsLedger.reward_id).where(
+            PointsLedger.id == redemption_id,
+            PointsLedger.user_id == user_id,
+            PointsLedger.reason == 'redeem'
+        )
+    ).first()
+    if redemption is None:
+        raise RedemptionNotFound()
+    try:
+        with db.session.begin_nested():
+            _record(user_id, -redemption.delta, 'redeem_cancel', reward_id=redemption.reward_id, reverses_id=redemption_id)
+    except IntegrityError:
+        # Already closed: by an earlier cancel, or by the redeem_use row of the order that claimed it
+        if _redemption_closer(redemption_id) == 'redeem_use':
+            raise RedemptionUsed()
+        raise RedemptionNotFound()
+    db.session.execute(
+        update(User).where(User.id == user_id).values(points=db.func.coalesce(User.points, 0) - redemption.delta)
+    )
+
+def open_redemptions(user_id, redemption_ids):
+    """Returns {redemption_id: reward_id} for the user's redemptions not yet used or cancelled."""
+    if not redemption_ids:
+        return {}
+    closing = aliased(PointsLedger)
+    return dict(db.session.execute(
+        select(PointsLedger.id, PointsLedger.reward_id).where(
+            PointsLedger.id.in_(redemption_ids),
+            PointsLedger.user_id == user_id,
+            PointsLedger.reason == 'redeem',
+            ~exists().where(closing.reverses_id == PointsLedger.id)
+        )
+    ).all())
+
+def use_redemptions(user_id, uses):
+    """Closes redemptions against the orders that claimed their rewards.
+
+    uses is a list of (redemption_id, reward_id, order_id). A use shares the
+    unique reverses_id with a cancellation, so each redemption ends up used
+    or cancelled exactly once, whichever request gets there first.
+    """
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(PointsLedger), [{
+                'user_id': user_id,
+                'delta': 0,
+                'reason': 'redeem_use',
+                'reward_id': reward_id,
+                'order_id': order_id,
+                'reverses_id': redemption_id
+            } for redemption_id, reward_id, order_id in uses])
+    except IntegrityError:
+        raise RedemptionNotFound()
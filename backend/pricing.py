@@ -0,0 +1,92 @@
+import threading
+from decimal import Decimal, ROUND_FLOOR, ROUND_HALF_UP
+from models import FoodItem
+from menu_cache import menu_cache
+from points import REWARD_COSTS, REWARD_QUANTITIES
+
+TAX_PERCENT = 15
+RUPEES_PER_POINT = 10
+
+class PricingError(Exception):
+    pass
+
+class PriceTable:
+    """Menu prices as Decimals, rebuilt only when the menu version changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._items = {}
+
+    def items(self):
+        version = menu_cache.current_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._items = {
+                        item.id: price_entry(item.id, item.name, item.price)
+                        for item in FoodItem.query.all()
+                    }
+                    self._version = version
+        return self._items
+
+FREE = Decimal('0.00')
+WHOLE_RUPEE = Decimal('1')
+
+def price_entry(food_id, name, price):
+    # Rewards are told apart by id: setup.sql databases never set FoodItem.is_reward
+    return (name, FREE if food_id in REWARD_COSTS else Decimal(price).quantize(FREE))
+
+def price_order(lines, items, rewards=()):
+    """Prices cart lines the same way Cart.js and Checkout.js do.
+
+    Subtotal is the sum of price x quantity, tax is 15% of it (stored to the
+    paisa, half up), the grand total is subtotal + tax rounded down to whole
+    rupees, and one point is earned per 10 rupees of subtotal. Reward items
+    are free, limited to one per order and only allowed for a reward id in
+    rewards (the customer's open redemptions); the quote's reward_id is the
+    reward the order claims.
+    """
+    priced_lines = []
+    subtotal = FREE
+    reward_id = None
+    for line in lines:
+        food_id = line.get('foodId')
+        quantity = line.get('quantity')
+        if food_id not in items:
+            raise PricingError(f'Food item with ID {food_id} not found')
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+            raise PricingError(f'Invalid quantity for food item {food_id}')
+        has_extra = line.get('hasExtra', False)
+        if not isinstance(has_extra, bool):
+            raise PricingError(f'Invalid extra option for food item {food_id}')
+        name, price = items[food_id]
+        if food_id in REWARD_COSTS:
+            if reward_id is not None:
+                raise PricingError('Only one reward can be redeemed per order')
+            if food_id not in rewards:
+                raise PricingError(f'Reward item {food_id} has not been redeemed')
+            if quantity > REWARD_QUANTITIES[food_id]:
+                raise PricingError(f'Invalid quantity for food item {food_id}')
+            reward_id = food_id
+        item_total = price * quantity
+        subtotal += item_total
+        priced_lines.append({
+            'food_id': food_id,
+            'food_name': name,
+            'food_price': price,
+            'quantity': quantity,
+            'has_extra': has_extra,
+            'item_total': item_total
+        })
+    with_tax = subtotal * (100 + TAX_PERCENT) / 100
+    return {
+        'lines': priced_lines,
+        'total_amount': subtotal,
+        'tax_amount': (subtotal * TAX_PERCENT / 100).quantize(FREE, rounding=ROUND_HALF_UP),
+        'grand_total': with_tax.quantize(WHOLE_RUPEE, rounding=ROUND_FLOOR).quantize(FREE),
+        'points_earned': int(subtotal // RUPEES_PER_POINT),
+        'reward_id': reward_id
+    }
+
+price_table = PriceTable()
@@ -0,0 +1,314 @@
+import atexit
+import cProfile
+import fcntl
+import hmac
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from flask import Response, current_app, g, has_request_context, jsonify, request, session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_STATS_LINES = 40
+PROFILE_SQL_CHARS = 200
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls')
+WORKER_FILE = re.compile(r'worker-(\d+)\.json')
+DEAD_WORKERS_FILE = 'dead-workers.json'
+LOCK_FILE = 'metrics.lock'
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.wall = 0.0
+        self.db = 0.0
+        self.statements = 0
+        self.response_bytes = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+    def add(self, wall, db_time, statements, response_bytes):
+        self.count += 1
+        self.wall += wall
+        self.db += db_time
+        self.statements += statements
+        self.response_bytes += response_bytes
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if wall <= bound:
+                self.buckets[index] += 1
+                break
+
+class RequestProfiler:
+    """Per-endpoint request timings and SQL counts.
+
+    Engine events add each statement's time to the request it ran in. The
+    totals are served in Prometheus text format from /metrics to admins and
+    to scrapers holding METRICS_TOKEN, and a request sent with an X-Profile
+    header (by an admin, or by anyone when PROFILE_HEADER_ENABLED is set)
+    gets a cProfile and SQL breakdown back in place of its normal response.
+
+    Each worker counts in memory. With METRICS_DIR set, every worker also
+    writes its totals to a file there every METRICS_FLUSH_SECONDS, and a
+    scrape, whichever worker it reaches, adds up all the files (the way
+    prometheus_client's multiprocess mode does). Files of workers that have
+    exited are folded into one, so the totals never go backwards.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._listening = False
+        self._dirty = False
+        self._flusher = None
+        self._flush_lock = threading.Lock()
+        self._flush_pid = None
+        self.configure()
+
+    def init_app(self, app):
+        if not app.config.get('PROFILING_ENABLED', True):
+            return
+        self.configure(
+            metrics_dir=app.config.get('METRICS_DIR'),
+            metrics_token=app.config.get('METRICS_TOKEN'),
+            flush_seconds=app.config.get('METRICS_FLUSH_SECONDS', 5)
+        )
+        self._listen()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if app.config.get('METRICS_ENABLED', True):
+            app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    def configure(self, metrics_dir=None, metrics_token=None, flush_seconds=5):
+        self.metrics_dir = metrics_dir
+        self.metrics_token = metrics_token
+        self.flush_seconds = flush_seconds
+        if metrics_dir:
+            os.makedirs(metrics_dir, exist_ok=True)
+
+    def _listen(self):
+        if self._listening:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        self._listening = True
+
+    def _profile_allowed(self):
+        if 'X-Profile' not in request.headers:
+            return False
+        return current_app.config.get('PROFILE_HEADER_ENABLED', False) or session.get('user_type') == 'admin'
+
+    def _before_request(self):
+        g.profile = {'start': time.perf_counter(), 'db': 0.0, 'statements': 0, 'sql': None, 'profiler': None}
+        if self._profile_allowed():
+            g.profile['sql'] = []
+            g.profile['profiler'] = cProfile.Profile()
+            g.profile['profiler'].enable()
+
+    def _after_request(self, response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        wall = time.perf_counter() - profile['start']
+        if profile['profiler'] is not None:
+            profile['profiler'].disable()
+        response_bytes = 0 if response.is_streamed else response.calculate_content_length() or 0
+        self.record(request.endpoint or 'unmatched', request.method, wall, profile['db'], profile['statements'], response_bytes)
+        if self.metrics_dir and self._flusher is None:
+            self._start_flusher()
+        if profile['profiler'] is not None:
+            return self._profile_response(response, wall, profile)
+        return response
+
+    def record(self, endpoint, method, wall, db_time, statements, response_bytes):
+        with self._lock:
+            stats = self._stats.get((endpoint, method))
+            if stats is None:
+                stats = self._stats[(endpoint, method)] = EndpointStats()
+            stats.add(wall, db_time, statements, response_bytes)
+            self._dirty = True
+
+    def _profile_response(self, response, wall, profile):
+        output = io.StringIO()
+        output.write(f'{request.method} {request.full_path.rstrip("?")} -> {response.status}\n')
+        output.write(f'wall {wall * 1000:.2f} ms, db {profile["db"] * 1000:.2f} ms, {profile["statements"]} SQL statements\n\n')
+        for statement, duration in profile['sql']:
+            output.write(f'{duration * 1000:8.2f} ms  {statement}\n')
+        output.write('\n')
+        sort_key = request.headers.get('X-Profile')
+        stats = pstats.Stats(profile['profiler'], stream=output)
+        stats.sort_stats(sort_key if sort_key in PROFILE_SORT_KEYS else 'cumulative')
+        stats.print_stats(PROFILE_STATS_LINES)
+        return Response(output.getvalue(), status=200, mimetype='text/plain', headers={'X-Profiled-Status': str(response.status_code)})
+
+    def snapshot(self):
+        with self._lock:
+            return self.snapshot_unlocked()
+
+    def snapshot_unlocked(self):
+        return {key: (stats.count, stats.wall, stats.db, stats.statements, stats.response_bytes, list(stats.buckets))
+                for key, stats in self._stats.items()}
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def _worker_path(self, pid):
+        return os.path.join(self.metrics_dir, f'worker-{pid}.json')
+
+    def flush(self):
+        """Writes this worker's totals to its file in METRICS_DIR."""
+        pid = os.getpid()
+        with self._flush_lock:
+            if self._flush_pid != pid:
+                # A file already under this pid belongs to an exited worker whose pid was reused
+                with _metrics_lock(self.metrics_dir):
+                    self._retire(self._worker_path(pid))
+                self._flush_pid = pid
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = self.snapshot_unlocked()
+                self._dirty = False
+            _write_snapshot(self._worker_path(pid), snapshot)
+
+    def _retire(self, path):
+        # Caller holds the metrics lock
+        if not os.path.exists(path):
+            return
+        dead_path = os.path.join(self.metrics_dir, DEAD_WORKERS_FILE)
+        _write_snapshot(dead_path, _merge(_read_snapshot(dead_path), _read_snapshot(path)))
+        os.remove(path)
+
+    def collect(self):
+        """Totals across every worker sharing METRICS_DIR, or this worker's alone without it."""
+        if not self.metrics_dir:
+            return self.snapshot()
+        self.flush()
+        live = {}
+        with _metrics_lock(self.metrics_dir):
+            for name in os.listdir(self.metrics_dir):
+                match = WORKER_FILE.fullmatch(name)
+                if match is None:
+                    continue
+                path = os.path.join(self.metrics_dir, name)
+                if _pid_alive(int(match.group(1))):
+                    _merge(live, _read_snapshot(path))
+                else:
+                    self._retire(path)
+            return _merge(_read_snapshot(os.path.join(self.metrics_dir, DEAD_WORKERS_FILE)), live)
+
+    def render_metrics(self):
+        lines = []
+        snapshot = sorted(self.collect().items())
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        family('http_request_duration_seconds', 'histogram', 'Request wall time by endpoint.')
+        for (endpoint, method), (count, wall, _, _, _, buckets) in snapshot:
+            labels = f'endpoint="{endpoint}",method="{method}"'
+            cumulative = 0
+            for bound, bucket_count in zip(DURATION_BUCKETS, buckets):
+                cumulative += bucket_count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {wall:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {count}')
+        family('http_request_db_seconds_total', 'counter', 'Time spent executing SQL by endpoint.')
+        for (endpoint, method), (_, _, db_time, _, _, _) in snapshot:
+            lines.append(f'http_request_db_seconds_total{{endpoint="{endpoint}",method="{method}"}} {db_time:.6f}')
+        family('http_request_sql_statements_total', 'counter', 'SQL statements executed by endpoint.')
+        for (endpoint, method), (_, _, _, statements, _, _) in snapshot:
+            lines.append(f'http_request_sql_statements_total{{endpoint="{endpoint}",method="{method}"}} {statements}')
+        family('http_response_size_bytes_total', 'counter', 'Response body bytes by endpoint (streamed responses excluded).')
+        for (endpoint, method), (_, _, _, _, response_bytes, _) in snapshot:
+            lines.append(f'http_response_size_bytes_total{{endpoint="{endpoint}",method="{method}"}} {response_bytes}')
+        return '\n'.join(lines) + '\n'
+
+    def _metrics_allowed(self):
+        if session.get('user_type') == 'admin' and session.get('admin_id'):
+            return True
+        token = request.headers.get('Authorization', '')
+        return bool(self.metrics_token) and hmac.compare_digest(token, f'Bearer {self.metrics_token}')
+
+    def metrics_view(self):
+        if not self._metrics_allowed():
+            return jsonify({'error': 'Admin access or metrics token required'}), 403
+        return Response(self.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@contextmanager
+def _metrics_lock(metrics_dir):
+    # Serializes folding exited workers' files between the workers sharing metrics_dir
+    with open(os.path.join(metrics_dir, LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _merge(totals, snapshot):
+    for key, (count, wall, db_time, statements, response_bytes, buckets) in snapshot.items():
+        if key in totals:
+            total = totals[key]
+            totals[key] = (total[0] + count, total[1] + wall, total[2] + db_time, total[3] + statements,
+                           total[4] + response_bytes, [a + b for a, b in zip(total[5], buckets)])
+        else:
+            totals[key] = (count, wall, db_time, statements, response_bytes, list(buckets))
+    return totals
+
+def _write_snapshot(path, snapshot):
+    # Written aside and renamed, so a scrape never reads half a file
+    partial = f'{path}.{os.getpid()}.tmp'
+    with open(partial, 'w') as output:
+        json.dump([[endpoint, method, *values] for (endpoint, method), values in snapshot.items()], output)
+    os.replace(partial, path)
+
+def _read_snapshot(path):
+    try:
+        with open(path) as source:
+            rows = json.load(source)
+    except (OSError, ValueError):
+        return {}
+    return {(row[0], row[1]): tuple(row[2:]) for row in rows}
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'profile' in g:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context() or 'profile' not in g:
+        return
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    profile = g.profile
+    profile['db'] += duration
+    profile['statements'] += 1
+    if profile['sql'] is not None:
+        profile['sql'].append((' '.join(statement.split())[:PROFILE_SQL_CHARS], duration))
+
+profiler = RequestProfiler()
@@ -0,0 +1,198 @@
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import IntegrityError
+from models import db, SalesRollup, ItemSalesRollup
+from order_queries import STORES
+
+SALES_TOTALS = ('orders_count', 'items_quantity', 'revenue', 'tax', 'grand_total', 'points_issued', 'completed_count')
+REBUILD_BATCH = 1000
+
+def _bucket(moment):
+    return moment.date(), moment.hour
+
+def _add(model, key, increments, latest=None):
+    # Counters only ever grow by a delta, so concurrent writers just add to the same row
+    criteria = [getattr(model, column) == value for column, value in key.items()]
+    values = {column: getattr(model, column) + delta for column, delta in increments.items()}
+    values.update(latest or {})
+    if db.session.execute(update(model).where(*criteria).values(**values)).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(model).values(**key, **increments, **(latest or {})))
+    except IntegrityError:
+        db.session.execute(update(model).where(*criteria).values(**values))
+
+def _add_rows(model, keys, rows, latest=()):
+    # One multi-row upsert, so a checkout costs the same statements however many items it has
+    counters = [column for column in rows[0] if column not in keys and column not in latest]
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        statement = mysql.insert(model).values(rows)
+        values = {column: getattr(model, column) + statement.inserted[column] for column in counters}
+        values.update({column: statement.inserted[column] for column in latest})
+        statement = statement.on_duplicate_key_update(values)
+    elif dialect == 'sqlite':
+        statement = sqlite.insert(model).values(rows)
+        values = {column: getattr(model, column) + statement.excluded[column] for column in counters}
+        values.update({column: statement.excluded[column] for column in latest})
+        statement = statement.on_conflict_do_update(index_elements=list(keys), set_=values)
+    else:
+        for row in rows:
+            _add(
+                model,
+                {column: row[column] for column in keys},
+                {column: row[column] for column in counters},
+                latest={column: row[column] for column in latest}
+            )
+        return
+    db.session.execute(statement)
+
+def _item_totals(lines):
+    totals = {}
+    for line in lines:
+        name, quantity, revenue = totals.get(line['food_id'], (line['food_name'], 0, Decimal('0.00')))
+        totals[line['food_id']] = (name, quantity + line['quantity'], revenue + line['item_total'])
+    return totals
+
+def record_order_created(order_time, quote, points_issued):
+    record_orders_created(order_time, [quote], points_issued)
+
+def record_orders_created(order_time, quotes, points_issued):
+    # Orders placed in the same hour share one delta per rollup row
+    day, hour = _bucket(order_time)
+    _add(SalesRollup, {'day': day, 'hour': hour}, {
+        'orders_count': len(quotes),
+        'items_quantity': sum(line['quantity'] for quote in quotes for line in quote['lines']),
+        'revenue': sum((quote['total_amount'] for quote in quotes), Decimal('0.00')),
+        'tax': sum((quote['tax_amount'] for quote in quotes), Decimal('0.00')),
+        'grand_total': sum((quote['grand_total'] for quote in quotes), Decimal('0.00')),
+        'points_issued': points_issued,
+    })
+    items = {}
+    for quote in quotes:
+        for food_id, (name, quantity, revenue) in _item_totals(quote['lines']).items():
+            _, orders_count, total_quantity, total_revenue = items.get(food_id, (name, 0, 0, Decimal('0.00')))
+            items[food_id] = (name, orders_count + 1, total_quantity + quantity, total_revenue + revenue)
+    if items:
+        # Sorted so concurrent checkouts lock the rows in the same order
+        _add_rows(ItemSalesRollup, ('day', 'food_id'), [
+            {'day': day, 'food_id': food_id, 'food_name': name, 'orders_count': orders_count, 'quantity': quantity, 'revenue': revenue}
+            for food_id, (name, orders_count, quantity, revenue) in sorted(items.items())
+        ], latest=('food_name',))
+
+def record_orders_completed(count, completed_time):
+    if count <= 0:
+        return
+    day, hour = _bucket(completed_time)
+    _add(SalesRollup, {'day': day, 'hour': hour}, {'completed_count': count})
+
+def record_orders_reopened(completed_times):
+    # Orders moved back out of completed leave the hour they were completed in
+    buckets = defaultdict(int)
+    for completed_time in completed_times:
+        if completed_time is not None:
+            buckets[_bucket(completed_time)] += 1
+    for (day, hour), count in sorted(buckets.items()):
+        _add(SalesRollup, {'day': day, 'hour': hour}, {'completed_count': -count})
+
+def sales_report(start, end, by_hour=False):
+    rows = db.session.execute(
+        select(SalesRollup)
+        .where(SalesRollup.day >= start, SalesRollup.day <= end)
+        .order_by(SalesRollup.day, SalesRollup.hour)
+    ).scalars()
+    buckets = {}
+    for row in rows:
+        key = (row.day, row.hour if by_hour else None)
+        bucket = buckets.setdefault(key, dict.fromkeys(SALES_TOTALS, 0))
+        for total in SALES_TOTALS:
+            bucket[total] += getattr(row, total)
+    report = []
+    for (day, hour), totals in buckets.items():
+        entry = {'day': day.isoformat()}
+        if by_hour:
+            entry['hour'] = hour
+        for total in ('revenue', 'tax', 'grand_total'):
+            totals[total] = float(totals[total])
+        entry.update(totals)
+        report.append(entry)
+    return report
+
+def top_items(start, end, limit):
+    quantity = func.sum(ItemSalesRollup.quantity).label('quantity')
+    rows = db.session.execute(
+        select(
+            ItemSalesRollup.food_id,
+            func.max(ItemSalesRollup.food_name).label('food_name'),
+            func.sum(ItemSalesRollup.orders_count).label('orders_count'),
+            quantity,
+            func.sum(ItemSalesRollup.revenue).label('revenue')
+        )
+        .where(ItemSalesRollup.day >= start, ItemSalesRollup.day <= end)
+        .group_by(ItemSalesRollup.food_id)
+        .order_by(quantity.desc(), ItemSalesRollup.food_id)
+        .limit(limit)
+    )
+    return [{
+        'food_id': row.food_id,
+        'food_name': row.food_name,
+        'orders_count': int(row.orders_count),
+        'quantity': int(row.quantity),
+        'revenue': float(row.revenue)
+    } for row in rows]
+
+def _rebuild_store(store, sales, items):
+    order_table, item_table = store.order, store.item
+    last_id = 0
+    while True:
+        orders = db.session.execute(
+            select(order_table.id, order_table.user_id, order_table.total_amount, order_table.tax_amount,
+                   order_table.grand_total, order_table.points_earned, order_table.order_time, order_table.completed_time)
+            .where(order_table.id > last_id)
+            .order_by(order_table.id)
+            .limit(REBUILD_BATCH)
+        ).all()
+        if not orders:
+            break
+        last_id = orders[-1].id
+        lines_by_order = defaultdict(list)
+        for line in db.session.execute(
+            select(item_table.order_id, item_table.food_id, item_table.food_name, item_table.quantity,
+                   item_table.item_total)
+            .where(item_table.order_id.in_([order.id for order in orders]))
+        ).mappings():
+            lines_by_order[line['order_id']].append(line)
+        for order in orders:
+            day, hour = _bucket(order.order_time)
+            lines = lines_by_order[order.id]
+            bucket = sales[(day, hour)]
+            bucket['orders_count'] += 1
+            bucket['items_quantity'] += sum(line['quantity'] for line in lines)
+            bucket['revenue'] += order.total_amount
+            bucket['tax'] += order.tax_amount
+            bucket['grand_total'] += order.grand_total
+            bucket['points_issued'] += order.points_earned if order.user_id is not None else 0
+            if order.completed_time is not None:
+                sales[_bucket(order.completed_time)]['completed_count'] += 1
+            for food_id, (name, quantity, revenue) in _item_totals(lines).items():
+                entry = items.setdefault((day, food_id), {'food_name': name, 'orders_count': 0, 'quantity': 0, 'revenue': 0})
+                entry['orders_count'] += 1
+                entry['quantity'] += quantity
+                entry['revenue'] += revenue
+
+def rebuild_rollups():
+    """Recomputes both rollup tables from hot and archived orders; a one-off full scan for backfills."""
+    sales = defaultdict(lambda: dict.fromkeys(SALES_TOTALS, 0))
+    items = {}
+    for store in STORES:
+        _rebuild_store(store, sales, items)
+    db.session.execute(delete(SalesRollup))
+    db.session.execute(delete(ItemSalesRollup))
+    if sales:
+        db.session.execute(insert(SalesRollup), [dict(totals, day=day, hour=hour) for (day, hour), totals in sales.items()])
+    if items:
+        db.session.execute(insert(ItemSalesRollup), [dict(totals, day=day, food_id=food_id) for (day, food_id), totals in items.items()])
+    db.session.commit()
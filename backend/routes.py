@@ -1,9 +1,25 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, jsonify, session, stream_with_context
 from models import db, User, Admin, Order, OrderItem, FoodItem
+from order_queries import ORDER_VIEWS, fetch_order_dicts, fetch_history_dicts, fetch_customer_order, fetch_past_orders_page, iter_past_orders, decode_past_cursor
+from scheduler import scheduler
+from events import TooManyStreams, feed, hub, publish_orders
+from menu_cache import menu_cache
+from passwords import PasswordHasherBusy
+from points import REWARD_COSTS, InsufficientPoints, RedemptionNotFound, RedemptionUsed, credit_points, redeem_reward, cancel_redemption, get_balance, open_redemptions, use_redemptions
+from idempotency import idempotency_cache, scoped_key
+from pricing import PricingError, price_order, price_table
+from eta import kitchen_eta, order_minutes
+from images import InvalidImage, image_store
+from rollups import record_order_created, record_orders_completed, record_orders_reopened, sales_report, top_items
+from bulk import BulkRequestError, apply_menu_changes, apply_order_statuses, parse_entries
+from kiosk import BatchRequestError, ingest_orders, order_owner, parse_batch
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+import os
 import re
 import uuid
 import secrets
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
 api = Blueprint('api', __name__)
 
@@ -60,6 +76,10 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return jsonify({'error': 'Server is busy, please try again'}), 503
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Registration failed. Please try again.'}), 500
@@ -73,6 +93,8 @@ def login():
         user = User.query.filter_by(email=data['email']).first()
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid email or password'}), 401
+        if user in db.session.dirty:
+            db.session.commit()
         session['user_id'] = user.id
         session['user_type'] = 'user'
         session.permanent = True
@@ -82,6 +104,9 @@ def login():
             'user': user.to_dict()
         }), 200
         
+    except PasswordHasherBusy:
+        return jsonify({'error': 'Server is busy, please try again'}), 503
+        
     except Exception as e:
         return jsonify({'error': f'Login failed: {str(e)}'}), 500
 
@@ -141,6 +166,8 @@ def admin_login():
         admin = Admin.query.filter_by(username=data['username']).first()
         if not admin or not admin.check_password(data['password']):
             return jsonify({'error': 'Invalid username or password'}), 401
+        if admin in db.session.dirty:
+            db.session.commit()
         session['admin_id'] = admin.id
         session['user_type'] = 'admin'
         session.permanent = True
@@ -150,6 +177,9 @@ def admin_login():
             'admin': admin.to_dict()
         }), 200
         
+    except PasswordHasherBusy:
+        return jsonify({'error': 'Server is busy, please try again'}), 503
+        
     except Exception as e:
         return jsonify({'error': f'Admin login failed: {str(e)}'}), 500
 
@@ -199,12 +229,17 @@ def get_orders():
         user_id = session.get('user_id')
         guest_id = session.get('guest_id')
         user_type = session.get('user_type')
+        try:
+            compact = parse_order_view()
+        except ValueError:
+            return jsonify({'error': INVALID_VIEW_ERROR}), 400
         
         if user_type == 'guest' and guest_id:
-            return jsonify({'orders': []}), 200
+            orders_data = fetch_history_dicts('guest_id', guest_id, compact=compact)
+            return jsonify({'orders': orders_data}), 200
         elif user_type == 'user' and user_id:
-            orders = Order.query.filter_by(user_id=user_id).order_by(Order.order_time.desc()).all()
-            return jsonify({'orders': [order.to_dict() for order in orders]}), 200
+            orders_data = fetch_history_dicts('user_id', user_id, compact=compact)
+            return jsonify({'orders': orders_data}), 200
         
         else:
             return jsonify({'error': 'Not authenticated'}), 401
@@ -219,62 +254,146 @@ def create_order():
         guest_id = session.get('guest_id')
         user_type = session.get('user_type')
         
-        if user_type not in ['user', 'guest']:
+        if user_type not in ['user', 'guest'] or (user_type == 'guest' and not guest_id):
             return jsonify({'error': 'Not authenticated'}), 401
         
         data = request.get_json()
-        required_fields = ['items', 'total_amount', 'tax_amount', 'grand_total', 'points_earned', 'estimated_time', 'payment_method']
+        order_user_id = user_id if user_type == 'user' else None
+        idempotency_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+        if idempotency_key:
+            owner = f'user:{user_id}' if user_type == 'user' else f'guest:{guest_id}'
+            try:
+                owner = order_owner(data.get('kiosk_id'), owner)
+            except BatchRequestError as e:
+                return jsonify({'error': str(e)}), 400
+            idempotency_key = scoped_key(owner, idempotency_key)
+            replay = find_idempotent_order(idempotency_key, order_user_id)
+            if replay is not None:
+                return replay
+        required_fields = ['items', 'payment_method']
         for field in required_fields:
             if field not in data:
                 return jsonify({'error': f'{field.replace("_", " ").title()} is required'}), 400
+        redemption_id = data.get('redemption_id')
+        if redemption_id is not None and (not isinstance(redemption_id, int) or isinstance(redemption_id, bool)):
+            return jsonify({'error': 'Invalid redemption'}), 400
+        # A reward line is only free against one of the customer's open redemptions
+        redemptions = open_redemptions(user_id, [redemption_id]) if user_type == 'user' and redemption_id else {}
+        try:
+            quote = price_order(data['items'], price_table.items(), rewards=set(redemptions.values()))
+        except PricingError as e:
+            return jsonify({'error': str(e)}), 400
+        eta_lines = [(line['food_id'], line['quantity']) for line in quote['lines']]
+        estimated_time = kitchen_eta.estimate(eta_lines)
         order_number = f"ORD-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
-        actual_user_id = user_id if user_type == 'user' else 1
         order = Order(
             order_number=order_number,
-            user_id=actual_user_id,
-            total_amount=data['total_amount'],
-            tax_amount=data['tax_amount'],
-            grand_total=data['grand_total'],
-            points_earned=data['points_earned'],
-            estimated_time=data['estimated_time'],
+            user_id=order_user_id,
+            guest_id=guest_id if user_type == 'guest' else None,
+            total_amount=quote['total_amount'],
+            tax_amount=quote['tax_amount'],
+            grand_total=quote['grand_total'],
+            points_earned=quote['points_earned'],
+            estimated_time=estimated_time,
             payment_method=data['payment_method'],
-            payment_details=data.get('payment_details', {})
+            payment_details=data.get('payment_details', {}),
+            idempotency_key=idempotency_key
         )
         
         db.session.add(order)
-        db.session.flush()
-        for item in data['items']:
-            food_item = FoodItem.query.get(item['foodId'])
-            if not food_item:
-                return jsonify({'error': f'Food item with ID {item["foodId"]} not found'}), 400
-            
-            order_item = OrderItem(
-                order_id=order.id,
-                food_id=item['foodId'],
-                food_name=food_item.name,
-                food_price=food_item.price,
-                quantity=item['quantity'],
-                has_extra=item.get('hasExtra', False),
-                item_total=food_item.price * item['quantity']
-            )
-            db.session.add(order_item)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            replay = find_idempotent_order(idempotency_key, order_user_id) if idempotency_key else None
+            if replay is None:
+                raise
+            return replay
+        order_items = [dict(line, order_id=order.id) for line in quote['lines']]
+        if order_items:
+            db.session.execute(insert(OrderItem), order_items)
+        if quote['reward_id'] is not None:
+            use_redemptions(user_id, [(redemption_id, quote['reward_id'], order.id)])
+        points_issued = 0
         if user_type == 'user' and user_id:
-            user = User.query.get(user_id)
-            if user:
-                current_points = user.points or 0
-                user.points = current_points + data['points_earned']
+            credit_points(user_id, quote['points_earned'], 'order', order_id=order.id)
+            points_issued = quote['points_earned']
+        record_order_created(order.order_time, quote, points_issued)
         
         db.session.commit()
+        kitchen_eta.add(order.id, eta_lines, estimated_time)
+        scheduler.schedule_ready(order.id, order.order_time, order.estimated_time)
+        publish_orders('order_created', [order.id])
         
-        return jsonify({
+        response_data = {
             'message': 'Order created successfully',
             'order': order.to_dict()
-        }), 201
+        }
+        if idempotency_key:
+            idempotency_cache.set(idempotency_key, response_data)
+        return jsonify(response_data), 201
         
+    except RedemptionNotFound:
+        db.session.rollback()
+        return jsonify({'error': 'This reward has already been used or cancelled'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to create order'}), 500
 
+@api.route('/orders/batch', methods=['POST'])
+def create_orders_batch():
+    try:
+        user_id = session.get('user_id')
+        guest_id = session.get('guest_id')
+        user_type = session.get('user_type')
+        
+        if user_type not in ['user', 'guest'] or (user_type == 'guest' and not guest_id):
+            return jsonify({'error': 'Not authenticated'}), 401
+        
+        data = request.get_json(silent=True) or {}
+        try:
+            orders = parse_batch(data.get('orders'))
+        except BatchRequestError as e:
+            return jsonify({'error': str(e)}), 400
+        owner = f'user:{user_id}' if user_type == 'user' else f'guest:{guest_id}'
+        results, created = ingest_orders(
+            orders,
+            owner,
+            user_id if user_type == 'user' else None,
+            guest_id if user_type == 'guest' else None,
+            datetime.utcnow()
+        )
+        
+        db.session.commit()
+        for order_id, order_time, estimated_time, eta_lines in created:
+            kitchen_eta.add(order_id, eta_lines, estimated_time)
+            scheduler.schedule_ready(order_id, order_time, estimated_time)
+        publish_orders('order_created', [order_id for order_id, _, _, _ in created])
+        
+        return jsonify({'results': results, 'created': len(created)}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to create orders'}), 500
+
+def find_idempotent_order(idempotency_key, user_id):
+    response_data = idempotency_cache.get(idempotency_key)
+    if response_data is None:
+        orders = fetch_order_dicts(Order.idempotency_key == idempotency_key)
+        if not orders:
+            return None
+        response_data = {
+            'message': 'Order created successfully',
+            'order': orders[0]
+        }
+        idempotency_cache.set(idempotency_key, response_data)
+    # Kiosk-scoped keys are shared by every session on the kiosk
+    if response_data['order']['user_id'] != user_id:
+        return jsonify({'error': 'Idempotency key already used'}), 409
+    response = jsonify(response_data)
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response, 201
+
 @api.route('/orders/<int:order_id>', methods=['GET'])
 def get_order(order_id):
     try:
@@ -284,13 +403,14 @@ def get_order(order_id):
         
         if user_type not in ['user', 'guest']:
             return jsonify({'error': 'Not authenticated'}), 401
-        actual_user_id = user_id if user_type == 'user' else 1
-        
-        order = Order.query.filter_by(id=order_id, user_id=actual_user_id).first()
+        if user_type == 'guest':
+            order = fetch_customer_order(order_id, 'guest_id', guest_id) if guest_id else None
+        else:
+            order = fetch_customer_order(order_id, 'user_id', user_id)
         if not order:
             return jsonify({'error': 'Order not found'}), 404
         
-        return jsonify({'order': order.to_dict()}), 200
+        return jsonify({'order': order}), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch order'}), 500
@@ -314,13 +434,16 @@ def update_order_status(order_id):
         if not order:
             return jsonify({'error': 'Order not found'}), 404
         
+        old_status = order.status
         order.status = new_status
+        now = datetime.utcnow()
         if new_status == 'ready' and not order.ready_time:
-            order.ready_time = datetime.now(timezone.utc)
-        elif new_status == 'completed' and not order.completed_time:
-            order.completed_time = datetime.now(timezone.utc)
+            order.ready_time = now
+        record_completion_change(order, old_status, now)
         
         db.session.commit()
+        schedule_status_transition(order)
+        publish_orders('order_status', [order.id])
         
         return jsonify({
             'message': 'Order status updated successfully',
@@ -331,47 +454,108 @@ def update_order_status(order_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to update order status'}), 500
 
+def record_completion_change(order, old_status, now):
+    # completed_time is set exactly while an order is completed, so rebuild_rollups
+    # counts the same completions as the live rollup
+    if order.status == old_status:
+        return
+    if order.status == 'completed':
+        order.completed_time = now
+        record_orders_completed(1, now)
+    elif old_status == 'completed':
+        record_orders_reopened([order.completed_time])
+        order.completed_time = None
+
+def schedule_status_transition(order):
+    if order.status == 'current':
+        scheduler.schedule_ready(order.id, order.order_time, order.estimated_time)
+        return
+    kitchen_eta.finish(order.id, order_minutes(order))
+    if order.status == 'ready' and order.ready_time:
+        scheduler.schedule_completed(order.id, order.ready_time)
+
 @api.route('/orders/update-status', methods=['POST'])
 def update_order_statuses():
+    # Read-only: the scheduler moves orders, this only reports which of the
+    # caller's orders changed since the cursor it got back last time
     try:
-        current_time = datetime.now(timezone.utc)
-        updated_orders = []
-        current_orders = Order.query.filter_by(status='current').all()
-        for order in current_orders:
-            order_time = order.order_time
-            elapsed_minutes = (current_time - order_time).total_seconds() / 60
-            if elapsed_minutes >= order.estimated_time:
-                order.status = 'ready'
-                if not order.ready_time:
-                    order.ready_time = current_time
-                order.updated_at = current_time
-                updated_orders.append(order.id)
-        ready_orders = Order.query.filter_by(status='ready').all()
-        for order in ready_orders:
-            if order.ready_time:
-                time_since_ready = (current_time - order.ready_time).total_seconds() / 60
-                if time_since_ready >= 60:
-                    order.status = 'completed'
-                    if not order.completed_time:
-                        order.completed_time = current_time
-                    order.updated_at = current_time
-                    updated_orders.append(order.id)
-        
-        if updated_orders:
-            db.session.commit()
-            return jsonify({
-                'message': f'Updated {len(updated_orders)} orders',
-                'updated_order_ids': updated_orders
-            }), 200
+        user_id = session.get('user_id')
+        guest_id = session.get('guest_id')
+        user_type = session.get('user_type')
+        
+        if user_type == 'user' and user_id:
+            owner = Order.user_id == user_id
+        elif user_type == 'guest' and guest_id:
+            owner = Order.guest_id == guest_id
         else:
-            return jsonify({
-                'message': 'No orders needed updating',
-                'updated_order_ids': []
-            }), 200
-            
+            return jsonify({'error': 'Not authenticated'}), 401
+        
+        data = request.get_json(silent=True) or {}
+        cursor = datetime.utcnow() - CURSOR_OVERLAP
+        since = data.get('since')
+        try:
+            since_time = parse_cursor(since) if since else cursor - STATUS_CHECK_WINDOW
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid since cursor'}), 400
+        updated_orders = db.session.execute(
+            select(Order.id).where(owner, Order.updated_at >= since_time)
+        ).scalars().all()
+        return jsonify({
+            'message': f'Updated {len(updated_orders)} orders' if updated_orders else 'No orders needed updating',
+            'updated_order_ids': updated_orders,
+            'cursor': cursor.isoformat()
+        }), 200
+        
     except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': 'Failed to update order statuses'}), 500
+        return jsonify({'error': 'Failed to check order statuses'}), 500
+
+ACTIVE_STATUSES = ['current', 'ready']
+CURSOR_OVERLAP = timedelta(seconds=5)
+STATUS_CHECK_WINDOW = timedelta(seconds=60)
+
+def parse_cursor(value):
+    cursor = datetime.fromisoformat(value)
+    if cursor.tzinfo is not None:
+        cursor = cursor.astimezone(timezone.utc).replace(tzinfo=None)
+    return cursor
+
+def parse_order_view():
+    # ?view=compact opts into the smaller order/item dicts
+    view = request.args.get('view', 'full')
+    if view not in ORDER_VIEWS:
+        raise ValueError(view)
+    return view == 'compact'
+
+INVALID_VIEW_ERROR = 'Invalid view. Must be full or compact'
+
+@api.route('/orders/stream', methods=['GET'])
+def stream_orders():
+    user_id = session.get('user_id')
+    admin_id = session.get('admin_id')
+    guest_id = session.get('guest_id')
+    user_type = session.get('user_type')
+    
+    try:
+        if user_type == 'admin' and admin_id:
+            subscription = hub.subscribe()
+        elif user_type == 'user' and user_id:
+            subscription = hub.subscribe(user_id=user_id)
+        elif user_type == 'guest' and guest_id:
+            subscription = hub.subscribe(guest_id=guest_id)
+        else:
+            return jsonify({'error': 'Not authenticated'}), 401
+    except TooManyStreams:
+        # The page keeps polling, so it only loses instant updates
+        return jsonify({'error': 'Too many open order streams'}), 503, {'Retry-After': '30'}
+    feed.ensure_started()
+    
+    response = Response(hub.stream(subscription), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # A stream closed before its first chunk never runs the generator's cleanup
+    response.call_on_close(lambda: hub.unsubscribe(subscription))
+    return response
 
 @api.route('/admin/orders', methods=['GET'])
 def get_all_orders():
@@ -381,15 +565,45 @@ def get_all_orders():
             
         if session['user_type'] != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
-        orders = db.session.query(Order, User).join(User, Order.user_id == User.id).filter(Order.status.in_(['current', 'ready'])).order_by(Order.order_time.desc()).all()
+        try:
+            compact = parse_order_view()
+        except ValueError:
+            return jsonify({'error': INVALID_VIEW_ERROR}), 400
+        since = request.args.get('since')
+        cursor = datetime.utcnow() - CURSOR_OVERLAP
+        if since:
+            try:
+                since_time = parse_cursor(since)
+            except ValueError:
+                return jsonify({'error': 'Invalid since cursor'}), 400
+            changed_orders = fetch_order_dicts(
+                Order.updated_at >= since_time,
+                order_by=(Order.order_time.desc(),),
+                include_user_name=True,
+                compact=compact
+            )
+            orders_data = [order for order in changed_orders if order['status'] in ACTIVE_STATUSES]
+            removed_ids = [order['id'] for order in changed_orders if order['status'] not in ACTIVE_STATUSES]
+            return jsonify({
+                'orders': orders_data,
+                'removed_ids': removed_ids,
+                'cursor': cursor.isoformat(),
+                'full': False
+            }), 200
         
-        orders_data = []
-        for order, user in orders:
-            order_dict = order.to_dict()
-            order_dict['user_name'] = f"{user.first_name} {user.last_name}"
-            orders_data.append(order_dict)
+        orders_data = fetch_order_dicts(
+            Order.status.in_(ACTIVE_STATUSES),
+            order_by=(Order.order_time.desc(),),
+            include_user_name=True,
+            compact=compact
+        )
             
-        return jsonify({'orders': orders_data}), 200
+        return jsonify({
+            'orders': orders_data,
+            'removed_ids': [],
+            'cursor': cursor.isoformat(),
+            'full': True
+        }), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch orders'}), 500
@@ -411,27 +625,78 @@ def update_order_status_admin(order_id):
             
         if new_status not in ['current', 'ready', 'completed']:
             return jsonify({'error': 'Invalid status. Must be current, ready, or completed'}), 400
+        try:
+            compact = parse_order_view()
+        except ValueError:
+            return jsonify({'error': INVALID_VIEW_ERROR}), 400
         order = Order.query.get(order_id)
         if not order:
             return jsonify({'error': 'Order not found'}), 404
         old_status = order.status
         order.status = new_status
+        now = datetime.utcnow()
         if new_status == 'ready' and old_status == 'current':
-            order.ready_time = datetime.now()
-        elif new_status == 'completed' and old_status == 'ready':
-            order.completed_time = datetime.now()
+            order.ready_time = now
+        record_completion_change(order, old_status, now)
             
         db.session.commit()
+        schedule_status_transition(order)
+        publish_orders('order_status', [order.id])
         
         return jsonify({
             'message': f'Order status updated from {old_status} to {new_status}',
-            'order': order.to_dict()
+            'order': order.to_dict(compact=compact)
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to update order status'}), 500
 
+@api.route('/admin/orders/bulk-status', methods=['POST'])
+def bulk_update_order_status():
+    try:
+        if 'admin_id' not in session or 'user_type' not in session:
+            return jsonify({'error': 'Authentication required'}), 401
+        if session['user_type'] != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        data = request.get_json(silent=True) or {}
+        # Either {"updates": [{"id": 1, "status": "ready"}, ...]} or {"order_ids": [...], "status": "ready"}
+        updates = data.get('updates')
+        if updates is None and isinstance(data.get('order_ids'), list):
+            updates = [{'id': order_id, 'status': data.get('status')} for order_id in data['order_ids']]
+        try:
+            updates = parse_entries(updates)
+        except BulkRequestError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        results, changed = apply_order_statuses(updates, datetime.utcnow())
+        db.session.commit()
+        if changed:
+            for order in db.session.execute(
+                select(Order.id, Order.status, Order.order_time, Order.estimated_time, Order.ready_time)
+                .where(Order.id.in_(changed))
+            ):
+                schedule_status_transition(order)
+            publish_orders('order_status', changed)
+        
+        return jsonify({'results': results, 'updated': len(changed)}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update order statuses'}), 500
+
+PAST_ORDERS_PAGE_SIZE = 50
+PAST_ORDERS_MAX_PAGE_SIZE = 200
+PAST_ORDERS_STREAM_BATCH = 500
+
+def stream_json_array(key, rows):
+    yield f'{{"{key}": ['
+    separator = ''
+    for row in rows:
+        yield separator + current_app.json.dumps(row)
+        separator = ','
+    yield ']}'
+
 @api.route('/admin/orders/past', methods=['GET'])
 def get_past_orders():
     try:
@@ -439,19 +704,96 @@ def get_past_orders():
             return jsonify({'error': 'Authentication required'}), 401
         if session['user_type'] != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
-        orders = db.session.query(Order, User).join(User, Order.user_id == User.id).filter(Order.status == 'completed').order_by(Order.completed_time.desc()).all()
-        
-        orders_data = []
-        for order, user in orders:
-            order_dict = order.to_dict()
-            order_dict['user_name'] = f"{user.first_name} {user.last_name}"
-            orders_data.append(order_dict)
+        try:
+            compact = parse_order_view()
+        except ValueError:
+            return jsonify({'error': INVALID_VIEW_ERROR}), 400
+        stream = request.args.get('stream')
+        if stream == 'ndjson':
+            lines = (current_app.json.dumps(order) + '\n' for order in iter_past_orders(PAST_ORDERS_STREAM_BATCH, compact=compact))
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+        if stream == 'array':
+            orders = iter_past_orders(PAST_ORDERS_STREAM_BATCH, compact=compact)
+            return Response(stream_with_context(stream_json_array('orders', orders)), mimetype='application/json')
+        if stream:
+            return jsonify({'error': 'Invalid stream format. Must be ndjson or array'}), 400
+        
+        limit = request.args.get('limit', PAST_ORDERS_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, PAST_ORDERS_MAX_PAGE_SIZE))
+        after = request.args.get('after')
+        if after:
+            try:
+                after = decode_past_cursor(after)
+            except ValueError:
+                return jsonify({'error': 'Invalid after cursor'}), 400
+        orders_data, next_cursor = fetch_past_orders_page(limit, after=after or None, compact=compact)
             
-        return jsonify({'orders': orders_data}), 200
+        return jsonify({'orders': orders_data, 'next_cursor': next_cursor}), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch past orders'}), 500
 
+REPORT_DEFAULT_DAYS = 30
+REPORT_MAX_DAYS = 366
+TOP_ITEMS_LIMIT = 10
+
+def parse_report_range():
+    today = datetime.utcnow().date()
+    end = request.args.get('to')
+    start = request.args.get('from')
+    end = date.fromisoformat(end) if end else today
+    start = date.fromisoformat(start) if start else end - timedelta(days=REPORT_DEFAULT_DAYS - 1)
+    if start > end or (end - start).days >= REPORT_MAX_DAYS:
+        raise ValueError('Invalid report range')
+    return start, end
+
+@api.route('/admin/reports/sales', methods=['GET'])
+def get_sales_report():
+    try:
+        if 'admin_id' not in session or 'user_type' not in session:
+            return jsonify({'error': 'Authentication required'}), 401
+        if session['user_type'] != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        granularity = request.args.get('granularity', 'day')
+        if granularity not in ['day', 'hour']:
+            return jsonify({'error': 'Invalid granularity. Must be day or hour'}), 400
+        try:
+            start, end = parse_report_range()
+        except ValueError:
+            return jsonify({'error': f'Invalid date range. Use YYYY-MM-DD, at most {REPORT_MAX_DAYS} days'}), 400
+        
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'granularity': granularity,
+            'sales': sales_report(start, end, by_hour=granularity == 'hour')
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch sales report'}), 500
+
+@api.route('/admin/reports/items', methods=['GET'])
+def get_item_report():
+    try:
+        if 'admin_id' not in session or 'user_type' not in session:
+            return jsonify({'error': 'Authentication required'}), 401
+        if session['user_type'] != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        limit = max(1, min(request.args.get('limit', TOP_ITEMS_LIMIT, type=int), 100))
+        try:
+            start, end = parse_report_range()
+        except ValueError:
+            return jsonify({'error': f'Invalid date range. Use YYYY-MM-DD, at most {REPORT_MAX_DAYS} days'}), 400
+        
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'items': top_items(start, end, limit)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch item report'}), 500
+
 @api.route('/admin/menu', methods=['GET'])
 def get_menu_items():
     try:
@@ -482,7 +824,9 @@ def update_menu_item(item_id):
             return jsonify({'error': 'Menu item not found'}), 404
         menu_item.price = new_price
         menu_item.updated_at = datetime.now()
+        menu_cache.bump()
         db.session.commit()
+        menu_cache.invalidate()
         
         return jsonify({
             'message': 'Menu item updated successfully',
@@ -505,7 +849,9 @@ def delete_menu_item(item_id):
             return jsonify({'error': 'Menu item not found'}), 404
         image_path = menu_item.image_path
         db.session.delete(menu_item)
+        menu_cache.bump()
         db.session.commit()
+        menu_cache.invalidate()
         cleanup_image_file(image_path)
         
         return jsonify({
@@ -516,6 +862,34 @@ def delete_menu_item(item_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to delete menu item'}), 500
 
+@api.route('/admin/menu/bulk', methods=['POST'])
+def bulk_update_menu():
+    try:
+        if 'admin_id' not in session or 'user_type' not in session:
+            return jsonify({'error': 'Authentication required'}), 401
+        if session['user_type'] != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        data = request.get_json(silent=True) or {}
+        # {"changes": [{"id": 1, "price": 20}, {"id": 2, "is_available": false}, {"id": 3, "delete": true}]}
+        try:
+            changes = parse_entries(data.get('changes'))
+        except BulkRequestError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        results, released = apply_menu_changes(changes, datetime.utcnow())
+        if any(result.get('result') for result in results):
+            menu_cache.bump()
+        db.session.commit()
+        menu_cache.invalidate()
+        for image_path in released:
+            cleanup_image_file(image_path)
+        
+        return jsonify({'results': results}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update menu items'}), 500
+
 @api.route('/admin/menu', methods=['POST'])
 def add_menu_item():
     try:
@@ -541,7 +915,9 @@ def add_menu_item():
         )
         
         db.session.add(new_item)
+        menu_cache.bump()
         db.session.commit()
+        menu_cache.invalidate()
         
         return jsonify({
             'message': 'Menu item added successfully',
@@ -557,14 +933,11 @@ def cleanup_image_file(image_path):
         return  # Skip predefined images or external URLs
     
     try:
-        import os
-        filename = os.path.basename(image_path)
-        src_image_path = os.path.join('..', 'frontend', 'src', 'assets', filename)
-        if os.path.exists(src_image_path):
-            os.remove(src_image_path)
-        public_image_path = os.path.join('..', 'frontend', 'public', 'assets', filename)
-        if os.path.exists(public_image_path):
-            os.remove(public_image_path)
+        if image_store.release(image_path):
+            # Uploads from before the image store were also copied into src/assets
+            legacy_path = os.path.join('..', 'frontend', 'src', 'assets', os.path.basename(image_path))
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
     except Exception:
         pass
 
@@ -582,23 +955,15 @@ def upload_image():
             return jsonify({'error': 'No file selected'}), 400
         if not file.filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
             return jsonify({'error': 'Invalid file type. Only images are allowed.'}), 400
-        import uuid
-        import os
-        filename = str(uuid.uuid4()) + '.' + file.filename.rsplit('.', 1)[1].lower()
-        src_assets_dir = os.path.join('..', 'frontend', 'src', 'assets')
-        os.makedirs(src_assets_dir, exist_ok=True)
-        public_assets_dir = os.path.join('..', 'frontend', 'public', 'assets')
-        os.makedirs(public_assets_dir, exist_ok=True)
-        src_assets_path = os.path.join(src_assets_dir, filename)
-        file.save(src_assets_path)
-        import shutil
-        public_assets_path = os.path.join(public_assets_dir, filename)
-        shutil.copy2(src_assets_path, public_assets_path)
-        image_path = f"/assets/{filename}"
+        try:
+            image_path = image_store.save(file.stream)
+        except InvalidImage as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
             'message': 'Image uploaded successfully',
-            'image_path': image_path
+            'image_path': image_path,
+            'image_variants': image_store.variants(image_path)
         }), 200
         
     except Exception as e:
@@ -612,16 +977,13 @@ def get_user_points():
         
         if user_type != 'user' or not user_id:
             return jsonify({'error': 'Not authenticated as user'}), 401
-        user = User.query.get(user_id)
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        return jsonify({'points': user.points or 0}), 200
+        return jsonify({'points': get_balance(user_id)}), 200
         
     except Exception as e:
         return jsonify({'error': f'Failed to fetch points: {str(e)}'}), 500
 
-@api.route('/user/points', methods=['PUT'])
-def update_user_points():
+@api.route('/user/points/redeem', methods=['POST'])
+def redeem_user_points():
     try:
         user_id = session.get('user_id')
         user_type = session.get('user_type')
@@ -630,22 +992,52 @@ def update_user_points():
             return jsonify({'error': 'Not authenticated as user'}), 401
         
         data = request.get_json()
-        new_points = data.get('points')
+        reward_id = data.get('reward_id')
+        if reward_id not in REWARD_COSTS:
+            return jsonify({'error': 'Invalid reward'}), 400
         
-        if new_points is None or new_points < 0:
-            return jsonify({'error': 'Invalid points value'}), 400
-        user = User.query.get(user_id)
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        redemption_id = redeem_reward(user_id, reward_id)
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Reward redeemed successfully',
+            'redemption_id': redemption_id,
+            'points': get_balance(user_id)
+        }), 200
         
-        user.points = new_points
+    except InsufficientPoints:
+        db.session.rollback()
+        return jsonify({'error': 'Not enough points for this reward'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to redeem reward'}), 500
+
+@api.route('/user/points/redemptions/<int:redemption_id>/cancel', methods=['POST'])
+def cancel_user_redemption(redemption_id):
+    try:
+        user_id = session.get('user_id')
+        user_type = session.get('user_type')
+        
+        if user_type != 'user' or not user_id:
+            return jsonify({'error': 'Not authenticated as user'}), 401
+        
+        cancel_redemption(user_id, redemption_id)
         db.session.commit()
         
-        return jsonify({'message': 'Points updated successfully', 'points': new_points}), 200
+        return jsonify({
+            'message': 'Redemption cancelled successfully',
+            'points': get_balance(user_id)
+        }), 200
         
+    except RedemptionUsed:
+        db.session.rollback()
+        return jsonify({'error': 'This reward has already been used in an order'}), 409
+    except RedemptionNotFound:
+        db.session.rollback()
+        return jsonify({'error': 'Redemption not found or already cancelled'}), 404
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': 'Failed to update user points'}), 500
+        return jsonify({'error': 'Failed to cancel redemption'}), 500
 
 @api.route('/user/change-password', methods=['PUT'])
 def change_user_password():
@@ -675,6 +1067,10 @@ def change_user_password():
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return jsonify({'error': 'Server is busy, please try again'}), 503
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to change password: {str(e)}'}), 500
@@ -730,6 +1126,10 @@ def reset_password():
         
         return jsonify({'message': 'Password reset successfully'}), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return jsonify({'error': 'Server is busy, please try again'}), 503
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to reset password: {str(e)}'}), 500
@@ -737,8 +1137,15 @@ def reset_password():
 @api.route('/food-items', methods=['GET'])
 def get_food_items():
     try:
-        food_items = FoodItem.query.filter_by(is_available=True, is_reward=False).all()
-        return jsonify({'food_items': [item.to_dict() for item in food_items]}), 200
+        etag, body = menu_cache.get()
+        # Weak comparison: compression turns the stored tag into W/"..."
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch food items'}), 500
@@ -771,6 +1178,10 @@ def admin_change_password():
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return jsonify({'error': 'Server is busy, please try again'}), 503
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to change password'}), 500
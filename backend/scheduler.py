@@ -0,0 +1,181 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+from models import db, Order
+from events import publish_orders
+from eta import kitchen_eta
+from rollups import record_orders_completed
+
+READY_TO_COMPLETED = timedelta(minutes=60)
+
+class OrderStatusScheduler:
+    """Moves orders current -> ready -> completed at their due times.
+
+    Due transitions live in a heap ordered by due time, so the worker thread
+    sleeps until the next one instead of sweeping the orders table. Each batch
+    is applied with a guarded UPDATE, which keeps several workers running their
+    own scheduler from stepping on each other. The thread starts on the first
+    request a worker serves and loads the pending orders from the database.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._heap = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['order_scheduler'] = self
+        if app.config.get('ORDER_SCHEDULER_ENABLED', True):
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self.start()
+
+    def start(self):
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='order-status-scheduler', daemon=True)
+        try:
+            with self.app.app_context():
+                self.load_pending()
+        except Exception:
+            self._thread = None
+            return
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def load_pending(self):
+        current = db.session.execute(
+            select(Order.id, Order.order_time, Order.estimated_time).where(Order.status == 'current')
+        ).all()
+        ready = db.session.execute(
+            select(Order.id, Order.ready_time).where(Order.status == 'ready')
+        ).all()
+        with self._condition:
+            for row in current:
+                self._push(row.order_time + timedelta(minutes=row.estimated_time), row.id, 'ready')
+            for row in ready:
+                if row.ready_time:
+                    self._push(row.ready_time + READY_TO_COMPLETED, row.id, 'completed')
+            self._condition.notify()
+
+    def schedule_ready(self, order_id, order_time, estimated_time):
+        self._schedule(order_time + timedelta(minutes=estimated_time), order_id, 'ready')
+
+    def schedule_completed(self, order_id, ready_time):
+        self._schedule(ready_time + READY_TO_COMPLETED, order_id, 'completed')
+
+    def _schedule(self, due, order_id, status):
+        if self._thread is None:
+            return
+        with self._condition:
+            self._push(due, order_id, status)
+            self._condition.notify()
+
+    def _push(self, due, order_id, status):
+        heapq.heappush(self._heap, (due, order_id, status))
+
+    def _pop_due(self, now):
+        due = {'ready': [], 'completed': []}
+        while self._heap and self._heap[0][0] <= now:
+            _, order_id, status = heapq.heappop(self._heap)
+            due[status].append(order_id)
+        return due
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    now = datetime.utcnow()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+                    self._condition.wait(timeout)
+                if self._stopping:
+                    return
+                due = self._pop_due(datetime.utcnow())
+            try:
+                with self.app.app_context():
+                    self.apply(due)
+            except Exception:
+                with self.app.app_context():
+                    db.session.rollback()
+                time.sleep(1)
+                with self._condition:
+                    for status, order_ids in due.items():
+                        for order_id in order_ids:
+                            self._push(datetime.utcnow(), order_id, status)
+
+    def _transition(self, order_ids, criteria, values, now):
+        # The locking read waits out another worker's scheduler and then sees its
+        # committed statuses, so each transition is claimed by exactly one worker
+        claimed = db.session.execute(
+            select(Order.id).where(Order.id.in_(order_ids), *criteria).with_for_update()
+        ).scalars().all()
+        if not claimed:
+            return []
+        result = db.session.execute(
+            update(Order).where(Order.id.in_(claimed), *criteria).values(updated_at=now, **values)
+        )
+        if result.rowcount == len(claimed):
+            return claimed
+        # Without row locks (SQLite) another worker can move some rows between the
+        # SELECT and the UPDATE; keep only the rows this UPDATE stamped
+        return db.session.execute(
+            select(Order.id).where(Order.id.in_(claimed), Order.updated_at == now)
+        ).scalars().all()
+
+    def apply(self, due, now=None):
+        now = now or datetime.utcnow()
+        updated = []
+        if due.get('ready'):
+            ready_ids = self._transition(
+                due['ready'],
+                (Order.status == 'current',),
+                {'status': 'ready', 'ready_time': db.func.coalesce(Order.ready_time, now)},
+                now
+            )
+            updated.extend(ready_ids)
+            # Due orders leave this worker's kitchen queue even if another worker moved them
+            for order_id in due['ready']:
+                kitchen_eta.finish(order_id)
+        if due.get('completed'):
+            cutoff = now - READY_TO_COMPLETED
+            completed_ids = self._transition(
+                due['completed'],
+                (Order.status == 'ready', Order.ready_time <= cutoff),
+                {'status': 'completed', 'completed_time': db.func.coalesce(Order.completed_time, now)},
+                now
+            )
+            record_orders_completed(len(completed_ids), now)
+            updated.extend(completed_ids)
+        db.session.commit()
+        if updated:
+            ready_times = dict(db.session.execute(
+                select(Order.id, Order.ready_time).where(Order.id.in_(updated), Order.status == 'ready')
+            ).all())
+            with self._condition:
+                for order_id, ready_time in ready_times.items():
+                    self._push(ready_time + READY_TO_COMPLETED, order_id, 'completed')
+                self._condition.notify()
+            publish_orders('order_status', updated)
+        return updated
+
+scheduler = OrderStatusScheduler()
@@ -0,0 +1,97 @@
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Config reads the environment when it is imported, so this has to run before app is
+SCRATCH_DIR = tempfile.mkdtemp(prefix='ready-to-eat-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'test.sqlite')}"
+os.environ['IMAGE_STORAGE_DIR'] = os.path.join(SCRATCH_DIR, 'images')
+os.environ['ORDER_SCHEDULER_ENABLED'] = 'False'
+os.environ['ORDER_FEED_ENABLED'] = 'False'
+os.environ['PASSWORD_HASH_WORKERS'] = '0'
+os.environ['MENU_CACHE_TTL'] = '3600'
+os.environ.pop('METRICS_DIR', None)
+
+PASSWORD = 'Password123!'
+_emails = itertools.count(1)
+
+@pytest.fixture(scope='session')
+def app():
+    """One scratch SQLite app with the setup.sql menu, shared by every test.
+
+    Tests keep out of each other's way by signing up their own users and
+    only looking at the orders they placed.
+    """
+    from sqlalchemy import insert
+    from app import create_app
+    from bootstrap import bootstrap, load_setup_menu
+    from models import db, FoodItem
+    from passwords import hasher
+
+    app = create_app()
+    app.config['TESTING'] = True
+    bootstrap(app)
+    with app.app_context():
+        db.session.execute(insert(FoodItem), load_setup_menu())
+        db.session.commit()
+    yield app
+    hasher.shutdown()
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+@pytest.fixture
+def guest(app):
+    client = app.test_client()
+    client.post('/api/guest/access')
+    return client
+
+@pytest.fixture
+def make_user(app):
+    """Signs up a new customer and returns a client logged in as them."""
+    def make():
+        client = app.test_client()
+        response = client.post('/api/register', json={
+            'first_name': 'Test',
+            'last_name': 'Customer',
+            'email': f'customer{next(_emails)}@example.com',
+            'password': PASSWORD,
+            'mobile': '9876543210'
+        })
+        assert response.status_code == 201
+        client.user_id = response.get_json()['user']['id']
+        return client
+    return make
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+@pytest.fixture
+def admin(app):
+    client = app.test_client()
+    response = client.post('/api/admin/login', json={'username': 'admin', 'password': 'Admin123!'})
+    assert response.status_code == 200
+    return client
+
+@pytest.fixture
+def statements(app):
+    """Every SQL statement sent to the database while the test runs."""
+    from sqlalchemy import event
+    from models import db
+
+    with app.app_context():
+        engine = db.engine
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
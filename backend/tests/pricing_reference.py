@@ -0,0 +1,25 @@
+"""Order pricing in plain Decimal arithmetic, the way create_order priced
+orders before the price table. test_pricing.py and benchmarks/pricing.py
+both check price_order against it."""
+import math
+from decimal import Decimal, ROUND_HALF_UP
+
+def paisa_prices(prices, rng):
+    # Whole-rupee menu prices never hit the tax rounding; odd paisa amounts do
+    return {food_id: price + Decimal(rng.randint(0, 99)).scaleb(-2) if price else price for food_id, price in prices.items()}
+
+def random_cart(rng, regular_ids, reward_id=None):
+    lines = [{'foodId': rng.choice(regular_ids), 'quantity': rng.randint(1, 12)} for _ in range(rng.randint(1, 10))]
+    if reward_id is not None and rng.random() < 0.3:
+        lines.append({'foodId': reward_id, 'quantity': rng.randint(1, 2)})
+    return lines
+
+def reference_price(lines, prices):
+    subtotal = sum((prices[line['foodId']] * line['quantity'] for line in lines), Decimal('0'))
+    exact_tax = subtotal * Decimal('0.15')
+    return {
+        'total_amount': subtotal,
+        'tax_amount': exact_tax.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+        'grand_total': Decimal(math.floor(subtotal + exact_tax)),
+        'points_earned': math.floor(subtotal / 10)
+    }
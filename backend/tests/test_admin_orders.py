@@ -0,0 +1,75 @@
+import time
+from datetime import datetime, timedelta
+
+from models import db, Order
+
+def place_order(client):
+    response = client.post('/api/orders', json={'items': [{'foodId': 10, 'quantity': 1}], 'payment_method': 'cash'})
+    assert response.status_code == 201
+    return response.get_json()['order']['id']
+
+def board(admin, since=None):
+    response = admin.get('/api/admin/orders', query_string={'since': since} if since else None)
+    assert response.status_code == 200
+    return response.get_json()
+
+def test_full_board_lists_active_orders(admin, guest):
+    order_id = place_order(guest)
+    data = board(admin)
+    assert data['full'] is True
+    assert order_id in [order['id'] for order in data['orders']]
+    assert data['cursor']
+
+def test_since_returns_new_orders(admin, guest):
+    cursor = board(admin)['cursor']
+    created = place_order(guest)
+    data = board(admin, cursor)
+    ids = [order['id'] for order in data['orders']]
+    assert data['full'] is False
+    assert created in ids
+
+def test_completed_orders_are_removed(admin, guest):
+    order_id = place_order(guest)
+    cursor = board(admin)['cursor']
+    response = admin.post('/api/admin/orders/bulk-status', json={'order_ids': [order_id], 'status': 'completed'})
+    assert response.status_code == 200
+    data = board(admin, cursor)
+    assert order_id in data['removed_ids']
+    assert order_id not in [order['id'] for order in data['orders']]
+
+def test_status_change_is_picked_up(admin, guest):
+    order_id = place_order(guest)
+    cursor = board(admin)['cursor']
+    admin.put(f'/api/admin/orders/{order_id}/status', json={'status': 'ready'})
+    changed = {order['id']: order['status'] for order in board(admin, cursor)['orders']}
+    assert changed[order_id] == 'ready'
+
+def test_old_changes_are_left_out(app, admin, guest):
+    order_id = place_order(guest)
+    with app.app_context():
+        db.session.get(Order, order_id).updated_at = datetime.utcnow() - timedelta(minutes=5)
+        db.session.commit()
+    data = board(admin, (datetime.utcnow() - timedelta(minutes=1)).isoformat())
+    assert order_id not in [order['id'] for order in data['orders']]
+
+def test_invalid_cursor_is_rejected(admin):
+    assert admin.get('/api/admin/orders?since=yesterday').status_code == 400
+
+def test_board_needs_an_admin(guest):
+    assert guest.get('/api/admin/orders').status_code == 401
+
+def test_status_times_are_stamped_in_utc(app, admin, guest, monkeypatch):
+    # A host clock well away from UTC shows up as a skew against order_time
+    monkeypatch.setenv('TZ', 'Asia/Kolkata')
+    time.tzset()
+    try:
+        order_id = place_order(guest)
+        admin.put(f'/api/admin/orders/{order_id}/status', json={'status': 'ready'})
+        admin.put(f'/api/admin/orders/{order_id}/status', json={'status': 'completed'})
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    with app.app_context():
+        order = db.session.get(Order, order_id)
+        assert timedelta(0) <= order.ready_time - order.order_time < timedelta(minutes=1)
+        assert timedelta(0) <= order.completed_time - order.ready_time < timedelta(minutes=1)
@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from archive import archive_completed_orders
+from models import db, Order, ArchivedOrder
+from scheduler import READY_TO_COMPLETED, OrderStatusScheduler
+
+# Completed in a year no other test touches
+COMPLETED_AT = datetime(2002, 6, 1)
+
+def test_archived_ids_are_never_reused(app, guest):
+    order_ids = []
+    for _ in range(3):
+        response = guest.post('/api/orders', json={'items': [{'foodId': 3, 'quantity': 1}], 'payment_method': 'cash'})
+        order_ids.append(response.get_json()['order']['id'])
+    scheduler = OrderStatusScheduler()
+    with app.app_context():
+        scheduler.apply({'ready': order_ids}, COMPLETED_AT)
+        scheduler.apply({'completed': order_ids}, COMPLETED_AT + READY_TO_COMPLETED)
+        archive_completed_orders(COMPLETED_AT + timedelta(days=1))
+        archived = set(db.session.execute(select(ArchivedOrder.id).where(ArchivedOrder.id.in_(order_ids))).scalars())
+        # The newest order holds the id sequence, so it stays behind
+        assert archived == set(order_ids[:-1])
+        assert db.session.get(Order, order_ids[-1]) is not None
+    response = guest.post('/api/orders', json={'items': [{'foodId': 3, 'quantity': 1}], 'payment_method': 'cash'})
+    assert response.get_json()['order']['id'] > max(order_ids)
@@ -0,0 +1,89 @@
+import pytest
+
+from models import db, Order
+
+def place_orders(client, count):
+    order_ids = []
+    for _ in range(count):
+        response = client.post('/api/orders', json={'items': [{'foodId': 14, 'quantity': 1}], 'payment_method': 'cash'})
+        assert response.status_code == 201
+        order_ids.append(response.get_json()['order']['id'])
+    return order_ids
+
+def add_item(admin, name, price):
+    response = admin.post('/api/admin/menu', json={'name': name, 'price': price})
+    assert response.status_code == 201
+    return response.get_json()['menu_item']['id']
+
+def menu_ids(client):
+    return {item['id']: item for item in client.get('/api/food-items').get_json()['food_items']}
+
+def test_bulk_status_moves_every_order(app, admin, guest):
+    order_ids = place_orders(guest, 3)
+    response = admin.post('/api/admin/orders/bulk-status', json={'order_ids': order_ids, 'status': 'ready'})
+    assert response.get_json()['updated'] == 3
+    with app.app_context():
+        orders = [db.session.get(Order, order_id) for order_id in order_ids]
+        assert {order.status for order in orders} == {'ready'}
+        assert all(order.ready_time is not None for order in orders)
+
+def test_bulk_status_reports_each_id(admin, guest):
+    ready, current = place_orders(guest, 2)
+    admin.post('/api/admin/orders/bulk-status', json={'order_ids': [ready], 'status': 'ready'})
+    response = admin.post('/api/admin/orders/bulk-status', json={'updates': [
+        {'id': ready, 'status': 'ready'},
+        {'id': current, 'status': 'completed'},
+        {'id': 10 ** 9, 'status': 'ready'},
+        {'id': current, 'status': 'ready'},
+        {'id': ready + current, 'status': 'eaten'},
+    ]})
+    assert response.status_code == 200
+    results = {result['id']: result for result in response.get_json()['results']}
+    assert results[ready]['result'] == 'unchanged'
+    assert results[current]['error'] == 'duplicate'
+    assert results[10 ** 9]['error'] == 'not_found'
+    assert results[ready + current]['error'] == 'invalid_status'
+    assert response.get_json()['updated'] == 0
+
+def test_bulk_status_statements_do_not_grow_with_orders(admin, guest, statements):
+    counts = []
+    for count in (2, 10):
+        order_ids = place_orders(guest, count)
+        before = len(statements)
+        admin.post('/api/admin/orders/bulk-status', json={'order_ids': order_ids, 'status': 'ready'})
+        counts.append(len(statements) - before)
+    assert counts[0] == counts[1]
+
+@pytest.mark.parametrize('body', [{}, {'order_ids': []}, {'updates': [{'status': 'ready'}]}, {'updates': [{'id': 1}] * 501}])
+def test_bulk_status_rejects_bad_bodies(admin, body):
+    assert admin.post('/api/admin/orders/bulk-status', json=body).status_code == 400
+
+def test_bulk_status_needs_an_admin(guest):
+    assert guest.post('/api/admin/orders/bulk-status', json={'order_ids': [1], 'status': 'ready'}).status_code == 401
+
+def test_bulk_menu_changes(admin, user):
+    cheaper, hidden, removed = (add_item(admin, name, 100) for name in ('Thali', 'Lassi', 'Dosa'))
+    response = admin.post('/api/admin/menu/bulk', json={'changes': [
+        {'id': cheaper, 'price': 80},
+        {'id': hidden, 'is_available': False},
+        {'id': removed, 'delete': True},
+    ]})
+    assert response.status_code == 200
+    assert [result['result'] for result in response.get_json()['results']] == ['updated', 'updated', 'deleted']
+    menu = menu_ids(user)
+    assert menu[cheaper]['price'] == 80.0
+    assert hidden not in menu and removed not in menu
+    # Checkout prices from the new menu straight away
+    order = user.post('/api/orders', json={'items': [{'foodId': cheaper, 'quantity': 1}], 'payment_method': 'cash'})
+    assert order.get_json()['order']['total_amount'] == 80.0
+    assert user.post('/api/orders', json={'items': [{'foodId': removed, 'quantity': 1}], 'payment_method': 'cash'}).status_code == 400
+
+def test_bulk_menu_reports_invalid_changes(admin):
+    item_id = add_item(admin, 'Idli', 40)
+    response = admin.post('/api/admin/menu/bulk', json={'changes': [
+        {'id': item_id, 'price': -5},
+        {'id': 10 ** 9, 'price': 5},
+    ]})
+    results = {result['id']: result for result in response.get_json()['results']}
+    assert results[item_id]['error'] == 'invalid_price'
+    assert results[10 ** 9]['error'] == 'not_found'
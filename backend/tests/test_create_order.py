@@ -0,0 +1,41 @@
+def place_order(client, food_ids):
+    response = client.post('/api/orders', json={
+        'items': [{'foodId': food_id, 'quantity': 2} for food_id in food_ids],
+        'payment_method': 'cash'
+    })
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['order']
+
+def statements_for(client, statements, food_ids):
+    before = len(statements)
+    place_order(client, food_ids)
+    return statements[before:]
+
+def test_cart_size_does_not_change_statement_count(user, statements):
+    small, large = [1], list(range(1, 11))
+    # The first orders create this hour's rollup rows; count once they exist
+    place_order(user, small)
+    place_order(user, large)
+    assert len(statements_for(user, statements, small)) == len(statements_for(user, statements, large))
+
+def test_guest_cart_size_does_not_change_statement_count(guest, statements):
+    small, large = [3], list(range(3, 13))
+    place_order(guest, small)
+    place_order(guest, large)
+    assert len(statements_for(guest, statements, small)) == len(statements_for(guest, statements, large))
+
+def test_order_items_are_inserted_in_one_statement(user, statements):
+    executed = statements_for(user, statements, list(range(1, 11)))
+    assert len([statement for statement in executed if statement.startswith('INSERT INTO order_items')]) == 1
+
+def test_order_lines_are_priced_from_the_menu(user):
+    order = place_order(user, [1, 4, 4])
+    lines = {(item['food_id'], item['quantity'], item['item_total']) for item in order['items']}
+    assert lines == {(1, 2, 30.0), (4, 2, 120.0), (4, 2, 120.0)}
+    assert order['total_amount'] == 270.0
+    assert order['grand_total'] == 310.0
+
+def test_unknown_food_item_is_rejected(user, statements):
+    response = user.post('/api/orders', json={'items': [{'foodId': 999, 'quantity': 1}], 'payment_method': 'cash'})
+    assert response.status_code == 400
+    assert not any(statement.startswith('INSERT') for statement in statements)
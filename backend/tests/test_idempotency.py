@@ -0,0 +1,66 @@
+import uuid
+
+from sqlalchemy import func, select
+
+from idempotency import idempotency_cache
+from models import db, Order
+
+ORDER = {'items': [{'foodId': 13, 'quantity': 2}], 'payment_method': 'cash'}
+
+def checkout(client, key, body=ORDER):
+    return client.post('/api/orders', json=body, headers={'Idempotency-Key': key} if key else None)
+
+def orders_for(app, user_id):
+    with app.app_context():
+        return db.session.execute(select(func.count()).select_from(Order).where(Order.user_id == user_id)).scalar()
+
+def test_retry_returns_the_original_order(user):
+    key = str(uuid.uuid4())
+    first = checkout(user, key)
+    second = checkout(user, key)
+    assert first.status_code == second.status_code == 201
+    assert 'Idempotent-Replayed' not in first.headers
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert second.get_json()['order'] == first.get_json()['order']
+
+def test_retry_creates_no_second_order(app, user):
+    key = str(uuid.uuid4())
+    checkout(user, key)
+    checkout(user, key)
+    assert orders_for(app, user.user_id) == 1
+
+def test_replay_from_the_database_after_the_cache_is_gone(app, user):
+    # Another worker, or this one after a restart, only has the unique column to go on
+    key = str(uuid.uuid4())
+    first = checkout(user, key)
+    idempotency_cache._entries.clear()
+    second = checkout(user, key)
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert second.get_json()['order']['id'] == first.get_json()['order']['id']
+    assert orders_for(app, user.user_id) == 1
+
+def test_key_in_the_body(user):
+    key = str(uuid.uuid4())
+    first = checkout(user, None, dict(ORDER, idempotency_key=key))
+    second = checkout(user, key)
+    assert second.get_json()['order']['id'] == first.get_json()['order']['id']
+
+def test_keys_are_scoped_to_the_caller(app, user, guest):
+    key = str(uuid.uuid4())
+    mine = checkout(user, key)
+    theirs = checkout(guest, key)
+    assert theirs.status_code == 201
+    assert 'Idempotent-Replayed' not in theirs.headers
+    assert theirs.get_json()['order']['id'] != mine.get_json()['order']['id']
+
+def test_orders_without_a_key_are_not_deduplicated(app, user):
+    checkout(user, None)
+    checkout(user, None)
+    assert orders_for(app, user.user_id) == 2
+
+def test_rejected_order_does_not_use_up_the_key(user):
+    key = str(uuid.uuid4())
+    assert checkout(user, key, {'items': [{'foodId': 999, 'quantity': 1}], 'payment_method': 'cash'}).status_code == 400
+    response = checkout(user, key)
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
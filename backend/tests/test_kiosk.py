@@ -0,0 +1,119 @@
+import uuid
+
+import pytest
+
+def backlog(count, kiosk_id=None, food_id=11):
+    prefix = uuid.uuid4().hex[:8]
+    return [{
+        'client_id': f'{prefix}-{number}',
+        'items': [{'foodId': food_id, 'quantity': 1}],
+        'payment_method': 'cash',
+        **({'kiosk_id': kiosk_id} if kiosk_id else {})
+    } for number in range(count)]
+
+def sync(client, orders):
+    response = client.post('/api/orders/batch', json={'orders': orders})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def outcomes(data):
+    return [result.get('result', result.get('error')) for result in data['results']]
+
+def test_batch_creates_every_order(guest):
+    orders = backlog(5)
+    data = sync(guest, orders)
+    assert data['created'] == 5
+    assert [result['client_id'] for result in data['results']] == [order['client_id'] for order in orders]
+    assert outcomes(data) == ['created'] * 5
+    assert len({result['order_id'] for result in data['results']}) == 5
+
+def test_resent_batch_is_replayed(guest):
+    orders = backlog(3)
+    first = sync(guest, orders)
+    second = sync(guest, orders)
+    assert second['created'] == 0
+    assert outcomes(second) == ['replayed'] * 3
+    assert [result['order_id'] for result in second['results']] == [result['order_id'] for result in first['results']]
+
+def test_batch_and_single_checkout_share_keys(guest):
+    order = backlog(1)[0]
+    single = guest.post('/api/orders', json=order, headers={'Idempotency-Key': order['client_id']})
+    data = sync(guest, [order])
+    assert outcomes(data) == ['replayed']
+    assert data['results'][0]['order_id'] == single.get_json()['order']['id']
+
+def test_statements_do_not_grow_with_the_batch(guest, statements):
+    counts = []
+    for size in (2, 20):
+        before = len(statements)
+        sync(guest, backlog(size))
+        counts.append(len(statements) - before)
+    assert counts[0] == counts[1]
+
+def test_bad_orders_are_reported_without_failing_the_batch(guest):
+    good, unknown, missing, repeated = backlog(4)
+    unknown['items'] = [{'foodId': 999, 'quantity': 1}]
+    del missing['payment_method']
+    data = sync(guest, [good, unknown, missing, repeated, dict(repeated)])
+    results = {result['client_id']: result for result in data['results']}
+    assert data['created'] == 1
+    assert results[good['client_id']]['result'] == 'created'
+    assert 'error' in results[unknown['client_id']]
+    assert 'error' in results[missing['client_id']]
+    assert results[repeated['client_id']]['error'] == 'duplicate'
+
+def test_user_batch_earns_points(user):
+    # One Rs 20 item per order: 2 points each
+    sync(user, backlog(3))
+    assert user.get('/api/user/points').get_json()['points'] == 6
+
+def test_kiosk_keys_survive_a_new_guest_session(app, guest):
+    kiosk_id = uuid.uuid4().hex
+    orders = backlog(2, kiosk_id=kiosk_id)
+    first = sync(guest, orders)
+    next_guest = app.test_client()
+    next_guest.post('/api/guest/access')
+    second = sync(next_guest, orders)
+    assert outcomes(second) == ['replayed'] * 2
+    assert [result['order_id'] for result in second['results']] == [result['order_id'] for result in first['results']]
+
+def test_kiosk_orders_are_only_replayed_to_their_owner(guest, user):
+    orders = backlog(1, kiosk_id=uuid.uuid4().hex)
+    sync(guest, orders)
+    data = sync(user, orders)
+    assert data['created'] == 0
+    assert data['results'][0]['error'] == 'client_id already used'
+    assert 'order_id' not in data['results'][0]
+
+@pytest.mark.parametrize('orders', [
+    None,
+    [],
+    [{'items': []}],
+    [{'client_id': 'x' * 65}],
+    [{'client_id': 'a', 'kiosk_id': ''}],
+    [{'client_id': 'a', 'kiosk_id': 7}],
+    [{'client_id': str(number)} for number in range(501)],
+])
+def test_bad_batches_are_rejected(guest, orders):
+    assert guest.post('/api/orders/batch', json={'orders': orders}).status_code == 400
+
+def test_batch_needs_a_session(app):
+    assert app.test_client().post('/api/orders/batch', json={'orders': backlog(1)}).status_code == 401
+
+@pytest.mark.parametrize('change', [
+    {'payment_method': 7},
+    {'payment_method': 'c' * 51},
+    {'payment_details': 'card'},
+    {'items': {'foodId': 11, 'quantity': 1}},
+    {'items': ['11']},
+    {'items': [{'foodId': [11], 'quantity': 1}]},
+    {'items': [{'foodId': 11, 'quantity': 1, 'hasExtra': 'yes'}]},
+    {'redemption_id': '3'},
+])
+def test_malformed_order_fails_alone(guest, change):
+    good, bad = backlog(2)
+    bad.update(change)
+    data = sync(guest, [good, bad])
+    assert data['created'] == 1
+    assert outcomes(data)[0] == 'created'
+    assert 'error' in data['results'][1]
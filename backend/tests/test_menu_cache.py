@@ -0,0 +1,33 @@
+import json
+
+from models import db, FoodItem
+from menu_cache import menu_cache
+
+def menu_names(body):
+    return {item['name'] for item in json.loads(body)['food_items']}
+
+def test_bump_from_another_worker_reaches_the_cached_body(app):
+    with app.app_context():
+        etag, body = menu_cache.get()
+        # Another worker adds an item: the row is bumped but this worker's cache isn't told
+        db.session.add(FoodItem(name='Masala Chai', price=12, is_available=True))
+        menu_cache.bump()
+        db.session.commit()
+        # Stands in for MENU_CACHE_TTL running out
+        menu_cache.invalidate()
+        # Checkout reads the version first, which must not hide the change from get()
+        version = menu_cache.current_version()
+        new_etag, new_body = menu_cache.get()
+        assert menu_cache.current_version() == version
+    assert new_etag != etag
+    assert 'Masala Chai' in menu_names(new_body)
+    assert 'Masala Chai' not in menu_names(body)
+
+def test_version_is_read_once_per_ttl(app, statements):
+    with app.app_context():
+        menu_cache.invalidate()
+        menu_cache.current_version()
+        before = len(statements)
+        menu_cache.current_version()
+        menu_cache.get()
+        assert len(statements) == before
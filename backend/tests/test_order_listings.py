@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from archive import archive_completed_orders
+from models import db
+from order_queries import ARCHIVE, HOT, fetch_order_dicts
+from scheduler import READY_TO_COMPLETED, OrderStatusScheduler
+
+# Completed and archived in a year no other test touches
+ARCHIVED_AT = datetime(2001, 1, 1)
+
+def place_orders(client, count):
+    order_ids = []
+    for number in range(count):
+        response = client.post('/api/orders', json={
+            'items': [{'foodId': 1 + number % 14, 'quantity': 1}, {'foodId': 2, 'quantity': 2}],
+            'payment_method': 'cash'
+        })
+        assert response.status_code == 201
+        order_ids.append(response.get_json()['order']['id'])
+    return order_ids
+
+def archive(app, order_ids):
+    scheduler = OrderStatusScheduler()
+    with app.app_context():
+        scheduler.apply({'ready': order_ids}, ARCHIVED_AT)
+        scheduler.apply({'completed': order_ids}, ARCHIVED_AT + READY_TO_COMPLETED)
+        archive_completed_orders(ARCHIVED_AT + timedelta(days=1))
+
+def customer_with(app, make_user, hot, archived):
+    client = make_user()
+    archive(app, place_orders(client, archived))
+    place_orders(client, hot)
+    return client
+
+def statements_for(statements, request):
+    before = len(statements)
+    response = request()
+    assert response.status_code == 200
+    return len(statements) - before, response.get_json()
+
+def test_customer_history_does_not_grow_with_orders(app, make_user, statements):
+    few = customer_with(app, make_user, hot=1, archived=1)
+    many = customer_with(app, make_user, hot=8, archived=8)
+    few_count, few_data = statements_for(statements, lambda: few.get('/api/orders'))
+    many_count, many_data = statements_for(statements, lambda: many.get('/api/orders'))
+    assert len(few_data['orders']) == 2 and len(many_data['orders']) == 16
+    assert all(len(order['items']) == 2 for order in many_data['orders'])
+    assert few_count == many_count
+
+def test_admin_board_does_not_grow_with_orders(admin, guest, statements):
+    place_orders(guest, 1)
+    few, _ = statements_for(statements, lambda: admin.get('/api/admin/orders'))
+    place_orders(guest, 15)
+    many, _ = statements_for(statements, lambda: admin.get('/api/admin/orders'))
+    assert few == many
+
+def test_past_orders_page_does_not_grow_with_its_size(app, admin, guest, statements):
+    archive(app, place_orders(guest, 6))
+    small, small_data = statements_for(statements, lambda: admin.get('/api/admin/orders/past?limit=2'))
+    large, large_data = statements_for(statements, lambda: admin.get('/api/admin/orders/past?limit=200'))
+    assert len(small_data['orders']) == 2 and len(large_data['orders']) > 6
+    assert small == large
+
+@pytest.mark.parametrize('store', [HOT, ARCHIVE], ids=['hot', 'archive'])
+def test_fetch_order_dicts_is_two_queries(app, guest, statements, store):
+    archive(app, place_orders(guest, 10))
+    order_ids = place_orders(guest, 10)
+    with app.app_context():
+        before = len(statements)
+        orders = fetch_order_dicts(store.order.guest_id.isnot(None), include_user_name=True, store=store)
+        assert len(statements) - before == 2
+    assert len(orders) >= len(order_ids)
+    assert all(order['items'] for order in orders)
@@ -0,0 +1,31 @@
+import time
+
+import pytest
+
+from passwords import PasswordHasher, PasswordHasherBusy
+
+@pytest.fixture
+def pool():
+    hasher = PasswordHasher(workers=1, concurrency=1, timeout=0.5)
+    yield hasher
+    hasher.shutdown()
+
+def test_hash_and_verify_in_the_pool(pool):
+    password_hash = pool.hash('Password123!')
+    assert pool.verify(password_hash, 'Password123!')
+    assert not pool.verify(password_hash, 'wrong')
+
+def test_timed_out_callers_do_not_pile_up_jobs(pool):
+    pool._run(time.sleep, 0)
+    # Each caller gives up after 0.5 s; only the first one's job may reach the pool
+    for _ in range(4):
+        with pytest.raises(PasswordHasherBusy):
+            pool._run(time.sleep, 1)
+    time.sleep(0.5)
+    # The first job is done by now and nothing is queued behind it
+    pool._run(time.sleep, 0)
+
+def test_inline_hashing_releases_its_slot():
+    hasher = PasswordHasher(workers=0, concurrency=1, timeout=0.1)
+    for _ in range(3):
+        assert hasher.verify(hasher.hash('Password123!'), 'Password123!')
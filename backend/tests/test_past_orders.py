@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from models import db, Order
+from order_queries import past_order_key
+from rollups import record_orders_reopened
+
+def place_orders(client, count):
+    order_ids = []
+    for _ in range(count):
+        response = client.post('/api/orders', json={'items': [{'foodId': 2, 'quantity': 1}], 'payment_method': 'cash'})
+        assert response.status_code == 201
+        order_ids.append(response.get_json()['order']['id'])
+    return order_ids
+
+def set_status(admin, order_ids, status):
+    response = admin.post('/api/admin/orders/bulk-status', json={'order_ids': order_ids, 'status': status})
+    assert response.status_code == 200
+
+@pytest.fixture
+def completed(app, admin, guest):
+    # Two groups completed in one UPDATE each share a completed_time
+    tied, later, undated = place_orders(guest, 5), place_orders(guest, 3), place_orders(guest, 2)
+    set_status(admin, tied + later, 'ready')
+    set_status(admin, tied, 'completed')
+    set_status(admin, later, 'completed')
+    set_status(admin, undated, 'completed')
+    # Orders completed before completed_time was stamped have none, and no completion in the rollup
+    with app.app_context():
+        orders = db.session.execute(select(Order).where(Order.id.in_(undated))).scalars().all()
+        record_orders_reopened([order.completed_time for order in orders])
+        for order in orders:
+            order.completed_time = None
+        db.session.commit()
+    return tied + later + undated
+
+def all_pages(admin, limit):
+    orders, after = [], None
+    while True:
+        response = admin.get('/api/admin/orders/past', query_string={'limit': limit, **({'after': after} if after else {})})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['orders']) <= limit
+        orders += data['orders']
+        after = data['next_cursor']
+        if after is None:
+            return orders
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 200])
+def test_pages_cover_every_order_once_in_order(admin, completed, limit):
+    orders = all_pages(admin, limit)
+    ids = [order['id'] for order in orders]
+    assert len(ids) == len(set(ids))
+    assert set(completed) <= set(ids)
+    assert orders == sorted(orders, key=past_order_key, reverse=True)
+    assert all(order['status'] == 'completed' for order in orders)
+
+def test_undated_orders_come_last(admin, completed):
+    orders = all_pages(admin, 2)
+    dated = [order['completed_time'] is not None for order in orders]
+    assert dated == sorted(dated, reverse=True)
+    assert not dated[-1]
+
+def test_streams_match_the_pages(admin, completed):
+    pages = [order['id'] for order in all_pages(admin, 50)]
+    ndjson = admin.get('/api/admin/orders/past?stream=ndjson').get_data(as_text=True)
+    assert [json.loads(line)['id'] for line in ndjson.splitlines()] == pages
+    array = admin.get('/api/admin/orders/past?stream=array').get_json()
+    assert [order['id'] for order in array['orders']] == pages
+
+def test_invalid_cursor_is_rejected(admin):
+    assert admin.get('/api/admin/orders/past?after=nonsense').status_code == 400
+    assert admin.get('/api/admin/orders/past?stream=csv').status_code == 400
@@ -0,0 +1,93 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from bootstrap import load_setup_menu
+from menu_cache import menu_cache
+from models import db
+from pricing import PriceTable, PricingError, price_entry, price_order
+from pricing_reference import paisa_prices, random_cart, reference_price
+
+MENU = {item['id']: (item['name'], item['price']) for item in load_setup_menu()}
+PRICES = {food_id: price for food_id, (_, price) in MENU.items()}
+REGULAR = [food_id for food_id in MENU if food_id < 101]
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('paisa', [False, True])
+def test_matches_decimal_reference(seed, paisa):
+    rng = random.Random(seed)
+    prices = paisa_prices(PRICES, rng) if paisa else PRICES
+    items = {food_id: price_entry(food_id, MENU[food_id][0], price) for food_id, price in prices.items()}
+    for _ in range(200):
+        cart = random_cart(rng, REGULAR, reward_id=101)
+        quote = price_order(cart, items, rewards={101})
+        expected = reference_price(cart, prices)
+        assert {key: quote[key] for key in expected} == expected, cart
+        assert sum(line['item_total'] for line in quote['lines']) == quote['total_amount']
+        assert quote['grand_total'] == quote['grand_total'].to_integral_value()
+
+def menu_items():
+    return {food_id: price_entry(food_id, name, price) for food_id, (name, price) in MENU.items()}
+
+def test_menu_prices_are_ignored_for_rewards():
+    items = {103: price_entry(103, 'Veg Burger (Reward)', '50.00')}
+    quote = price_order([{'foodId': 103, 'quantity': 1}], items, rewards={103})
+    assert quote['total_amount'] == Decimal('0.00')
+    assert quote['reward_id'] == 103
+
+def test_reward_needs_a_redemption():
+    with pytest.raises(PricingError):
+        price_order([{'foodId': 101, 'quantity': 1}], menu_items())
+    with pytest.raises(PricingError):
+        price_order([{'foodId': 101, 'quantity': 1}], menu_items(), rewards={102})
+
+def test_one_reward_per_order():
+    lines = [{'foodId': 101, 'quantity': 1}, {'foodId': 102, 'quantity': 1}]
+    with pytest.raises(PricingError):
+        price_order(lines, menu_items(), rewards={101, 102})
+    with pytest.raises(PricingError):
+        price_order([{'foodId': 101, 'quantity': 1}] * 2, menu_items(), rewards={101})
+
+def test_reward_quantity_is_limited():
+    assert price_order([{'foodId': 101, 'quantity': 2}], menu_items(), rewards={101})['reward_id'] == 101
+    with pytest.raises(PricingError):
+        price_order([{'foodId': 101, 'quantity': 3}], menu_items(), rewards={101})
+    with pytest.raises(PricingError):
+        price_order([{'foodId': 103, 'quantity': 2}], menu_items(), rewards={103})
+
+@pytest.mark.parametrize('line', [
+    {'foodId': 999, 'quantity': 1},
+    {'foodId': 1, 'quantity': 0},
+    {'foodId': 1, 'quantity': -2},
+    {'foodId': 1, 'quantity': 1.5},
+    {'foodId': 1, 'quantity': '2'},
+    {'foodId': 1, 'quantity': True},
+    {'foodId': '1', 'quantity': 1},
+])
+def test_invalid_lines_are_rejected(line):
+    with pytest.raises(PricingError):
+        price_order([line], menu_items())
+
+def test_no_reward_without_reward_lines():
+    assert price_order([{'foodId': 1, 'quantity': 1}], menu_items(), rewards={101})['reward_id'] is None
+
+def test_price_table_queries_only_when_the_menu_changes(app, statements):
+    table = PriceTable()
+    cart = [{'foodId': 1, 'quantity': 2}, {'foodId': 4, 'quantity': 1}]
+    with app.app_context():
+        menu_cache.invalidate()
+        # Cold: one version read and one menu load, even before /food-items has been served
+        price_order(cart, table.items())
+        assert len(statements) == 2
+        for _ in range(5):
+            price_order(cart, table.items())
+        assert len(statements) == 2
+        # Another worker's edit is picked up with one more version read and one reload
+        menu_cache.bump()
+        db.session.commit()
+        menu_cache.invalidate()
+        before = len(statements)
+        price_order(cart, table.items())
+        price_order(cart, table.items())
+        assert len(statements) - before == 2
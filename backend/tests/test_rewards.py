@@ -0,0 +1,51 @@
+import pytest
+
+REWARD = 101
+
+@pytest.fixture
+def redemption(user):
+    # 84 x Pav Bhaji is a 5040 rupee subtotal, enough points for one reward
+    response = user.post('/api/orders', json={'items': [{'foodId': 4, 'quantity': 84}], 'payment_method': 'cash'})
+    assert response.status_code == 201
+    response = user.post('/api/user/points/redeem', json={'reward_id': REWARD})
+    assert response.status_code == 200
+    return response.get_json()['redemption_id']
+
+def order_reward(client, redemption_id, quantity=1):
+    return client.post('/api/orders', json={
+        'items': [{'foodId': 1, 'quantity': 1}, {'foodId': REWARD, 'quantity': quantity}],
+        'redemption_id': redemption_id,
+        'payment_method': 'cash'
+    })
+
+def test_redeemed_reward_is_free(user, redemption):
+    response = order_reward(user, redemption)
+    assert response.status_code == 201
+    order = response.get_json()['order']
+    assert order['total_amount'] == 15.0
+    assert {item['food_id']: item['item_total'] for item in order['items']}[REWARD] == 0.0
+
+def test_redemption_is_used_once(user, redemption):
+    assert order_reward(user, redemption).status_code == 201
+    assert order_reward(user, redemption).status_code == 400
+
+def test_used_redemption_cannot_be_cancelled(user, redemption):
+    assert order_reward(user, redemption).status_code == 201
+    assert user.post(f'/api/user/points/redemptions/{redemption}/cancel').status_code == 409
+
+def test_cancelled_redemption_cannot_be_used(user, redemption):
+    assert user.post(f'/api/user/points/redemptions/{redemption}/cancel').status_code == 200
+    assert order_reward(user, redemption).status_code == 400
+
+def test_reward_quantity_over_the_limit_is_rejected(user, redemption):
+    assert order_reward(user, redemption, quantity=3).status_code == 400
+    assert order_reward(user, redemption, quantity=2).status_code == 201
+
+def test_reward_without_redemption_is_rejected(user):
+    assert order_reward(user, None).status_code == 400
+
+def test_another_users_redemption_is_rejected(app, redemption, guest):
+    other = app.test_client()
+    other.post('/api/login', json={'email': 'testuser@gmail.com', 'password': 'Password123!'})
+    assert order_reward(other, redemption).status_code == 400
+    assert order_reward(guest, redemption).status_code == 400
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from models import db, SalesRollup, ItemSalesRollup
+from rollups import rebuild_rollups
+from scheduler import READY_TO_COMPLETED, OrderStatusScheduler
+
+def place_order(client, food_ids):
+    response = client.post('/api/orders', json={
+        'items': [{'foodId': food_id, 'quantity': 1} for food_id in food_ids],
+        'payment_method': 'cash'
+    })
+    assert response.status_code == 201
+    return response.get_json()['order']['id']
+
+def rollup_rows():
+    sales = db.session.execute(select(SalesRollup).order_by(SalesRollup.day, SalesRollup.hour)).scalars()
+    items = db.session.execute(select(ItemSalesRollup).order_by(ItemSalesRollup.day, ItemSalesRollup.food_id)).scalars()
+    return (
+        [(row.day, row.hour, row.orders_count, row.items_quantity, row.revenue, row.tax, row.grand_total,
+          row.points_issued, row.completed_count) for row in sales],
+        [(row.day, row.food_id, row.food_name, row.orders_count, row.quantity, row.revenue) for row in items]
+    )
+
+def test_completion_is_counted_once_across_schedulers(app, guest):
+    order_id = place_order(guest, [1, 2])
+    # A bucket no other test writes to
+    completed_at = datetime(2031, 1, 1, 9)
+    first, second = OrderStatusScheduler(), OrderStatusScheduler()
+    with app.app_context():
+        assert first.apply({'ready': [order_id]}) == [order_id]
+        assert first.apply({'completed': [order_id]}, completed_at) == [order_id]
+        assert second.apply({'completed': [order_id]}, completed_at) == []
+        row = db.session.get(SalesRollup, (completed_at.date(), completed_at.hour))
+        assert row.completed_count == 1
+
+def test_checkout_adds_to_item_rollups(app, user):
+    with app.app_context():
+        day = datetime.utcnow().date()
+        before = {row.food_id: row.quantity for row in db.session.execute(
+            select(ItemSalesRollup).where(ItemSalesRollup.day == day)
+        ).scalars()}
+    place_order(user, [5, 5, 6])
+    with app.app_context():
+        after = {row.food_id: row.quantity for row in db.session.execute(
+            select(ItemSalesRollup).where(ItemSalesRollup.day == day)
+        ).scalars()}
+    assert after[5] - before.get(5, 0) == 2
+    assert after[6] - before.get(6, 0) == 1
+
+def test_incremental_rollups_match_a_rebuild(app, admin, user, guest):
+    place_order(user, list(range(1, 11)))
+    scheduled, skipped, reopened, bulk = (place_order(guest, [7, 7, 8]) for _ in range(4))
+    with app.app_context():
+        scheduler = OrderStatusScheduler()
+        now = datetime.utcnow()
+        scheduler.apply({'ready': [scheduled]}, now)
+        scheduler.apply({'completed': [scheduled]}, now + READY_TO_COMPLETED)
+    # Admin corrections: straight to completed, and completed orders reopened and completed again
+    admin.put(f'/api/admin/orders/{skipped}/status', json={'status': 'completed'})
+    for status in ('completed', 'ready', 'completed', 'current'):
+        admin.put(f'/api/admin/orders/{reopened}/status', json={'status': status})
+    for status in ('completed', 'current', 'completed'):
+        admin.post('/api/admin/orders/bulk-status', json={'order_ids': [bulk], 'status': status})
+    with app.app_context():
+        incremental = rollup_rows()
+        rebuild_rollups()
+        assert rollup_rows() == incremental
+
+def test_reopened_order_is_not_counted_twice(app, admin, guest):
+    order_id = place_order(guest, [1])
+    with app.app_context():
+        day, hour = datetime.utcnow().date(), datetime.utcnow().hour
+        before = db.session.get(SalesRollup, (day, hour)).completed_count
+    for status in ('completed', 'current', 'completed'):
+        admin.put(f'/api/admin/orders/{order_id}/status', json={'status': status})
+    with app.app_context():
+        assert db.session.get(SalesRollup, (day, hour)).completed_count - before == 1
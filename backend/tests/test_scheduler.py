@@ -0,0 +1,80 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Order
+from scheduler import READY_TO_COMPLETED, OrderStatusScheduler
+
+@pytest.fixture
+def scheduler(app):
+    scheduler = OrderStatusScheduler()
+    scheduler.app = app
+    yield scheduler
+    scheduler.stop()
+
+@pytest.fixture
+def order_id(guest):
+    response = guest.post('/api/orders', json={'items': [{'foodId': 9, 'quantity': 1}], 'payment_method': 'cash'})
+    assert response.status_code == 201
+    return response.get_json()['order']['id']
+
+def load(app, order_id):
+    with app.app_context():
+        return db.session.get(Order, order_id)
+
+def test_due_order_becomes_ready(app, scheduler, order_id):
+    now = datetime.utcnow()
+    with app.app_context():
+        assert scheduler.apply({'ready': [order_id]}, now) == [order_id]
+    order = load(app, order_id)
+    assert order.status == 'ready'
+    assert order.ready_time == now
+    assert order.updated_at == now
+
+def test_ready_order_is_scheduled_to_complete(app, scheduler, order_id):
+    now = datetime.utcnow()
+    with app.app_context():
+        scheduler.apply({'ready': [order_id]}, now)
+    assert scheduler._pop_due(now + READY_TO_COMPLETED) == {'ready': [], 'completed': [order_id]}
+
+def test_order_completes_only_after_the_ready_window(app, scheduler, order_id):
+    now = datetime.utcnow()
+    with app.app_context():
+        scheduler.apply({'ready': [order_id]}, now)
+        assert scheduler.apply({'completed': [order_id]}, now + READY_TO_COMPLETED - timedelta(seconds=1)) == []
+        assert scheduler.apply({'completed': [order_id]}, now + READY_TO_COMPLETED) == [order_id]
+    order = load(app, order_id)
+    assert order.status == 'completed'
+    assert order.completed_time == now + READY_TO_COMPLETED
+
+def test_transition_is_applied_once(app, scheduler, order_id):
+    now = datetime.utcnow()
+    with app.app_context():
+        assert scheduler.apply({'ready': [order_id]}, now) == [order_id]
+        assert scheduler.apply({'ready': [order_id]}, now + timedelta(seconds=1)) == []
+    assert load(app, order_id).updated_at == now
+
+def test_order_completed_by_an_admin_is_left_alone(app, scheduler, order_id, admin):
+    response = admin.put(f'/api/admin/orders/{order_id}/status', json={'status': 'completed'})
+    assert response.status_code == 200
+    with app.app_context():
+        assert scheduler.apply({'ready': [order_id]}) == []
+    assert load(app, order_id).status == 'completed'
+
+def test_pending_orders_are_loaded_from_the_database(app, scheduler, order_id):
+    order = load(app, order_id)
+    with app.app_context():
+        scheduler.load_pending()
+    due = order.order_time + timedelta(minutes=order.estimated_time)
+    assert (due, order_id, 'ready') in scheduler._heap
+    assert order_id not in scheduler._pop_due(due - timedelta(seconds=1))['ready']
+    assert order_id in scheduler._pop_due(due)['ready']
+
+def test_worker_thread_applies_due_transitions(app, scheduler, order_id):
+    scheduler.start()
+    scheduler._schedule(datetime.utcnow(), order_id, 'ready')
+    deadline = time.monotonic() + 5
+    while load(app, order_id).status == 'current' and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert load(app, order_id).status == 'ready'
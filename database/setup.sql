@@ -59,7 +59,9 @@ VALUES (
 CREATE TABLE IF NOT EXISTS orders (
     id INT AUTO_INCREMENT PRIMARY KEY,
     order_number VARCHAR(20) UNIQUE NOT NULL,
-    user_id INT NOT NULL,
+    user_id INT NULL,
+    guest_id VARCHAR(20) NULL,
+    idempotency_key VARCHAR(64) NULL UNIQUE,
     total_amount DECIMAL(10,2) NOT NULL,
     tax_amount DECIMAL(10,2) NOT NULL,
     grand_total DECIMAL(10,2) NOT NULL,
@@ -90,6 +92,55 @@ CREATE TABLE IF NOT EXISTS order_items (
     FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE
 );
 
+-- Archive of completed orders moved out of orders/order_items by backend/archive.py
+CREATE TABLE IF NOT EXISTS orders_archive (
+    id INT PRIMARY KEY,
+    order_number VARCHAR(20) NOT NULL,
+    user_id INT NULL,
+    guest_id VARCHAR(20) NULL,
+    idempotency_key VARCHAR(64) NULL,
+    total_amount DECIMAL(10,2) NOT NULL,
+    tax_amount DECIMAL(10,2) NOT NULL,
+    grand_total DECIMAL(10,2) NOT NULL,
+    points_earned INT NOT NULL,
+    estimated_time INT NOT NULL,
+    status ENUM('current', 'ready', 'completed') DEFAULT 'completed',
+    payment_method VARCHAR(50),
+    payment_details JSON,
+    order_time DATETIME,
+    ready_time DATETIME NULL,
+    completed_time DATETIME NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS order_items_archive (
+    id INT PRIMARY KEY,
+    order_id INT NOT NULL,
+    food_id INT NOT NULL,
+    food_name VARCHAR(100) NOT NULL,
+    food_price DECIMAL(8,2) NOT NULL,
+    quantity INT NOT NULL,
+    has_extra BOOLEAN DEFAULT FALSE,
+    item_total DECIMAL(10,2) NOT NULL,
+    created_at DATETIME
+);
+
+-- Create points ledger (one row per change; users.points holds the running balance)
+CREATE TABLE IF NOT EXISTS points_ledger (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    delta INT NOT NULL,
+    reason VARCHAR(20) NOT NULL,
+    order_id INT NULL,
+    reward_id INT NULL,
+    reverses_id INT NULL UNIQUE,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (reverses_id) REFERENCES points_ledger(id)
+);
+
 -- Create food_items table for reference
 CREATE TABLE IF NOT EXISTS food_items (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -102,6 +153,39 @@ CREATE TABLE IF NOT EXISTS food_items (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
+-- Menu version, bumped on every menu change so workers can tell when their cached menu is stale
+CREATE TABLE IF NOT EXISTS menu_version (
+    id INT PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+INSERT INTO menu_version (id, version) VALUES (1, 0) ON DUPLICATE KEY UPDATE id=id;
+
+-- Sales rollups, maintained incrementally as orders are placed and completed (UTC buckets)
+CREATE TABLE IF NOT EXISTS sales_rollups (
+    day DATE NOT NULL,
+    hour INT NOT NULL,
+    orders_count INT NOT NULL DEFAULT 0,
+    items_quantity INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+    tax DECIMAL(12,2) NOT NULL DEFAULT 0,
+    grand_total DECIMAL(12,2) NOT NULL DEFAULT 0,
+    points_issued INT NOT NULL DEFAULT 0,
+    completed_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, hour)
+);
+
+CREATE TABLE IF NOT EXISTS item_sales_rollups (
+    day DATE NOT NULL,
+    food_id INT NOT NULL,
+    food_name VARCHAR(100) NOT NULL,
+    orders_count INT NOT NULL DEFAULT 0,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, food_id)
+);
+
 -- Insert food items
 INSERT INTO food_items (id, name, price, image_path, has_extra_option) VALUES
 (1, 'Samosa', 15.00, 'Samosa.jpg', FALSE),
@@ -135,12 +219,21 @@ ON DUPLICATE KEY UPDATE
 CREATE INDEX idx_email ON users(email);
 CREATE INDEX idx_created_at ON users(created_at);
 CREATE INDEX idx_admin_username ON admins(username);
-CREATE INDEX idx_orders_user_id ON orders(user_id);
-CREATE INDEX idx_orders_status ON orders(status);
+CREATE INDEX idx_users_reset_token ON users(reset_token);
+CREATE INDEX idx_orders_user_order_time ON orders(user_id, order_time);
+CREATE INDEX idx_orders_guest_order_time ON orders(guest_id, order_time);
+CREATE INDEX idx_orders_status_order_time ON orders(status, order_time);
+CREATE INDEX idx_orders_status_completed_time ON orders(status, completed_time, id);
 CREATE INDEX idx_orders_order_time ON orders(order_time);
+CREATE INDEX idx_orders_updated_at ON orders(updated_at);
 CREATE INDEX idx_order_items_order_id ON order_items(order_id);
+CREATE INDEX idx_orders_archive_user_order_time ON orders_archive(user_id, order_time);
+CREATE INDEX idx_orders_archive_guest_order_time ON orders_archive(guest_id, order_time);
+CREATE INDEX idx_orders_archive_status_completed_time ON orders_archive(status, completed_time, id);
+CREATE INDEX idx_order_items_archive_order_id ON order_items_archive(order_id);
 CREATE INDEX idx_food_items_available ON food_items(is_available);
 CREATE INDEX idx_users_points ON users(points);
+CREATE INDEX idx_points_ledger_user_id ON points_ledger(user_id);
 
 -- Insert 2 orders for test user (user_id = 1)
 -- Order 1: Samosa (2x) + Tea (1x) = 15*2 + 10 = 40, tax (5%) = 2, total = 42, points = 4
@@ -20,6 +20,7 @@ import ConfigureMenu from './pages/ConfigureMenu';
 import Navigation from './components/Navigation';
 import AdminNavigation from './components/AdminNavigation';
 import config from './config';
+import useOfflineOrders from './hooks/useOfflineOrders';
 import './App.css';
 
 function AppContent({ isAuthenticated, userType, user, admin, handleLogin, handleAdminLogin, handleGuestLogin, handleLogout, cartItemCount, setCartItemCount, cart, onUpdateCart }) {
@@ -177,6 +178,7 @@ function App() {
   const [loading, setLoading] = useState(true);
   const [cartItemCount, setCartItemCount] = useState(0);
   const [cart, setCart] = useState({});
+  useOfflineOrders(isAuthenticated && userType !== 'admin' ? user : null);
 
   useEffect(() => {
     checkAuthStatus();
@@ -1,4 +1,5 @@
 import React, { useState } from 'react';
+import { assetUrl } from '../config';
 import './FoodCard.css';
 
 // Import all food images
@@ -49,9 +50,15 @@ const getImageByName = (name) => {
 const FoodCard = ({ foodItem, onAddToCart, onRemoveFromCart, cartQuantity = 0 }) => {
   const [showExtraOption, setShowExtraOption] = useState(false);
 
-  // Handle image path - use food item name to get the correct imported image
+  // Prefer the resized card variant of an uploaded image, then the upload itself,
+  // then the bundled image for the item's name
   const getImageSrc = () => {
-    // Use the food item name to get the correct imported image
+    if (foodItem.image_variants && foodItem.image_variants.card) {
+      return assetUrl(foodItem.image_variants.card);
+    }
+    if (foodItem.image_path && foodItem.image_path.startsWith('/assets/')) {
+      return assetUrl(foodItem.image_path);
+    }
     return getImageByName(foodItem.name);
   };
 
@@ -11,4 +11,14 @@ const isDevelopment = process.env.NODE_ENV === 'development' ||
                       window.location.hostname === 'localhost' || 
                       window.location.hostname === '127.0.0.1';
 
-export default isDevelopment ? config.development : config.production;
+const activeConfig = isDevelopment ? config.development : config.production;
+
+// Uploaded images (/assets/<hash>.<ext>) are served by the backend with long-lived caching
+export const assetUrl = (path) => (
+  path && path.startsWith('/assets/') ? `${activeConfig.API_BASE_URL}${path}` : path
+);
+
+// Counter kiosks build with REACT_APP_KIOSK_MODE=true: checkouts made while offline are queued and synced later
+export const KIOSK_MODE = process.env.REACT_APP_KIOSK_MODE === 'true';
+
+export default activeConfig;
@@ -1,5 +1,7 @@
 import { useState, useEffect } from 'react';
-import config from '../config';
+import config, { KIOSK_MODE } from '../config';
+
+const MENU_SNAPSHOT_KEY = 'menuSnapshot';
 
 const useFoodItems = () => {
   const [foodItems, setFoodItems] = useState([]);
@@ -21,11 +23,20 @@ const useFoodItems = () => {
         if (response.ok) {
           const data = await response.json();
           setFoodItems(data.food_items || []);
+          if (KIOSK_MODE) {
+            localStorage.setItem(MENU_SNAPSHOT_KEY, JSON.stringify(data.food_items || []));
+          }
         } else {
           setError('Failed to fetch food items');
         }
       } catch (err) {
-        setError('Network error while fetching food items');
+        // Offline kiosks keep selling from the last menu they saw; the server re-prices on sync
+        const snapshot = KIOSK_MODE ? localStorage.getItem(MENU_SNAPSHOT_KEY) : null;
+        if (snapshot) {
+          setFoodItems(JSON.parse(snapshot));
+        } else {
+          setError('Network error while fetching food items');
+        }
       } finally {
         setLoading(false);
       }
@@ -0,0 +1,97 @@
+import { useEffect } from 'react';
+import config, { KIOSK_MODE } from '../config';
+
+const STORAGE_KEY = 'offlineOrders';
+const KIOSK_ID_KEY = 'kioskId';
+// The backend accepts up to 500 orders per sync request
+const SYNC_BATCH_SIZE = 500;
+
+const readQueue = () => {
+  try {
+    return JSON.parse(localStorage.getItem(STORAGE_KEY)) || [];
+  } catch (err) {
+    return [];
+  }
+};
+
+const writeQueue = (orders) => {
+  localStorage.setItem(STORAGE_KEY, JSON.stringify(orders));
+};
+
+// A stable id for this kiosk; the server scopes kiosk order keys to it instead
+// of the session, so a new guest session still finds orders already sent
+export const getKioskId = () => {
+  let kioskId = localStorage.getItem(KIOSK_ID_KEY);
+  if (!kioskId) {
+    kioskId = window.crypto && window.crypto.randomUUID
+      ? window.crypto.randomUUID()
+      : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    localStorage.setItem(KIOSK_ID_KEY, kioskId);
+  }
+  return kioskId;
+};
+
+// Signed-in users only sync their own orders; guest orders belong to the kiosk
+const ownerOf = (user) => {
+  if (!user) return null;
+  return user.is_guest ? 'guest' : `user:${user.id}`;
+};
+
+let activeOwner = null;
+
+// client_id is the checkout's idempotency key, so syncing the same order twice is harmless
+export const queueOfflineOrder = (clientId, orderData) => {
+  const queue = readQueue().filter(order => order.client_id !== clientId);
+  writeQueue([...queue, { ...orderData, client_id: clientId, owner: activeOwner }]);
+};
+
+let syncing = false;
+
+export const syncOfflineOrders = async () => {
+  const owner = activeOwner;
+  if (syncing || !owner) return;
+  syncing = true;
+  try {
+    let queue = readQueue().filter(order => order.owner === owner);
+    while (queue.length > 0) {
+      // owner only matters on this kiosk; undefined fields are left out of the JSON
+      const batch = queue.slice(0, SYNC_BATCH_SIZE).map(order => ({ ...order, owner: undefined }));
+      const response = await fetch(`${config.API_BASE_URL}/api/orders/batch`, {
+        method: 'POST',
+        credentials: 'include',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ orders: batch }),
+      });
+      if (!response.ok) return;
+      const data = await response.json();
+      // Created, replayed and rejected orders all have a final answer; only unanswered ones stay queued
+      const answered = new Set(data.results.map(result => result.client_id));
+      const remaining = readQueue().filter(order => !(order.owner === owner && answered.has(order.client_id)));
+      writeQueue(remaining);
+      if (answered.size === 0) return;
+      queue = remaining.filter(order => order.owner === owner);
+    }
+  } catch (err) {
+    // Still offline; the next 'online' event tries again
+  } finally {
+    syncing = false;
+  }
+};
+
+const useOfflineOrders = (user) => {
+  const owner = ownerOf(user);
+  useEffect(() => {
+    activeOwner = owner;
+    if (!KIOSK_MODE || !owner) return undefined;
+    syncOfflineOrders();
+    window.addEventListener('online', syncOfflineOrders);
+    return () => {
+      window.removeEventListener('online', syncOfflineOrders);
+      activeOwner = null;
+    };
+  }, [owner]);
+};
+
+export default useOfflineOrders;
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import config from '../config';
 import './AdminHomeScreen.css';
 
@@ -6,6 +6,7 @@ const AdminHomeScreen = ({ admin, onLogout }) => {
   const [orders, setOrders] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const cursorRef = useRef(null);
 
   const formatDate = (dateString) => {
     if (!dateString) return 'N/A';
@@ -32,13 +33,15 @@ const AdminHomeScreen = ({ admin, onLogout }) => {
   const fetchOrders = async () => {
     try {
       setLoading(true);
-      const response = await fetch(`${config.API_BASE_URL}/api/admin/orders`, {
+      cursorRef.current = null;
+      const response = await fetch(`${config.API_BASE_URL}/api/admin/orders?view=compact`, {
         credentials: 'include'
       });
       
       if (response.ok) {
         const data = await response.json();
         setOrders(data.orders);
+        cursorRef.current = data.cursor;
         setError(null);
       } else {
         const errorData = await response.json();
@@ -51,6 +54,27 @@ const AdminHomeScreen = ({ admin, onLogout }) => {
     }
   };
 
+  // Only asks for orders changed since the last refresh
+  const fetchOrderChanges = async () => {
+    if (!cursorRef.current) {
+      return fetchOrders();
+    }
+    try {
+      const response = await fetch(
+        `${config.API_BASE_URL}/api/admin/orders?view=compact&since=${encodeURIComponent(cursorRef.current)}`,
+        { credentials: 'include' }
+      );
+      if (response.ok) {
+        const data = await response.json();
+        const changedIds = new Set([...data.orders.map(order => order.id), ...data.removed_ids]);
+        setOrders(prevOrders => [...data.orders, ...prevOrders.filter(order => !changedIds.has(order.id))]
+          .sort((a, b) => new Date(b.order_time) - new Date(a.order_time)));
+        cursorRef.current = data.cursor;
+      }
+    } catch (err) {
+    }
+  };
+
   const updateOrderStatus = async (orderId, newStatus) => {
     try {
       const response = await fetch(`${config.API_BASE_URL}/api/admin/orders/${orderId}/status`, {
@@ -73,10 +97,56 @@ const AdminHomeScreen = ({ admin, onLogout }) => {
     }
   };
 
+  // One request and one transaction for the whole rush instead of one per order
+  const markAllReady = async () => {
+    const orderIds = orders.filter(order => order.status === 'current').map(order => order.id);
+    if (orderIds.length === 0) return;
+    try {
+      const response = await fetch(`${config.API_BASE_URL}/api/admin/orders/bulk-status`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        credentials: 'include',
+        body: JSON.stringify({ order_ids: orderIds, status: 'ready' })
+      });
+      
+      if (response.ok) {
+        await fetchOrders();
+      } else {
+        const errorData = await response.json();
+        setError(errorData.error || 'Failed to update order statuses');
+      }
+    } catch (err) {
+      setError('Network error while updating order statuses');
+    }
+  };
+
   useEffect(() => {
     fetchOrders();
-    const interval = setInterval(fetchOrders, 30000);
-    return () => clearInterval(interval);
+    const interval = setInterval(fetchOrderChanges, 30000);
+
+    // Live order events; the cursor poll above catches anything the stream misses
+    const events = new EventSource(`${config.API_BASE_URL}/api/orders/stream`, {
+      withCredentials: true
+    });
+    const applyOrderEvent = (event) => {
+      const order = JSON.parse(event.data);
+      setOrders(prevOrders => {
+        const others = prevOrders.filter(existing => existing.id !== order.id);
+        if (order.status !== 'current' && order.status !== 'ready') {
+          return others;
+        }
+        return [order, ...others].sort((a, b) => new Date(b.order_time) - new Date(a.order_time));
+      });
+    };
+    events.addEventListener('order_created', applyOrderEvent);
+    events.addEventListener('order_status', applyOrderEvent);
+
+    return () => {
+      clearInterval(interval);
+      events.close();
+    };
   }, []);
 
   const getStatusBadge = (status) => {
@@ -121,9 +191,16 @@ const AdminHomeScreen = ({ admin, onLogout }) => {
         <div className="orders-section">
           <div className="orders-header">
             <h2>Active Orders</h2>
-            <button className="refresh-btn" onClick={fetchOrders}>
-              🔄 Refresh
-            </button>
+            <div className="header-actions">
+              {orders.some(order => order.status === 'current') && (
+                <button className="refresh-btn" onClick={markAllReady}>
+                  ✅ Mark All Ready
+                </button>
+              )}
+              <button className="refresh-btn" onClick={fetchOrders}>
+                🔄 Refresh
+              </button>
+            </div>
           </div>
 
           {loading && (
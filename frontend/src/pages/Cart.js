@@ -93,8 +93,8 @@ const Cart = ({ cart, onUpdateCart, onCartUpdate }) => {
     if (isReward) {
       Object.keys(cart).forEach(key => {
         if (cart[key].foodId === foodId && cart[key].isReward) {
-          if (cart[key].rewardPoints) {
-            restorePoints(cart[key].rewardPoints);
+          if (cart[key].redemptionId) {
+            cancelRedemption(cart[key].redemptionId);
           }
           delete newCart[key];
         }
@@ -106,30 +106,12 @@ const Cart = ({ cart, onUpdateCart, onCartUpdate }) => {
     onUpdateCart(newCart);
   };
 
-  const restorePoints = async (pointsToRestore) => {
+  const cancelRedemption = async (redemptionId) => {
     try {
-      const response = await fetch(`${config.API_BASE_URL}/api/user/points`, {
-        method: 'GET',
+      await fetch(`${config.API_BASE_URL}/api/user/points/redemptions/${redemptionId}/cancel`, {
+        method: 'POST',
         credentials: 'include',
-        headers: {
-          'Content-Type': 'application/json',
-        }
       });
-
-      if (response.ok) {
-        const data = await response.json();
-        const currentPoints = data.points || 0;
-        const newPoints = currentPoints + pointsToRestore;
-        await fetch('${config.API_BASE_URL}/api/user/points', {
-          method: 'PUT',
-          credentials: 'include',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({ points: newPoints })
-        });
-
-      }
     } catch (error) {
     }
   };
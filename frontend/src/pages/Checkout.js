@@ -1,14 +1,20 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useRef } from 'react';
 import useFoodItems from '../hooks/useFoodItems';
 import PayTMImage from '../assets/paytm.png';
 import GPayImage from '../assets/gpay.png';
-import config from '../config';
+import config, { KIOSK_MODE } from '../config';
+import { getKioskId, queueOfflineOrder } from '../hooks/useOfflineOrders';
 import './Checkout.css';
 
 const Checkout = ({ cart, onUpdateCart }) => {
   const [selectedPayment, setSelectedPayment] = useState('');
-  const [estimatedTime, setEstimatedTime] = useState(15);
   const { foodItems, loading } = useFoodItems();
+  // One key per checkout, so retrying a timed-out payment can't place the order twice
+  const idempotencyKeyRef = useRef(
+    window.crypto && window.crypto.randomUUID
+      ? window.crypto.randomUUID()
+      : `${Date.now()}-${Math.random().toString(36).slice(2)}`
+  );
   const [paymentDetails, setPaymentDetails] = useState({
     paytmNumber: '',
     gpayUpi: '',
@@ -18,27 +24,6 @@ const Checkout = ({ cart, onUpdateCart }) => {
     cardCvv: ''
   });
 
-  useEffect(() => {
-    const now = new Date();
-    const currentHour = now.getHours();
-
-    let time = 15;
-
-    if (currentHour >= 8 && currentHour < 10) {
-      time = 15;
-    } else if (currentHour >= 10 && currentHour < 12) {
-      time = 30;
-    } else if (currentHour >= 12 && currentHour < 15) {
-      time = 45;
-    } else if (currentHour >= 15 && currentHour < 17) {
-      time = 20;
-    } else if (currentHour >= 17 && currentHour < 18) {
-      time = 10;
-    }
-
-    setEstimatedTime(time);
-  }, []);
-
   const calculateTotals = () => {
     let subtotal = 0;
     const cartItems = [];
@@ -86,34 +71,35 @@ const Checkout = ({ cart, onUpdateCart }) => {
   };
 
   const handlePay = async () => {
-    try {
-      const orderData = {
-        items: Object.entries(cart).map(([key, item]) => ({
-          foodId: item.foodId,
-          quantity: item.quantity,
-          hasExtra: item.hasExtra || false
-        })),
-        total_amount: subtotal,
-        tax_amount: tax,
-        grand_total: total,
-        points_earned: points,
-        estimated_time: estimatedTime,
-        payment_method: selectedPayment,
-        payment_details: paymentDetails
-      };
+    const rewardItem = Object.values(cart).find(item => item.isReward);
+    // The server prices the order and estimates its ready time itself
+    const orderData = {
+      items: Object.entries(cart).map(([key, item]) => ({
+        foodId: item.foodId,
+        quantity: item.quantity,
+        hasExtra: item.hasExtra || false
+      })),
+      // The server only prices a reward as free against this redemption
+      redemption_id: rewardItem ? rewardItem.redemptionId : undefined,
+      payment_method: selectedPayment,
+      payment_details: paymentDetails,
+      kiosk_id: KIOSK_MODE ? getKioskId() : undefined
+    };
 
+    try {
       const response = await fetch(`${config.API_BASE_URL}/api/orders`, {
         method: 'POST',
         credentials: 'include',
         headers: {
           'Content-Type': 'application/json',
+          'Idempotency-Key': idempotencyKeyRef.current,
         },
         body: JSON.stringify(orderData),
       });
 
       if (response.ok) {
         const data = await response.json();
-        alert(`Order placed successfully! Order Number: ${data.order.order_number}`);
+        alert(`Order placed successfully! Order Number: ${data.order.order_number}\nReady in about ${data.order.estimated_time} minutes`);
         onUpdateCart({});
         window.location.href = '/orders';
       } else {
@@ -121,6 +107,15 @@ const Checkout = ({ cart, onUpdateCart }) => {
         alert(`Failed to place order: ${errorData.error}`);
       }
     } catch (error) {
+      // fetch only throws a TypeError when the request never reached the server
+      if (KIOSK_MODE && error instanceof TypeError) {
+        queueOfflineOrder(idempotencyKeyRef.current, orderData);
+        alert('No connection right now. The order is saved on this kiosk and will be sent as soon as the connection returns.');
+        onUpdateCart({});
+        // A hash change, not a page load: the kiosk is offline
+        window.location.hash = '#/home';
+        return;
+      }
       alert('Failed to place order. Please try again.');
     }
   };
@@ -171,7 +166,7 @@ const Checkout = ({ cart, onUpdateCart }) => {
           </div>
           
           <div className="estimated-time">
-            <p>Your order will be ready in: <strong>{estimatedTime} minutes</strong></p>
+            <p>The kitchen confirms your ready time when you place the order</p>
           </div>
         </div>
 
@@ -15,7 +15,7 @@ import Kurkure from '../assets/Kurkure.jpg';
 import CocaCola from '../assets/Coca Cola.jpg';
 import Frooti from '../assets/Frooti.jpg';
 
-import config from '../config';
+import config, { assetUrl } from '../config';
 
 // Map images by food item name (works in both dev and production)
 const getImageByName = (name) => {
@@ -46,9 +46,14 @@ const getImageSrc = (item) => {
     return item.image_path;
   }
   
+  // Uploaded images: use the thumbnail once it has been rendered
+  if (item.image_variants && item.image_variants.thumb) {
+    return assetUrl(item.image_variants.thumb);
+  }
+
   // If it's a public assets path (like /assets/filename.jpg), use it
   if (item.image_path && item.image_path.startsWith('/assets/')) {
-    return item.image_path;
+    return assetUrl(item.image_path);
   }
   
   // Otherwise, try to get image by name
@@ -301,7 +306,7 @@ const ConfigureMenu = () => {
                   {newItem.image_path && (
                     <div className="image-preview">
                       <img 
-                        src={newItem.image_path.startsWith('http') || newItem.image_path.startsWith('/assets/') ? newItem.image_path : (getImageByName(newItem.name) || newItem.image_path)} 
+                        src={newItem.image_path.startsWith('http') || newItem.image_path.startsWith('/assets/') ? assetUrl(newItem.image_path) : (getImageByName(newItem.name) || newItem.image_path)} 
                         alt="Preview" 
                         onError={(e) => {
                           e.target.style.display = 'none';
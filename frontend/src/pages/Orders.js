@@ -18,6 +18,24 @@ const Orders = () => {
     return () => clearInterval(timer);
   }, []);
 
+  // Convert API data to frontend format
+  const formatOrder = (order) => ({
+    id: order.id,
+    orderNumber: order.order_number,
+    items: (order.items || []).map(item => ({
+      foodId: item.food_id,
+      quantity: item.quantity,
+      hasExtra: item.has_extra
+    })),
+    total: order.total_amount,
+    tax: order.tax_amount,
+    grandTotal: order.grand_total,
+    points: order.points_earned,
+    orderTime: new Date(order.order_time),
+    estimatedTime: order.estimated_time,
+    status: order.status === 'completed' ? 'past' : order.status
+  });
+
   // Function to fetch orders from API
   const fetchOrders = async () => {
     try {
@@ -38,25 +56,7 @@ const Orders = () => {
           return;
         }
         
-        // Convert API data to frontend format
-        const formattedOrders = data.orders.map(order => ({
-          id: order.id,
-          orderNumber: order.order_number,
-          items: (order.items || []).map(item => ({
-            foodId: item.food_id,
-            quantity: item.quantity,
-            hasExtra: item.has_extra
-          })),
-          total: order.total_amount,
-          tax: order.tax_amount,
-          grandTotal: order.grand_total,
-          points: order.points_earned,
-          orderTime: new Date(order.order_time),
-          estimatedTime: order.estimated_time,
-          status: order.status === 'completed' ? 'past' : order.status
-        }));
-        
-        setOrders(formattedOrders);
+        setOrders(data.orders.map(formatOrder));
       } else {
         setOrders([]);
       }
@@ -67,9 +67,22 @@ const Orders = () => {
     }
   };
 
-  // Load orders from API
+  // Load orders from API, then follow live updates for this account
   useEffect(() => {
     fetchOrders();
+
+    const events = new EventSource(`${config.API_BASE_URL}/api/orders/stream`, {
+      withCredentials: true
+    });
+    const applyOrderEvent = (event) => {
+      const order = formatOrder(JSON.parse(event.data));
+      setOrders(prevOrders => [order, ...prevOrders.filter(existing => existing.id !== order.id)]
+        .sort((a, b) => b.orderTime - a.orderTime));
+    };
+    events.addEventListener('order_created', applyOrderEvent);
+    events.addEventListener('order_status', applyOrderEvent);
+
+    return () => events.close();
   }, []);
 
   // Calculate remaining time for current orders
@@ -102,9 +115,10 @@ const Orders = () => {
   const currentOrders = orders.filter(order => order.status === 'current' || order.status === 'ready');
   const pastOrders = orders.filter(order => order.status === 'past' || order.status === 'completed');
 
-  // Update order statuses in database every 30 seconds
+  // Check every 30 seconds whether any of this account's orders changed
   useEffect(() => {
-    const updateOrderStatuses = async () => {
+    let cursor = null;
+    const checkOrderStatuses = async () => {
       try {
         const response = await fetch(`${config.API_BASE_URL}/api/orders/update-status`, {
           method: 'POST',
@@ -112,11 +126,15 @@ const Orders = () => {
             'Content-Type': 'application/json',
           },
           credentials: 'include',
+          body: JSON.stringify(cursor ? { since: cursor } : {}),
         });
 
         if (response.ok) {
           const result = await response.json();
-          if (result.updated_order_ids && result.updated_order_ids.length > 0) {
+          // The first check only picks up a cursor: the orders were just loaded
+          const checked = cursor !== null;
+          cursor = result.cursor;
+          if (checked && result.updated_order_ids && result.updated_order_ids.length > 0) {
             // Refresh orders from database if any were updated
             fetchOrders();
           }
@@ -125,11 +143,12 @@ const Orders = () => {
       }
     };
 
-    // Call the status update endpoint every 30 seconds
-    const interval = setInterval(updateOrderStatuses, 30000);
+    // Status changes are also pushed over the order stream; this check
+    // answers from the orders table, so it catches whatever the stream missed
+    const interval = setInterval(checkOrderStatuses, 30000);
     
     // Also call it immediately
-    updateOrderStatuses();
+    checkOrderStatuses();
 
     return () => clearInterval(interval);
   }, []);
@@ -6,6 +6,8 @@ const PastOrders = () => {
   const [orders, setOrders] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const formatDate = (dateString) => {
     if (!dateString) return 'N/A';
@@ -32,13 +34,14 @@ const PastOrders = () => {
   const fetchPastOrders = async () => {
     try {
       setLoading(true);
-      const response = await fetch(`${config.API_BASE_URL}/api/admin/orders/past`, {
+      const response = await fetch(`${config.API_BASE_URL}/api/admin/orders/past?view=compact`, {
         credentials: 'include'
       });
       
       if (response.ok) {
         const data = await response.json();
         setOrders(data.orders);
+        setNextCursor(data.next_cursor);
         setError(null);
       } else {
         const errorData = await response.json();
@@ -51,6 +54,30 @@ const PastOrders = () => {
     }
   };
 
+  const fetchMorePastOrders = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await fetch(
+        `${config.API_BASE_URL}/api/admin/orders/past?view=compact&after=${encodeURIComponent(nextCursor)}`,
+        { credentials: 'include' }
+      );
+      
+      if (response.ok) {
+        const data = await response.json();
+        setOrders(prevOrders => [...prevOrders, ...data.orders]);
+        setNextCursor(data.next_cursor);
+      } else {
+        const errorData = await response.json();
+        setError(errorData.error || 'Failed to fetch past orders');
+      }
+    } catch (err) {
+      setError('Network error while fetching past orders');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchPastOrders();
   }, []);
@@ -149,6 +176,14 @@ const PastOrders = () => {
               ))}
             </div>
           )}
+
+          {!loading && !error && nextCursor && (
+            <div className="load-more">
+              <button className="refresh-btn" onClick={fetchMorePastOrders} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load More'}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -114,6 +114,18 @@ const Rewards = ({ cart, onUpdateCart, onCartUpdate, userType, onLogout }) => {
     if (userPoints < tier.points || redeemedReward) return;
 
     try {
+      const response = await fetch(`${config.API_BASE_URL}/api/user/points/redeem`, {
+        method: 'POST',
+        credentials: 'include',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ reward_id: item.id })
+      });
+      if (!response.ok) return;
+      const data = await response.json();
+      setUserPoints(data.points);
+
       const updatedCart = { ...cart };
       const cartKey = `${item.id}`;
       updatedCart[cartKey] = {
@@ -125,19 +137,10 @@ const Rewards = ({ cart, onUpdateCart, onCartUpdate, userType, onLogout }) => {
         isReward: true,
         rewardId: item.rewardId,
         rewardTier: tier.id,
-        rewardPoints: tier.points
+        rewardPoints: tier.points,
+        redemptionId: data.redemption_id
       };
       onUpdateCart(updatedCart);
-      const newPoints = userPoints - tier.points;
-      setUserPoints(newPoints);
-      await fetch(`${config.API_BASE_URL}/api/user/points`, {
-        method: 'PUT',
-        credentials: 'include',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ points: newPoints })
-      });
 
     } catch (error) {
     }
@@ -164,22 +167,21 @@ const Rewards = ({ cart, onUpdateCart, onCartUpdate, userType, onLogout }) => {
       if (!rewardItem || !rewardTier) return;
       const updatedCart = { ...cart };
       const cartKey = `${rewardItem.id}`;
+      const redemptionId = cart[cartKey] && cart[cartKey].redemptionId;
       delete updatedCart[cartKey];
       onUpdateCart(updatedCart);
 
-      // Restore user points
-      const newPoints = userPoints + rewardTier.points;
-      setUserPoints(newPoints);
-
-      // Update points in backend
-      await fetch(`${config.API_BASE_URL}/api/user/points`, {
-        method: 'PUT',
-        credentials: 'include',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ points: newPoints })
-      });
+      // Give the points back by cancelling the redemption on the server
+      if (redemptionId) {
+        const response = await fetch(`${config.API_BASE_URL}/api/user/points/redemptions/${redemptionId}/cancel`, {
+          method: 'POST',
+          credentials: 'include',
+        });
+        if (response.ok) {
+          const data = await response.json();
+          setUserPoints(data.points);
+        }
+      }
 
     } catch (error) {
     }